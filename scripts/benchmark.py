@@ -0,0 +1,299 @@
+"""
+Shared benchmark harness for the puzzle entry points (p17-p22)
+
+Every puzzle used to time itself differently: a nested `benchmark_fn` in p21,
+a fixed 50-iteration `perf_counter` loop in p22, and no timing at all in
+p17-p20. This module gives them one way to measure:
+
+- Warmup calls first, so compilation and caches are not timed.
+- An adaptive iteration count: enough calls to fill `min_time_s`, bounded
+  by `min_iterations` and `max_iterations`.
+- Per-call timings with median, mean, p95 and standard deviation.
+- Optional throughput in GB/s and GFLOP/s when the caller supplies the bytes
+  moved and floating-point operations per call.
+- JSON output for later analysis (for example the roofline report), or CSV
+  with one row per result for spreadsheets and plotting.
+
+Asynchronous devices need a `sync` callable (for example
+`torch.cuda.synchronize` or a MAX `Accelerator().synchronize`) so each call
+is timed to completion. `max_sync` and `torch_sync` pick the right one and
+return None on the CPU, so the same code runs when no accelerator is present.
+
+Usage:
+    from benchmark import benchmark, max_sync, print_results, save_json
+
+    result = benchmark(
+        "softmax", lambda: softmax(x, session, device), device=device.label,
+        sync=max_sync(device), bytes_moved=2 * x.nbytes, flops=4 * x.size,
+    )
+    print_results([result])
+    save_json([result], "softmax.json")
+
+Testing:
+    python solutions/p18/p18.py --benchmark --benchmark-json /tmp/p18.json
+"""
+
+import csv
+import io
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of one benchmarked callable, in seconds."""
+
+    name: str
+    device: str
+    iterations: int
+    times_s: List[float] = field(repr=False)
+    bytes_moved: Optional[int] = None
+    flops: Optional[int] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def median_s(self) -> float:
+        return statistics.median(self.times_s)
+
+    @property
+    def mean_s(self) -> float:
+        return statistics.fmean(self.times_s)
+
+    @property
+    def p95_s(self) -> float:
+        return percentile(self.times_s, 95)
+
+    @property
+    def stddev_s(self) -> float:
+        return statistics.stdev(self.times_s) if len(self.times_s) > 1 else 0.0
+
+    @property
+    def gb_per_s(self) -> Optional[float]:
+        """Achieved bandwidth based on the median time."""
+        if self.bytes_moved is None or self.median_s <= 0:
+            return None
+        return self.bytes_moved / self.median_s / 1e9
+
+    @property
+    def gflop_per_s(self) -> Optional[float]:
+        """Achieved compute throughput based on the median time."""
+        if self.flops is None or self.median_s <= 0:
+            return None
+        return self.flops / self.median_s / 1e9
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("times_s")
+        data.update(
+            median_s=self.median_s,
+            mean_s=self.mean_s,
+            p95_s=self.p95_s,
+            stddev_s=self.stddev_s,
+            min_s=min(self.times_s),
+            max_s=max(self.times_s),
+            gb_per_s=self.gb_per_s,
+            gflop_per_s=self.gflop_per_s,
+        )
+        return data
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile (same as numpy's default)."""
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("percentile of an empty sequence")
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def benchmark(
+    name: str,
+    fn: Callable[[], Any],
+    device: str = "cpu",
+    sync: Optional[Callable[[], Any]] = None,
+    warmup: int = 3,
+    min_time_s: float = 0.2,
+    min_iterations: int = 5,
+    max_iterations: int = 1000,
+    bytes_moved: Optional[int] = None,
+    flops: Optional[int] = None,
+    params: Optional[Dict[str, Any]] = None,
+    timer: Callable[[], float] = time.perf_counter,
+) -> BenchmarkResult:
+    """Time `fn()` and return per-call statistics.
+
+    The first warmup call also estimates the cost of one call, which sets the
+    number of timed iterations so the run lasts about `min_time_s`.
+    """
+    if warmup < 1:
+        raise ValueError("warmup must be at least 1 to size the run")
+
+    estimate = 0.0
+    for _ in range(warmup):
+        start = timer()
+        fn()
+        if sync is not None:
+            sync()
+        estimate = timer() - start
+
+    iterations = max_iterations
+    if estimate > 0:
+        iterations = math.ceil(min_time_s / estimate)
+    iterations = min(max(iterations, min_iterations), max_iterations)
+
+    times = []
+    for _ in range(iterations):
+        start = timer()
+        fn()
+        if sync is not None:
+            sync()
+        times.append(timer() - start)
+
+    return BenchmarkResult(
+        name=name,
+        device=device,
+        iterations=iterations,
+        times_s=times,
+        bytes_moved=bytes_moved,
+        flops=flops,
+        params=dict(params or {}),
+    )
+
+
+def silenced(fn: Callable[[], Any]) -> Callable[[], Any]:
+    """Wrap `fn` so its progress prints do not flood the benchmark output."""
+
+    def run() -> Any:
+        with redirect_stdout(io.StringIO()):
+            return fn()
+
+    return run
+
+
+def max_sync(device: Any) -> Optional[Callable[[], Any]]:
+    """Synchronize callable for a MAX device, or None on the host."""
+    if getattr(device, "is_host", True):
+        return None
+    return device.synchronize
+
+
+def torch_sync(device: Any) -> Optional[Callable[[], Any]]:
+    """Synchronize callable for a torch device, or None on the CPU."""
+    import torch
+
+    if torch.device(device).type != "cuda":
+        return None
+    return torch.cuda.synchronize
+
+
+def default_max_device() -> Any:
+    """The first accelerator, or the CPU when none is present."""
+    from max.driver import CPU, Accelerator, accelerator_count
+
+    return Accelerator() if accelerator_count() > 0 else CPU()
+
+
+def format_result(result: BenchmarkResult) -> str:
+    line = (
+        f"{result.name:<28} {result.device:<8}"
+        f" median {result.median_s * 1e3:9.4f} ms"
+        f"  p95 {result.p95_s * 1e3:9.4f} ms"
+        f"  std {result.stddev_s * 1e3:8.4f} ms"
+        f"  n={result.iterations}"
+    )
+    if result.gb_per_s is not None:
+        line += f"  {result.gb_per_s:8.2f} GB/s"
+    if result.gflop_per_s is not None:
+        line += f"  {result.gflop_per_s:8.2f} GFLOP/s"
+    return line
+
+
+def print_results(results: Sequence[BenchmarkResult]) -> None:
+    for result in results:
+        print(format_result(result))
+
+
+def save_json(results: Sequence[BenchmarkResult], path: Path) -> None:
+    """Write results plus host metadata as JSON.
+
+    The metadata includes the name and peak GFLOP/s and GB/s of every device
+    the results ran on, so the roofline report can be built on another
+    machine.
+    """
+    from roofline_report import record_peaks
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "metadata": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "devices": record_peaks(result.device for result in results),
+        },
+        "results": [result.to_dict() for result in results],
+    }
+    path.write_text(json.dumps(payload, indent=2))
+
+
+CSV_COLUMNS = [
+    "name",
+    "device",
+    "iterations",
+    "median_s",
+    "mean_s",
+    "p95_s",
+    "stddev_s",
+    "min_s",
+    "max_s",
+    "bytes_moved",
+    "flops",
+    "gb_per_s",
+    "gflop_per_s",
+]
+
+
+def save_csv(results: Sequence[BenchmarkResult], path: Path) -> None:
+    """Write one row per result; each params key becomes its own column."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = []
+    param_columns: List[str] = []
+    for result in results:
+        row = result.to_dict()
+        params = row.pop("params")
+        for key in params:
+            if key not in param_columns:
+                param_columns.append(key)
+        row.update(params)
+        rows.append(row)
+
+    with path.open("w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=CSV_COLUMNS + param_columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def load_json(path: Path) -> List[Dict[str, Any]]:
+    """Read the result dicts written by `save_json`."""
+    return json.loads(Path(path).read_text())["results"]
+
+
+def benchmark_json_path(argv: Sequence[str]) -> Optional[Path]:
+    """Value of `--benchmark-json PATH` in `argv`, if given."""
+    if "--benchmark-json" not in argv:
+        return None
+    index = list(argv).index("--benchmark-json")
+    if index + 1 >= len(argv):
+        raise SystemExit("--benchmark-json needs a file path")
+    return Path(argv[index + 1])
@@ -0,0 +1,70 @@
+"""
+Vectorized NumPy reference for the 1D convolution puzzles (p17, p20)
+
+The puzzles compute
+
+    output[i] = sum_j input[i + j] * kernel[j],  for j < len(kernel)
+
+with zero padding past the end of `input`, so the output has the same length
+as the input. Checking that with a doubly nested Python loop is O(N*K)
+interpreted work and dominates once inputs reach millions of elements.
+
+`conv1d_reference` keeps the same semantics but does the work in NumPy:
+
+- "shift": one vectorized multiply-add per kernel tap, O(N) memory. Best for
+  the short kernels the puzzles use.
+- "fft": correlation through real FFTs, O((N + K) log(N + K)). Best once
+  the kernel has more than a few dozen taps.
+- "auto" (default): "shift" up to FFT_MIN_KERNEL_SIZE taps, else "fft".
+
+Usage:
+    from conv_reference import conv1d_reference
+
+    expected = conv1d_reference(input_array, kernel_array)
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+
+FFT_MIN_KERNEL_SIZE = 64
+
+
+def conv1d_reference(
+    input_array: NDArray, kernel_array: NDArray, method: str = "auto"
+) -> NDArray:
+    """Zero-padded 1D correlation with output length len(input_array)."""
+    input_array = np.asarray(input_array)
+    kernel_array = np.asarray(kernel_array)
+    if input_array.ndim != 1 or kernel_array.ndim != 1:
+        raise ValueError(
+            f"Expected 1-D input and kernel, got {input_array.shape} and"
+            f" {kernel_array.shape}"
+        )
+    if method == "auto":
+        method = "fft" if kernel_array.size > FFT_MIN_KERNEL_SIZE else "shift"
+
+    dtype = np.result_type(input_array, kernel_array)
+    size = input_array.size
+    if size == 0 or kernel_array.size == 0:
+        return np.zeros(size, dtype=dtype)
+
+    if method == "shift":
+        output = np.zeros(size, dtype=dtype)
+        # Tap j only reaches input[i + j] for i < size - j; the rest is padding
+        for j in range(min(kernel_array.size, size)):
+            output[: size - j] += input_array[j:] * kernel_array[j]
+        return output
+
+    if method == "fft":
+        # Correlation is convolution with the reversed kernel; the slice
+        # starting at K - 1 lines output[i] up with input[i]
+        full_size = size + kernel_array.size - 1
+        fft_size = 1 << (full_size - 1).bit_length()
+        spectrum = np.fft.rfft(input_array, fft_size) * np.fft.rfft(
+            kernel_array[::-1], fft_size
+        )
+        full = np.fft.irfft(spectrum, fft_size)
+        start = kernel_array.size - 1
+        return full[start : start + size].astype(dtype)
+
+    raise ValueError(f"Unknown method {method!r}; use auto, shift or fft")
@@ -0,0 +1,68 @@
+"""
+Device-resident inputs and outputs for the MAX Graph puzzle entry points
+
+The p17-p19 wrappers used to upload every NumPy input with
+`Buffer.from_numpy(...).to(device)` and copy every result back with
+`.to(CPU())`. When the output of one op feeds the next op on the same device,
+both copies are pure overhead.
+
+The wrappers now accept either NumPy arrays or MAX `Buffer`s:
+
+- `as_device_buffer` uploads NumPy arrays and passes through buffers that
+  already live on the target device (other buffers are moved there). Given
+  the graph's `dtype`, it rejects inputs of any other dtype instead of letting
+  a float64 array or buffer be reinterpreted as float32.
+- `finish` copies the result to the host only when asked. With
+  `to_host=None` the result comes back to the host if any input was a NumPy
+  array, so existing NumPy callers keep working, while all-`Buffer` pipelines
+  stay on the device.
+
+Usage:
+    x = softmax(logits, session, gpu)                       # host Buffer
+    y = softmax_batched(x_dev, session, gpu)                # stays on gpu
+    z = attention(q_dev, k_dev, v_dev, session, gpu, to_host=True)
+"""
+
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+
+def same_device(a: Any, b: Any) -> bool:
+    """Whether two MAX devices are the same physical device."""
+    return (a.label, a.id) == (b.label, b.id)
+
+
+def as_device_buffer(value: Any, device: Any, dtype: Any = None) -> Any:
+    """Return `value` as a Buffer on `device`, copying only when needed.
+
+    `dtype` is the MAX DType the graph was built for; a NumPy array or
+    Buffer of another dtype raises TypeError.
+    """
+    if dtype is not None:
+        expected = dtype.to_numpy() if isinstance(value, np.ndarray) else dtype
+        if value.dtype != expected:
+            raise TypeError(f"expected {expected} input, got {value.dtype}")
+    if isinstance(value, np.ndarray):
+        from max.driver import Buffer
+
+        return Buffer.from_numpy(np.ascontiguousarray(value)).to(device)
+    if same_device(value.device, device):
+        return value
+    return value.to(device)
+
+
+def wants_host_copy(to_host: Optional[bool], inputs: Sequence[Any]) -> bool:
+    """Resolve `to_host=None` to "copy back iff any input came from NumPy"."""
+    if to_host is not None:
+        return to_host
+    return any(isinstance(value, np.ndarray) for value in inputs)
+
+
+def finish(result: Any, to_host: bool) -> Any:
+    """Copy `result` to the host if requested and not already there."""
+    if to_host and not result.device.is_host:
+        from max.driver import CPU
+
+        return result.to(CPU())
+    return result
@@ -34,10 +34,11 @@ Usage:
 import argparse
 import os
 import platform
+import re
 import subprocess
 import sys
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 try:
     import torch
@@ -62,6 +63,56 @@ class GPUSpecs:
     max_blocks_per_unit: Optional[int] = None
     total_memory_gb: Optional[float] = None
     additional_info: Optional[Dict[str, Any]] = None
+    # Datasheet peaks used for roofline analysis (None when the device is unknown)
+    peak_fp32_tflops: Optional[float] = None
+    memory_bandwidth_gbs: Optional[float] = None
+
+    def __post_init__(self):
+        if self.peak_fp32_tflops is None and self.memory_bandwidth_gbs is None:
+            peaks = lookup_peak_performance(self.device_name)
+            if peaks is not None:
+                self.peak_fp32_tflops, self.memory_bandwidth_gbs = peaks
+
+
+# Datasheet FP32 (non-tensor-core) TFLOP/s and DRAM bandwidth in GB/s.
+# Matched as whole words of the device name, longest key first ("H100 PCIe"
+# before "H100"), so "L4" does not match an L40.
+PEAK_PERFORMANCE: Dict[str, Tuple[float, float]] = {
+    "H100 PCIe": (51.2, 2000.0),
+    "H100": (66.9, 3350.0),
+    "H200": (66.9, 4800.0),
+    "A100": (19.5, 1555.0),
+    "A10G": (31.2, 600.0),
+    "A10": (31.2, 600.0),
+    "L40S": (91.6, 864.0),
+    "L40": (90.5, 864.0),
+    "L4": (30.3, 300.0),
+    "T4": (8.1, 320.0),
+    "V100": (15.7, 900.0),
+    "RTX 4090": (82.6, 1008.0),
+    "RTX 4080": (48.7, 717.0),
+    "RTX 3090 Ti": (40.0, 1008.0),
+    "RTX 3090": (35.6, 936.0),
+    "RTX 3080 Ti": (34.1, 912.0),
+    "RTX 3080": (29.8, 760.0),
+    "MI300X": (163.4, 5300.0),
+    "MI250X": (47.9, 3277.0),
+    "MI210": (22.6, 1638.0),
+}
+
+
+# Suffixes that name a different card: an "RTX 3080 Ti" is not an "RTX 3080"
+MODEL_SUFFIXES = ("Ti", "SUPER")
+
+
+def lookup_peak_performance(device_name: str) -> Optional[Tuple[float, float]]:
+    """(peak FP32 TFLOP/s, memory bandwidth GB/s) for a known device name"""
+    suffixes = "|".join(MODEL_SUFFIXES)
+    for key in sorted(PEAK_PERFORMANCE, key=len, reverse=True):
+        pattern = rf"(?<!\w){re.escape(key)}(?!\w|\s+(?:{suffixes})\b)"
+        if re.search(pattern, device_name, re.IGNORECASE):
+            return PEAK_PERFORMANCE[key]
+    return None
 
 
 def detect_platform() -> str:
@@ -495,6 +546,22 @@ def get_apple_silicon_specs() -> GPUSpecs:
         raise RuntimeError(f"Failed to get Apple Silicon specs: {e}")
 
 
+def get_gpu_specs(platform_type: Optional[str] = None) -> Optional[GPUSpecs]:
+    """Specs of the first GPU on the platform, or None if there is none
+
+    The platform is detected when not given.
+    """
+    if platform_type is None:
+        platform_type = detect_platform()
+    if platform_type == "nvidia":
+        return get_nvidia_specs()
+    elif platform_type == "amd":
+        return get_amd_specs()
+    elif platform_type == "apple_silicon":
+        return get_apple_silicon_specs()
+    return None
+
+
 def print_gpu_summary(specs: GPUSpecs):
     """Print concise GPU summary (user-friendly format)"""
     # First line: Device name and key specs
@@ -567,6 +634,12 @@ def print_gpu_specs(specs: GPUSpecs):
     if specs.total_memory_gb:
         print(f"Total Memory: {specs.total_memory_gb:.1f}GB")
 
+    if specs.peak_fp32_tflops:
+        print(f"Peak FP32: {specs.peak_fp32_tflops:.1f} TFLOP/s (datasheet)")
+
+    if specs.memory_bandwidth_gbs:
+        print(f"Memory Bandwidth: {specs.memory_bandwidth_gbs:.0f} GB/s (datasheet)")
+
     # Print additional info
     if specs.additional_info:
         for key, value in specs.additional_info.items():
@@ -671,14 +744,8 @@ Testing:
 
         # Handle --summary flag (concise output)
         if args.summary:
-            if platform_type == "nvidia":
-                specs = get_nvidia_specs()
-                print_gpu_summary(specs)
-            elif platform_type == "amd":
-                specs = get_amd_specs()
-                print_gpu_summary(specs)
-            elif platform_type == "apple_silicon":
-                specs = get_apple_silicon_specs()
+            specs = get_gpu_specs(platform_type)
+            if specs is not None:
                 print_gpu_summary(specs)
             else:
                 print(f"GPU: No compatible GPU detected")
@@ -688,16 +755,8 @@ Testing:
         # Default behavior: display full specs
         print(f'Detected Platform: {platform_type.replace("_", " ").title()}\n')
 
-        if platform_type == "nvidia":
-            specs = get_nvidia_specs()
-            print_gpu_specs(specs)
-
-        elif platform_type == "amd":
-            specs = get_amd_specs()
-            print_gpu_specs(specs)
-
-        elif platform_type == "apple_silicon":
-            specs = get_apple_silicon_specs()
+        specs = get_gpu_specs(platform_type)
+        if specs is not None:
             print_gpu_specs(specs)
 
         else:
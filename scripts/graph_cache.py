@@ -0,0 +1,233 @@
+"""
+Compiled-graph cache for the MAX Graph puzzle entry points (p17, p18, p19)
+
+`InferenceSession.load(graph)` compiles every Mojo custom op used by the graph.
+At puzzle sizes that compile step costs far more than executing the kernel, so
+rebuilding and reloading the graph on every call wastes almost all of the time.
+
+This module keeps loaded models around so only the first call for a given
+specialization pays for compilation:
+
+- In memory: models are keyed by op name, input shapes, dtype, device and a
+  hash of the custom-op Mojo sources, and scoped to the session that loaded them.
+- On disk (optional): each compiled model is exported as a MEF file and loaded
+  directly by later processes. Set MAX_GRAPH_CACHE_DIR to enable it.
+
+Usage:
+    from graph_cache import GraphKey, default_graph_cache
+
+    key = GraphKey.create("softmax", [input.shape], dtype, device, mojo_kernels)
+    model = default_graph_cache().load(
+        session, key, lambda: build_softmax_graph(...), mojo_kernels
+    )
+
+Testing:
+    MAX_GRAPH_CACHE_DIR=/tmp/max_graph_cache python solutions/p18/p18.py
+"""
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+CACHE_DIR_ENV = "MAX_GRAPH_CACHE_DIR"
+
+# (path, mtime_ns, size) of every source file -> hash, so unchanged op
+# directories are not re-read on every call.
+_source_hash_memo: Dict[Tuple[Tuple[str, int, int], ...], str] = {}
+
+
+def _max_version() -> str:
+    """Version of the installed MAX package, part of the on-disk key."""
+    try:
+        from importlib.metadata import version
+
+        return version("max")
+    except Exception:
+        return "unknown"
+
+
+def source_hash(op_dir: Path) -> str:
+    """Hash the Mojo sources of a custom-op directory.
+
+    Any edit to a kernel changes the hash, so stale compiled models are never
+    reused after the op is modified.
+    """
+    op_dir = Path(op_dir)
+    files = sorted(p for p in op_dir.rglob("*.mojo") if p.is_file())
+    stamp = tuple(
+        (str(p.relative_to(op_dir)), p.stat().st_mtime_ns, p.stat().st_size)
+        for p in files
+    )
+    if stamp in _source_hash_memo:
+        return _source_hash_memo[stamp]
+
+    digest = hashlib.sha256()
+    for p in files:
+        digest.update(str(p.relative_to(op_dir)).encode())
+        digest.update(b"\0")
+        digest.update(p.read_bytes())
+        digest.update(b"\0")
+    result = digest.hexdigest()[:16]
+    _source_hash_memo[stamp] = result
+    return result
+
+
+@dataclass(frozen=True)
+class GraphKey:
+    """Everything that determines the compiled model for a custom-op graph."""
+
+    op_name: str
+    input_shapes: Tuple[Tuple[int, ...], ...]
+    dtype: str
+    device: str
+    source_hash: str
+
+    @classmethod
+    def create(
+        cls,
+        op_name: str,
+        input_shapes: Iterable[Iterable[int]],
+        dtype: Any,
+        device: Any,
+        op_dir: Path,
+    ) -> "GraphKey":
+        """Build a key from MAX objects (DType, Device) and the op directory."""
+        return cls(
+            op_name=op_name,
+            input_shapes=tuple(
+                tuple(int(dim) for dim in shape) for shape in input_shapes
+            ),
+            dtype=str(dtype),
+            device=f"{device.label}:{device.id}",
+            source_hash=source_hash(op_dir),
+        )
+
+    def digest(self) -> str:
+        """Stable file-name-safe identifier, including the MAX version."""
+        text = repr((self, _max_version()))
+        return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+@dataclass
+class _Entry:
+    session: Any
+    model: Any
+
+
+@dataclass
+class GraphCache:
+    """Memory (and optionally disk) cache of loaded MAX models."""
+
+    cache_dir: Optional[Path] = None
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    _entries: Dict[Tuple[int, GraphKey], _Entry] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.cache_dir is not None:
+            self.cache_dir = Path(self.cache_dir)
+
+    def _mef_path(self, key: GraphKey) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{key.op_name}-{key.digest()}.mef"
+
+    def load(
+        self,
+        session: Any,
+        key: GraphKey,
+        build_graph: Callable[[], Any],
+        custom_extensions: Path,
+    ) -> Any:
+        """Return the model for `key`, compiling `build_graph()` only on a miss.
+
+        Models belong to the session that loaded them, so the memory cache is
+        scoped per session. The disk cache is shared by all sessions and
+        processes using the same cache directory.
+        """
+        memory_key = (id(session), key)
+        entry = self._entries.get(memory_key)
+        if entry is not None and entry.session is session:
+            self.hits += 1
+            return entry.model
+
+        model = None
+        mef_path = self._mef_path(key)
+        if mef_path is not None and mef_path.exists():
+            try:
+                model = session.load(
+                    mef_path, custom_extensions=[custom_extensions]
+                )
+                self.disk_hits += 1
+            except Exception:
+                # Corrupt or incompatible file: recompile and overwrite it below
+                model = None
+
+        if model is None:
+            self.misses += 1
+            model = session.load(build_graph())
+            if mef_path is not None:
+                self._export(model, mef_path)
+
+        self._entries[memory_key] = _Entry(session=session, model=model)
+        return model
+
+    def _export(self, model: Any, mef_path: Path) -> None:
+        """Write the MEF atomically so concurrent processes never read a partial file."""
+        tmp_name = None
+        try:
+            mef_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(
+                dir=mef_path.parent, suffix=".mef.tmp"
+            )
+            os.close(fd)
+            model._export_mef(tmp_name)
+            os.replace(tmp_name, mef_path)
+        except Exception:
+            # The disk cache is an optimization; failing to write it is not an error
+            if tmp_name is not None and os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+    def specializations(
+        self, op_name: Optional[str] = None
+    ) -> List[GraphKey]:
+        """Keys of the models loaded so far, optionally for one op only.
+
+        Custom ops take their sizes as graph parameters, so each distinct
+        shape is its own compiled specialization.
+        """
+        keys = {key for _, key in self._entries}
+        return sorted(
+            (key for key in keys if op_name is None or key.op_name == op_name),
+            key=lambda key: (key.op_name, key.input_shapes, key.device),
+        )
+
+    def clear(self) -> None:
+        """Drop all in-memory models (files on disk are kept)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+_default_cache: Optional[GraphCache] = None
+
+
+def default_graph_cache() -> GraphCache:
+    """Process-wide cache shared by the puzzle entry points."""
+    global _default_cache
+    if _default_cache is None:
+        cache_dir = os.getenv(CACHE_DIR_ENV)
+        _default_cache = GraphCache(
+            cache_dir=Path(cache_dir).expanduser() if cache_dir else None
+        )
+    return _default_cache
@@ -0,0 +1,121 @@
+"""
+Persistent kernel-variant auto-tuner (p21)
+
+p21 ships two embedding kernels (1D coalesced and 2D grid) and benchmarks
+them against each other, but callers still had to pick one by hand. The
+faster one depends on the shape and the device, so `KernelTuner` picks it
+at run time:
+
+- On the first call for a key (for example batch, seq, vocab, embed_dim and
+  device) every candidate is timed and the fastest name is remembered.
+- Choices are written to a JSON tuning file and loaded again by later
+  processes, so a shape is only tuned once per machine.
+- Later calls with the same key return the cached choice without timing.
+
+A choice whose variant is no longer among the candidates is re-tuned. An
+unreadable tuning file is ignored (with a warning) rather than failing the
+lookup it was meant to speed up. The file is replaced atomically, so
+processes tuning at the same time never read a half-written one.
+
+Usage:
+    from kernel_tuner import KernelTuner
+
+    tuner = KernelTuner(Path("tuning.json"))
+    name = tuner.choose(
+        KernelTuner.key(batch, seq, vocab, dim, device),
+        {"1d": lambda: embedding_1d(x, w), "2d": lambda: embedding_2d(x, w)},
+        sync=torch_sync(device),
+    )
+"""
+
+import json
+import os
+import tempfile
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from benchmark import benchmark
+
+
+def median_time(
+    fn: Callable[[], Any], sync: Optional[Callable[[], Any]] = None
+) -> float:
+    """Median seconds per call, from a short benchmark run."""
+    return benchmark(
+        "tune", fn, sync=sync, warmup=2, min_time_s=0.05, min_iterations=5
+    ).median_s
+
+
+@dataclass
+class KernelTuner:
+    """Times candidate kernels once per key and remembers the fastest."""
+
+    path: Optional[Path] = None
+    measure: Callable[..., float] = median_time
+    tuned: int = 0
+    _choices: Dict[str, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.path is None:
+            return
+        self.path = Path(self.path)
+        if not self.path.exists():
+            return
+        try:
+            choices = json.loads(self.path.read_text())["choices"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            warnings.warn(f"ignoring unreadable tuning file {self.path}: {e}")
+            return
+        self._choices.update(
+            {str(key): str(name) for key, name in choices.items()}
+        )
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """Stable string key (JSON object keys must be strings)."""
+        return "|".join(str(part) for part in parts)
+
+    def choose(
+        self,
+        key: str,
+        candidates: Mapping[str, Callable[[], Any]],
+        sync: Optional[Callable[[], Any]] = None,
+    ) -> str:
+        """Name of the fastest candidate for `key`, timing them if needed."""
+        if not candidates:
+            raise ValueError("choose needs at least one candidate")
+        choice = self._choices.get(key)
+        if choice in candidates:
+            return choice
+
+        timings = {
+            name: self.measure(fn, sync) for name, fn in candidates.items()
+        }
+        choice = min(timings, key=timings.get)
+        self._choices[key] = choice
+        self.tuned += 1
+        self.save()
+        return choice
+
+    def choices(self) -> Dict[str, str]:
+        return dict(self._choices)
+
+    def save(self) -> None:
+        """Write all choices to the tuning file, if there is one."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.path.parent, suffix=".json.tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {"choices": self._choices}, f, indent=2, sort_keys=True
+                )
+            os.replace(tmp_name, self.path)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
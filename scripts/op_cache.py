@@ -0,0 +1,131 @@
+"""
+Bounded LRU cache for compiled PyTorch custom ops (p22)
+
+p22 used to keep every `torch.compile`d op in a plain dict keyed by strings
+like `forward_fused_4x4x8`. That dict never evicted anything, and the key left
+out the output dimension, dtype and device, so two different specializations
+could share one entry.
+
+`LRUOpCache` fixes both:
+
+- `OpCacheKey` holds everything that selects a specialization: the op name,
+  its compile-time parameters, and the dtype and device of the tensors.
+- At most `max_entries` ops are kept. The least recently used one is evicted
+  when a new one is added, so runs with many distinct shapes stay bounded.
+- The bound counts entries, not device memory. Dropping a `torch.compile`
+  wrapper does not free the dynamo code cache or CUDA graphs captured for it,
+  so pass `on_evict` to release that state (p22 calls `torch._dynamo.reset()`).
+- Hit, miss and eviction counters plus `keys()` and `stats()` show what the
+  cache is doing.
+
+Usage:
+    from op_cache import LRUOpCache, OpCacheKey
+
+    cache = LRUOpCache(max_entries=32, on_evict=lambda key, op: reset())
+    key = OpCacheKey.create("layernorm_linear", params, input.dtype, input.device)
+    compiled = cache.get_or_create(key, lambda: torch.compile(op))
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 32
+
+
+@dataclass(frozen=True)
+class OpCacheKey:
+    """Everything that determines one compiled op specialization."""
+
+    op_name: str
+    parameters: Tuple[Tuple[str, Any], ...]
+    dtype: str
+    device: str
+
+    @classmethod
+    def create(
+        cls,
+        op_name: str,
+        parameters: Mapping[str, Any],
+        dtype: Any,
+        device: Any,
+    ) -> "OpCacheKey":
+        """Build a key from the op parameters and torch dtype/device."""
+        return cls(
+            op_name=op_name,
+            parameters=tuple(sorted(parameters.items())),
+            dtype=str(dtype),
+            device=str(device),
+        )
+
+
+@dataclass
+class LRUOpCache:
+    """Least-recently-used cache of compiled ops with hit/miss counters.
+
+    `on_evict(key, value)` runs after each eviction, for state the compiled
+    op holds outside this cache.
+    """
+
+    max_entries: int = DEFAULT_MAX_ENTRIES
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    on_evict: Optional[Callable[[OpCacheKey, Any], None]] = None
+    _entries: "OrderedDict[OpCacheKey, Any]" = field(
+        default_factory=OrderedDict
+    )
+
+    def __post_init__(self):
+        if self.max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+    def get_or_create(self, key: OpCacheKey, create: Callable[[], Any]) -> Any:
+        """Return the op for `key`, calling `create()` only on a miss."""
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        value = create()
+        self._entries[key] = value
+        self._evict()
+        return value
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            key, value = self._entries.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(key, value)
+
+    def resize(self, max_entries: int) -> None:
+        """Change the bound, evicting the oldest entries if it shrank."""
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self._evict()
+
+    def __contains__(self, key: OpCacheKey) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> List[OpCacheKey]:
+        """Cached keys from least to most recently used."""
+        return list(self._entries)
+
+    def clear(self) -> None:
+        """Drop all entries (the counters are kept)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
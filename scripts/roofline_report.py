@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Roofline report generated from measured benchmark data (p17-p22)
+
+book/src/puzzle_16/roofline_viz.py animates a roofline with hard-coded A100
+peaks. This tool builds the same model from real numbers instead:
+
+- Timings come from JSON files written by the shared benchmark harness
+  (scripts/benchmark.py, `--benchmark-json` on the puzzle entry points).
+- FLOP and byte counts come from each result. When a result has none, they
+  are derived from its `params` with the per-op formulas in `OP_COSTS`.
+- Peaks come from the JSON metadata: `save_json` records the name and roof
+  of each device on the machine that ran the benchmarks (`GPUSpecs` datasheet
+  peaks for GPUs, a STREAM-style triad and a matmul probe for CPUs).
+  --peak-gflops/--peak-gbs override the GPU roof. Files written before the
+  peaks were recorded fall back to probing the host running the report.
+
+The output is a table that marks each kernel as memory- or compute-bound and
+shows its percentage of the attainable roof, plus a static SVG chart.
+
+Usage:
+    python solutions/p19/p19.py --benchmark --benchmark-json bench/p19.json
+    python scripts/roofline_report.py bench/*.json --out bench/roofline
+
+    # Unknown GPU or custom clocks: pass the peaks explicitly
+    python scripts/roofline_report.py bench/p18.json --peak-gflops 19500 --peak-gbs 1555
+"""
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+sys.path.append(str(Path(__file__).parent))
+
+F32 = 4  # bytes per float32 element
+
+# (flops, bytes moved) per call, from the `params` recorded with a result
+OP_COSTS: Dict[str, Callable[[dict], Tuple[int, int]]] = {
+    "conv1d": lambda p: (
+        2 * p["input_size"] * p["conv_size"],
+        F32 * (2 * p["input_size"] + p["conv_size"]),
+    ),
+    "softmax": lambda p: (4 * p["input_size"], F32 * 2 * p["input_size"]),
+    "softmax_batched": lambda p: (
+        4 * p["rows"] * p["cols"],
+        F32 * 2 * p["rows"] * p["cols"],
+    ),
+    "attention": lambda p: _attention_cost(1, 1, p["seq_len"], p["d"]),
+    "attention_online": lambda p: _attention_cost(1, 1, p["seq_len"], p["d"]),
+    "attention_batched": lambda p: _attention_cost(
+        p["groups"], p["n_queries"], p["seq_len"], p["d"]
+    ),
+    # Gathers only: no arithmetic, every output element read and written once
+    "embedding_1d": lambda p: (0, _embedding_bytes(p)),
+    "embedding_2d": lambda p: (0, _embedding_bytes(p)),
+    "layernorm_linear": lambda p: _layernorm_linear_cost(p),
+}
+
+
+def _attention_cost(groups: int, n_queries: int, seq_len: int, d: int):
+    flops = groups * n_queries * seq_len * (4 * d + 4)
+    bytes_moved = F32 * groups * (2 * n_queries * d + 2 * seq_len * d)
+    return flops, bytes_moved
+
+
+def _embedding_bytes(p: dict) -> int:
+    tokens = p["batch_size"] * p["seq_len"]
+    return F32 * tokens * (2 * p["embed_dim"] + 1)
+
+
+def _layernorm_linear_cost(p: dict) -> Tuple[int, int]:
+    tokens = p["batch_size"] * p["seq_len"]
+    hidden, out = p["hidden_dim"], p["output_dim"]
+    # ~8 flops per element for mean/variance/normalize/affine, then the GEMM
+    flops = tokens * (8 * hidden + 2 * hidden * out + out)
+    bytes_moved = F32 * (
+        tokens * hidden + 2 * hidden + hidden * out + out + tokens * out
+    )
+    return flops, bytes_moved
+
+
+def op_cost(name: str, params: dict) -> Optional[Tuple[int, int]]:
+    """Cost from `OP_COSTS`, matching the longest known prefix of `name`."""
+    for key in sorted(OP_COSTS, key=len, reverse=True):
+        if name == key or name.startswith(key + "_"):
+            try:
+                return OP_COSTS[key](params)
+            except KeyError:
+                return None
+    return None
+
+
+@dataclass
+class Peaks:
+    """Roof of one device: compute ceiling and memory slope."""
+
+    device: str
+    gflops: float
+    gbs: float
+    source: str
+
+    @property
+    def ridge_point(self) -> float:
+        """Arithmetic intensity (FLOP/byte) where the two roofs meet."""
+        return self.gflops / self.gbs
+
+    def attainable(self, intensity: float) -> float:
+        return min(self.gflops, intensity * self.gbs)
+
+
+@dataclass
+class RooflinePoint:
+    name: str
+    device: str
+    params: dict
+    median_s: float
+    flops: int
+    bytes_moved: int
+    peaks: Peaks
+
+    @property
+    def intensity(self) -> float:
+        return self.flops / self.bytes_moved if self.bytes_moved else math.inf
+
+    @property
+    def gflops(self) -> float:
+        if self.median_s <= 0:
+            return math.inf
+        return self.flops / self.median_s / 1e9
+
+    @property
+    def gbs(self) -> float:
+        if self.median_s <= 0:
+            return math.inf
+        return self.bytes_moved / self.median_s / 1e9
+
+    @property
+    def bound(self) -> str:
+        if self.intensity < self.peaks.ridge_point:
+            return "memory"
+        return "compute"
+
+    @property
+    def fraction_of_roof(self) -> float:
+        """Achieved / attainable; bandwidth-based for kernels without flops."""
+        if self.flops == 0:
+            return self.gbs / self.peaks.gbs
+        return self.gflops / self.peaks.attainable(self.intensity)
+
+
+def normalize_device(device: str) -> str:
+    device = device.split(":")[0].lower()
+    return "gpu" if device in ("cuda", "gpu", "accelerator") else device
+
+
+def _local_gpu_specs():
+    from gpu_specs import get_gpu_specs
+
+    try:
+        return get_gpu_specs()
+    except Exception:
+        return None
+
+
+def gpu_peaks(
+    gflops: Optional[float] = None, gbs: Optional[float] = None
+) -> Optional[Peaks]:
+    """GPU roof from explicit values, else from this host's GPUSpecs peaks."""
+    source = "command line"
+    if gflops is None or gbs is None:
+        specs = _local_gpu_specs()
+        if specs is None or specs.peak_fp32_tflops is None:
+            return None
+        gflops = gflops if gflops is not None else specs.peak_fp32_tflops * 1e3
+        gbs = gbs if gbs is not None else specs.memory_bandwidth_gbs
+        source = f"GPUSpecs: {specs.device_name}"
+    return Peaks("gpu", gflops, gbs, source)
+
+
+def measure_cpu_peaks(
+    elements: int = 1 << 24, matmul_size: int = 1024, repeats: int = 5
+) -> Peaks:
+    """Measure the CPU roof with a STREAM triad and a float32 matmul.
+
+    Both probes keep the best of `repeats` runs, as STREAM does.
+    """
+    import numpy as np
+
+    b = np.random.rand(elements).astype(np.float32)
+    c = np.random.rand(elements).astype(np.float32)
+    a = np.empty_like(b)
+    best = math.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        # a = b + 3 * c in place: read c, write a, then read a and b, write a
+        np.multiply(c, 3.0, out=a)
+        np.add(a, b, out=a)
+        best = min(best, time.perf_counter() - start)
+    gbs = 5 * F32 * elements / best / 1e9
+
+    x = np.random.rand(matmul_size, matmul_size).astype(np.float32)
+    y = np.random.rand(matmul_size, matmul_size).astype(np.float32)
+    np.matmul(x, y)
+    best = math.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        np.matmul(x, y)
+        best = min(best, time.perf_counter() - start)
+    gflops = 2 * matmul_size**3 / best / 1e9
+
+    return Peaks("cpu", gflops, gbs, "measured (STREAM triad, matmul)")
+
+
+def record_peaks(devices: Iterable[str]) -> Dict[str, dict]:
+    """Name and roof of this host's devices, for benchmark JSON metadata.
+
+    `save_json` stores this next to the results, so the report uses the
+    machine that ran the benchmarks rather than the one it runs on. A GPU
+    without datasheet peaks is recorded by name with null peaks.
+    """
+    recorded = {}
+    for device in sorted({normalize_device(d) for d in devices}):
+        if device == "gpu":
+            specs = _local_gpu_specs()
+            if specs is None:
+                continue
+            gflops = specs.peak_fp32_tflops
+            recorded[device] = {
+                "name": specs.device_name,
+                "peak_gflops": None if gflops is None else gflops * 1e3,
+                "peak_gbs": specs.memory_bandwidth_gbs,
+                "source": "GPUSpecs",
+            }
+        elif device == "cpu":
+            peaks = measure_cpu_peaks()
+            recorded[device] = {
+                "name": platform.processor() or platform.machine(),
+                "peak_gflops": peaks.gflops,
+                "peak_gbs": peaks.gbs,
+                "source": peaks.source,
+            }
+    return recorded
+
+
+def recorded_peaks(metadata: dict) -> Dict[str, Peaks]:
+    """Peaks stored by `record_peaks`, skipping devices without both."""
+    peaks = {}
+    for device, info in metadata.get("devices", {}).items():
+        gflops, gbs = info.get("peak_gflops"), info.get("peak_gbs")
+        if gflops and gbs:
+            source = f"recorded: {info.get('name')} ({info.get('source')})"
+            peaks[device] = Peaks(device, gflops, gbs, source)
+    return peaks
+
+
+def load_results(
+    paths: Sequence[Path],
+) -> Tuple[List[dict], Dict[str, Peaks]]:
+    """All results, plus the peaks recorded in the files' metadata.
+
+    When files disagree about a device's roof, the first file wins.
+    """
+    results: List[dict] = []
+    peaks: Dict[str, Peaks] = {}
+    for path in paths:
+        payload = json.loads(Path(path).read_text())
+        results.extend(payload["results"])
+        for device, pk in recorded_peaks(payload.get("metadata", {})).items():
+            if device not in peaks:
+                peaks[device] = pk
+                continue
+            first = peaks[device]
+            if (pk.gflops, pk.gbs) != (first.gflops, first.gbs):
+                print(
+                    f"Warning: {path} records different {device} peaks"
+                    f" ({pk.source}); using {first.source}",
+                    file=sys.stderr,
+                )
+    return results, peaks
+
+
+def resolve_peaks(
+    devices: Iterable[str],
+    recorded: Dict[str, Peaks],
+    peak_gflops: Optional[float] = None,
+    peak_gbs: Optional[float] = None,
+) -> Dict[str, Peaks]:
+    """Roof per device: command line, then JSON metadata, then this host."""
+    peaks: Dict[str, Peaks] = {}
+    devices = set(devices)
+    if "gpu" in devices:
+        gpu = recorded.get("gpu")
+        overridden = peak_gflops is not None or peak_gbs is not None
+        if gpu is not None and overridden:
+            gpu = Peaks(
+                "gpu",
+                gpu.gflops if peak_gflops is None else peak_gflops,
+                gpu.gbs if peak_gbs is None else peak_gbs,
+                f"command line over {gpu.source}",
+            )
+        if gpu is None:
+            if peak_gflops is None or peak_gbs is None:
+                print(
+                    "Warning: no GPU peaks recorded with the results; using"
+                    " this host's GPU",
+                    file=sys.stderr,
+                )
+            gpu = gpu_peaks(peak_gflops, peak_gbs)
+        if gpu is None:
+            print(
+                "Warning: unknown GPU peaks; pass --peak-gflops and --peak-gbs",
+                file=sys.stderr,
+            )
+        else:
+            peaks["gpu"] = gpu
+    if "cpu" in devices:
+        if "cpu" in recorded:
+            peaks["cpu"] = recorded["cpu"]
+        else:
+            print(
+                "No CPU peaks recorded with the results; measuring this"
+                " host...",
+                file=sys.stderr,
+            )
+            peaks["cpu"] = measure_cpu_peaks()
+    return peaks
+
+
+def analyze(
+    results: Sequence[dict], peaks: Dict[str, Peaks]
+) -> Tuple[List[RooflinePoint], List[str]]:
+    """Place each result on its device's roof; also return skipped reasons."""
+    points, skipped = [], []
+    for result in results:
+        name = result["name"]
+        device = normalize_device(result.get("device", "cpu"))
+        params = result.get("params", {})
+        flops, bytes_moved = result.get("flops"), result.get("bytes_moved")
+        if flops is None or bytes_moved is None:
+            cost = op_cost(name, params)
+            if cost is None:
+                skipped.append(f"{name}: no FLOP/byte counts")
+                continue
+            flops = cost[0] if flops is None else flops
+            bytes_moved = cost[1] if bytes_moved is None else bytes_moved
+        if device not in peaks:
+            skipped.append(f"{name}: no peak numbers for device '{device}'")
+            continue
+        if result["median_s"] <= 0:
+            skipped.append(f"{name}: median time is zero")
+            continue
+        points.append(
+            RooflinePoint(
+                name=name,
+                device=device,
+                params=params,
+                median_s=result["median_s"],
+                flops=flops,
+                bytes_moved=bytes_moved,
+                peaks=peaks[device],
+            )
+        )
+    return points, skipped
+
+
+def format_table(points: Sequence[RooflinePoint]) -> str:
+    """Markdown table, one row per measured kernel."""
+    lines = [
+        "| kernel | device | params | FLOP/byte | GFLOP/s | GB/s"
+        " | bound | % of roof |",
+        "|---|---|---|---:|---:|---:|---|---:|",
+    ]
+    for p in points:
+        params = ", ".join(f"{k}={v}" for k, v in p.params.items())
+        lines.append(
+            f"| {p.name} | {p.device} | {params} | {p.intensity:.3f}"
+            f" | {p.gflops:.2f} | {p.gbs:.2f} | {p.bound}"
+            f" | {100 * p.fraction_of_roof:.1f}% |"
+        )
+    return "\n".join(lines)
+
+
+def format_peaks(peaks: Dict[str, Peaks]) -> str:
+    return "\n".join(
+        f"- {p.device}: {p.gflops:.0f} GFLOP/s, {p.gbs:.0f} GB/s,"
+        f" ridge at {p.ridge_point:.2f} FLOP/byte ({p.source})"
+        for p in peaks.values()
+    )
+
+
+def render_svg(
+    points: Sequence[RooflinePoint],
+    peaks: Dict[str, Peaks],
+    path: Path,
+    width: int = 900,
+    height: int = 560,
+) -> None:
+    """Log-log roofline chart with one roof per device."""
+    colors = {"gpu": "#2a7ab9", "cpu": "#d1495b"}
+    left, right, top, bottom = 80, 30, 30, 60
+
+    # Kernels without flops, or without bytes (infinite intensity), have no
+    # place on a log intensity axis
+    plotted = [
+        p for p in points if p.flops > 0 and math.isfinite(p.intensity)
+    ]
+    intensities = [p.intensity for p in plotted]
+    intensities += [pk.ridge_point for pk in peaks.values()]
+    perf = [p.gflops for p in plotted]
+    perf += [pk.gflops for pk in peaks.values()]
+    x_min = 10 ** math.floor(math.log10(min(intensities + [1.0]) / 2))
+    x_max = 10 ** math.ceil(math.log10(max(intensities) * 4))
+    y_max = 10 ** math.ceil(math.log10(max(perf) * 2))
+    y_min = 10 ** math.floor(
+        math.log10(
+            min(perf + [pk.attainable(x_min) for pk in peaks.values()])
+        )
+    )
+
+    def sx(x: float) -> float:
+        frac = math.log10(x / x_min) / math.log10(x_max / x_min)
+        return left + frac * (width - left - right)
+
+    def sy(y: float) -> float:
+        frac = math.log10(y / y_min) / math.log10(y_max / y_min)
+        return height - bottom - frac * (height - top - bottom)
+
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}"'
+        f' height="{height}" font-family="sans-serif" font-size="12">',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+    ]
+    for exp in range(round(math.log10(x_min)), round(math.log10(x_max)) + 1):
+        x = sx(10.0**exp)
+        out.append(
+            f'<line x1="{x:.1f}" y1="{top}" x2="{x:.1f}"'
+            f' y2="{height - bottom}" stroke="#eee"/>'
+        )
+        out.append(
+            f'<text x="{x:.1f}" y="{height - bottom + 18}"'
+            f' text-anchor="middle">1e{exp}</text>'
+        )
+    for exp in range(round(math.log10(y_min)), round(math.log10(y_max)) + 1):
+        y = sy(10.0**exp)
+        out.append(
+            f'<line x1="{left}" y1="{y:.1f}" x2="{width - right}"'
+            f' y2="{y:.1f}" stroke="#eee"/>'
+        )
+        out.append(
+            f'<text x="{left - 8}" y="{y + 4:.1f}" text-anchor="end">'
+            f"1e{exp}</text>"
+        )
+    out.append(
+        f'<text x="{(left + width - right) / 2}" y="{height - 15}"'
+        ' text-anchor="middle">Arithmetic intensity (FLOP/byte)</text>'
+    )
+    out.append(
+        f'<text x="20" y="{(top + height - bottom) / 2}" text-anchor="middle"'
+        f' transform="rotate(-90 20 {(top + height - bottom) / 2})">'
+        "Performance (GFLOP/s)</text>"
+    )
+
+    for pk in peaks.values():
+        color = colors.get(pk.device, "#555")
+        corners = [x_min, pk.ridge_point, x_max]
+        roof = " ".join(
+            f"{sx(x):.1f},{sy(pk.attainable(x)):.1f}" for x in corners
+        )
+        out.append(
+            f'<polyline points="{roof}" fill="none" stroke="{color}"'
+            ' stroke-width="2"/>'
+        )
+        out.append(
+            f'<text x="{width - right - 4}" y="{sy(pk.gflops) - 6:.1f}"'
+            f' text-anchor="end" fill="{color}">{pk.device}:'
+            f" {pk.gflops:.0f} GFLOP/s, {pk.gbs:.0f} GB/s</text>"
+        )
+
+    for p in plotted:
+        color = colors.get(p.device, "#555")
+        x, y = sx(p.intensity), sy(p.gflops)
+        out.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="4" fill="{color}"/>')
+        out.append(f'<text x="{x + 6:.1f}" y="{y - 6:.1f}">{p.name}</text>')
+
+    out.append("</svg>")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(out))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Roofline report from benchmark JSON files"
+    )
+    parser.add_argument("results", nargs="+", type=Path, help="benchmark JSON")
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=Path("roofline"),
+        help="output prefix for <out>.svg and <out>.md (default: roofline)",
+    )
+    parser.add_argument("--peak-gflops", type=float, help="GPU FP32 GFLOP/s")
+    parser.add_argument("--peak-gbs", type=float, help="GPU bandwidth GB/s")
+    args = parser.parse_args(argv)
+
+    results, recorded = load_results(args.results)
+    devices = {normalize_device(r.get("device", "cpu")) for r in results}
+    peaks = resolve_peaks(devices, recorded, args.peak_gflops, args.peak_gbs)
+
+    points, skipped = analyze(results, peaks)
+    for reason in skipped:
+        print(f"Skipped {reason}", file=sys.stderr)
+    if not points:
+        print("No results could be placed on a roofline", file=sys.stderr)
+        return 1
+
+    report = "\n\n".join(
+        ["# Roofline report", format_peaks(peaks), format_table(points)]
+    )
+    print(report)
+    md_path = args.out.with_suffix(".md")
+    svg_path = args.out.with_suffix(".svg")
+    md_path.parent.mkdir(parents=True, exist_ok=True)
+    md_path.write_text(report + f"\n\n![roofline]({svg_path.name})\n")
+    render_svg(points, peaks, svg_path)
+    print(f"\nWrote {md_path} and {svg_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Reusable output and gradient buffers for repeated op calls (p22)
+
+A training step through the p22 backward path used to allocate a fresh
+forward output, a `grad_output` and five zero-filled gradient tensors on every
+call. The allocations churn the caching allocator and every `zeros_like` is an
+extra fill kernel, even though the shapes never change between steps.
+
+`TensorArena` owns one buffer per (name, shape, dtype, device) and hands the
+same buffer out again on the next call:
+
+- `get` returns an uninitialized buffer, for outputs the kernel overwrites.
+- `init` runs only when the buffer is first created, for inputs that stay
+  constant across calls (for example a ones `grad_output`).
+
+Buffers from an arena are only valid until the next call that asks for the
+same name and shape; copy anything that must outlive the step.
+
+Usage:
+    def allocate(shape, dtype, device):
+        return torch.empty(shape, dtype=dtype, device=device)
+
+    arena = TensorArena(allocate)
+    output = arena.get("output", (B, S, O), input.dtype, input.device)
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+ArenaKey = Tuple[str, Tuple[int, ...], str, str]
+
+
+@dataclass
+class TensorArena:
+    """Named, shape-keyed buffers that are allocated once and then reused."""
+
+    allocate: Callable[[Tuple[int, ...], Any, Any], Any]
+    allocations: int = 0
+    reuses: int = 0
+    _buffers: Dict[ArenaKey, Any] = field(default_factory=dict)
+
+    def get(
+        self,
+        name: str,
+        shape: Sequence[int],
+        dtype: Any,
+        device: Any,
+        init: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """Buffer for `name` with this shape, dtype and device.
+
+        The contents are whatever the previous user left behind, except on
+        first allocation, when `init(buffer)` is called if given.
+        """
+        shape = tuple(int(dim) for dim in shape)
+        key = (name, shape, str(dtype), str(device))
+        buffer = self._buffers.get(key)
+        if buffer is not None:
+            self.reuses += 1
+            return buffer
+
+        self.allocations += 1
+        buffer = self.allocate(shape, dtype, device)
+        if init is not None:
+            init(buffer)
+        self._buffers[key] = buffer
+        return buffer
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def nbytes(self) -> int:
+        """Total size of the buffers currently owned by the arena."""
+        return sum(int(buffer.nbytes) for buffer in self._buffers.values())
+
+    def clear(self) -> None:
+        """Release every buffer (the counters are kept)."""
+        self._buffers.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffers": len(self._buffers),
+            "bytes": self.nbytes(),
+            "allocations": self.allocations,
+            "reuses": self.reuses,
+        }
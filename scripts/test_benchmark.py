@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Unit tests for benchmark.py
+
+Uses a fake clock so iteration counts and statistics are deterministic.
+"""
+
+import csv
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from benchmark import (
+    BenchmarkResult,
+    benchmark,
+    benchmark_json_path,
+    load_json,
+    percentile,
+    save_csv,
+    save_json,
+)
+
+
+class FakeClock:
+    """Each call to the benchmarked function advances time by `step`."""
+
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+        self.calls = 0
+
+    def __call__(self):
+        return self.now
+
+    def work(self):
+        self.calls += 1
+        self.now += self.step
+
+
+def test_percentile_matches_numpy_linear():
+    """p95 uses linear interpolation between ranks"""
+    print("Testing percentile...")
+    values = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert percentile(values, 50) == 3.0
+    assert abs(percentile(values, 95) - 4.8) < 1e-12
+    assert percentile([7.0], 95) == 7.0
+    print("  ✓ Percentiles match NumPy's default method")
+
+
+def test_adaptive_iterations():
+    """Fast calls run more iterations, bounded by min/max"""
+    print("Testing adaptive iteration count...")
+    clock = FakeClock(step=0.01)
+    result = benchmark(
+        "fast", clock.work, warmup=2, min_time_s=0.2, timer=clock
+    )
+    assert result.iterations == 20, f"Got {result.iterations}"
+    assert clock.calls == 22, "Warmup calls must not be timed"
+
+    slow = FakeClock(step=1.0)
+    result = benchmark("slow", slow.work, min_iterations=5, timer=slow)
+    assert result.iterations == 5
+
+    tiny = FakeClock(step=1e-9)
+    result = benchmark("tiny", tiny.work, max_iterations=100, timer=tiny)
+    assert result.iterations == 100
+    print("  ✓ Iterations fill min_time_s within bounds")
+
+
+def test_sync_called_per_iteration():
+    """The device is synchronized after every call"""
+    print("Testing sync...")
+    clock = FakeClock(step=0.1)
+    syncs = []
+    result = benchmark(
+        "synced",
+        clock.work,
+        sync=lambda: syncs.append(1),
+        warmup=1,
+        min_iterations=3,
+        min_time_s=0,
+        timer=clock,
+    )
+    assert len(syncs) == 1 + result.iterations
+    print("  ✓ Sync runs after each warmup and timed call")
+
+
+def test_statistics_and_throughput():
+    """Median/p95/stddev and GB/s, GFLOP/s from the median time"""
+    print("Testing statistics...")
+    result = BenchmarkResult(
+        name="op",
+        device="cpu",
+        iterations=4,
+        times_s=[0.001, 0.002, 0.002, 0.003],
+        bytes_moved=4_000_000,
+        flops=2_000_000_000,
+    )
+    assert result.median_s == 0.002
+    assert abs(result.gb_per_s - 2.0) < 1e-9
+    assert abs(result.gflop_per_s - 1000.0) < 1e-6
+    assert result.stddev_s > 0
+    assert BenchmarkResult("op", "cpu", 1, [0.5]).stddev_s == 0.0
+    assert BenchmarkResult("op", "cpu", 1, [0.5]).gb_per_s is None
+    print("  ✓ Statistics and throughput are consistent")
+
+
+def test_json_round_trip():
+    """Saved results can be read back without the raw timings"""
+    print("Testing JSON output...")
+    result = BenchmarkResult(
+        "op", "gpu", 2, [0.1, 0.3], bytes_moved=10, params={"n": 4}
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "nested" / "bench.json"
+        save_json([result], path)
+        (loaded,) = load_json(path)
+        metadata = json.loads(path.read_text())["metadata"]
+    assert loaded["name"] == "op"
+    assert loaded["params"] == {"n": 4}
+    assert abs(loaded["median_s"] - 0.2) < 1e-12
+    assert "times_s" not in loaded
+    # Device names and peaks (none here without a GPU) go with the results
+    assert isinstance(metadata["devices"], dict)
+    assert benchmark_json_path(["--benchmark", "--benchmark-json", "x.json"])
+    assert benchmark_json_path(["--benchmark"]) is None
+    print("  ✓ JSON round trip keeps summary statistics")
+
+
+def test_csv_output():
+    """CSV has the summary columns plus one column per params key"""
+    print("Testing CSV output...")
+    results = [
+        BenchmarkResult("a", "cpu", 2, [0.1, 0.3], params={"hidden_dim": 8}),
+        BenchmarkResult(
+            "b", "gpu", 1, [0.5], bytes_moved=10**9, params={"algorithm": "x"}
+        ),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "nested" / "bench.csv"
+        save_csv(results, path)
+        with path.open(newline="") as handle:
+            rows = list(csv.DictReader(handle))
+    assert [row["name"] for row in rows] == ["a", "b"]
+    assert abs(float(rows[0]["median_s"]) - 0.2) < 1e-12
+    assert rows[0]["hidden_dim"] == "8" and rows[0]["algorithm"] == ""
+    assert rows[1]["algorithm"] == "x" and rows[1]["hidden_dim"] == ""
+    assert abs(float(rows[1]["gb_per_s"]) - 2.0) < 1e-9
+    assert "times_s" not in rows[0]
+    print("  ✓ CSV rows carry statistics and params")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 70)
+    print("Benchmark Harness Unit Tests")
+    print("=" * 70)
+    print()
+
+    tests = [
+        test_percentile_matches_numpy_linear,
+        test_adaptive_iterations,
+        test_sync_called_per_iteration,
+        test_statistics_and_throughput,
+        test_json_round_trip,
+        test_csv_output,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+            print()
+        except AssertionError as e:
+            print(f"  ✗ FAILED: {e}")
+            print()
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ ERROR: {e}")
+            print()
+            failed += 1
+
+    print("=" * 70)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 70)
+
+    if failed > 0:
+        sys.exit(1)
+    else:
+        print("\n✓ All tests passed!")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Unit tests for conv_reference.py
+
+Compares both vectorized methods against the original nested-loop reference.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from conv_reference import conv1d_reference
+
+
+def loop_reference(input_array, kernel_array):
+    """The nested loop p17/p20 used before, kept as the oracle."""
+    expected = np.zeros_like(input_array, dtype=np.float32)
+    for i in range(len(input_array)):
+        for j in range(len(kernel_array)):
+            if i + j < len(input_array):
+                expected[i] += input_array[i + j] * kernel_array[j]
+    return expected
+
+
+def test_puzzle_sizes():
+    """The p17/p20 example (15 inputs, 4 taps) matches exactly"""
+    print("Testing puzzle sizes...")
+    input_array = np.arange(15, dtype=np.float32)
+    kernel = np.arange(4, dtype=np.float32)
+    expected = loop_reference(input_array, kernel)
+    for method in ["auto", "shift", "fft"]:
+        result = conv1d_reference(input_array, kernel, method)
+        np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-4)
+    assert conv1d_reference(input_array, kernel).dtype == np.float32
+    print("  ✓ Shift and FFT match the loop reference")
+
+
+def test_padding_edge_cases():
+    """Kernels longer than the input and random data keep zero padding"""
+    print("Testing zero padding...")
+    rng = np.random.default_rng(0)
+    for size, taps in [(1, 1), (5, 9), (100, 100), (257, 3), (300, 130)]:
+        input_array = rng.standard_normal(size).astype(np.float32)
+        kernel = rng.standard_normal(taps).astype(np.float32)
+        expected = loop_reference(input_array, kernel)
+        for method in ["shift", "fft"]:
+            result = conv1d_reference(input_array, kernel, method)
+            np.testing.assert_allclose(result, expected, rtol=1e-4, atol=1e-4)
+    print("  ✓ Output length and padding semantics preserved")
+
+
+def test_invalid_arguments():
+    """Non-1-D inputs and unknown methods are rejected"""
+    print("Testing argument checks...")
+    for args in [
+        (np.zeros((2, 2)), np.zeros(2)),
+        (np.zeros(4), np.zeros(2), "direct"),
+    ]:
+        try:
+            conv1d_reference(*args)
+        except ValueError:
+            continue
+        raise AssertionError(f"Expected ValueError for {args}")
+    print("  ✓ Invalid arguments raise ValueError")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 70)
+    print("Conv1D Reference Unit Tests")
+    print("=" * 70)
+    print()
+
+    tests = [
+        test_puzzle_sizes,
+        test_padding_edge_cases,
+        test_invalid_arguments,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+            print()
+        except AssertionError as e:
+            print(f"  ✗ FAILED: {e}")
+            print()
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ ERROR: {e}")
+            print()
+            failed += 1
+
+    print("=" * 70)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 70)
+
+    if failed > 0:
+        sys.exit(1)
+    else:
+        print("\n✓ All tests passed!")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
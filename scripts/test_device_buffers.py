@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Unit tests for device_buffers.py
+
+Uses fake device/buffer objects so the transfer logic can be tested without MAX.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from device_buffers import as_device_buffer, finish, wants_host_copy
+
+HOST = SimpleNamespace(label="cpu", id=0, is_host=True)
+GPU0 = SimpleNamespace(label="gpu", id=0, is_host=False)
+GPU1 = SimpleNamespace(label="gpu", id=1, is_host=False)
+
+
+class FakeDType:
+    """Stand-in for a MAX DType with its NumPy equivalent."""
+
+    def __init__(self, numpy_dtype):
+        self.numpy_dtype = np.dtype(numpy_dtype)
+
+    def to_numpy(self):
+        return self.numpy_dtype
+
+
+FLOAT32 = FakeDType(np.float32)
+FLOAT64 = FakeDType(np.float64)
+
+
+class FakeBuffer:
+    def __init__(self, device, dtype=FLOAT32):
+        self.device = device
+        self.dtype = dtype
+        self.copies = 0
+
+    def to(self, device):
+        moved = FakeBuffer(device, self.dtype)
+        moved.copies = self.copies + 1
+        return moved
+
+
+def test_resident_buffer_is_not_copied():
+    """A buffer already on the target device is passed through"""
+    print("Testing resident passthrough...")
+    buf = FakeBuffer(SimpleNamespace(label="gpu", id=0, is_host=False))
+    assert as_device_buffer(buf, GPU0) is buf
+    print("  ✓ Resident buffer reused")
+
+
+def test_buffer_on_other_device_is_moved():
+    """A buffer on another device is copied once"""
+    print("Testing cross-device move...")
+    buf = FakeBuffer(GPU0)
+    moved = as_device_buffer(buf, GPU1)
+    assert moved is not buf
+    assert moved.device is GPU1
+    assert moved.copies == 1
+    print("  ✓ Buffer moved to target device")
+
+
+def test_dtype_mismatch_is_rejected():
+    """Inputs of another dtype raise instead of being reinterpreted"""
+    print("Testing dtype validation...")
+    buf = FakeBuffer(GPU0)
+    assert as_device_buffer(buf, GPU0, FLOAT32) is buf
+    for value in (FakeBuffer(GPU0, FLOAT64), np.zeros(4, dtype=np.float64)):
+        try:
+            as_device_buffer(value, GPU0, FLOAT32)
+        except TypeError:
+            continue
+        raise AssertionError(f"accepted a {value.dtype} input")
+    print("  ✓ float64 arrays and buffers rejected for a float32 graph")
+
+
+def test_host_copy_default_follows_inputs():
+    """to_host=None copies back only when a NumPy array was passed in"""
+    print("Testing host-copy default...")
+    array = np.zeros(4, dtype=np.float32)
+    buf = FakeBuffer(GPU0)
+    assert wants_host_copy(None, [array])
+    assert wants_host_copy(None, [buf, array])
+    assert not wants_host_copy(None, [buf, buf])
+    assert wants_host_copy(True, [buf])
+    assert not wants_host_copy(False, [array])
+    print("  ✓ Host copy only for NumPy callers unless overridden")
+
+
+def test_finish_skips_copy_when_not_needed():
+    """Results stay put unless a host copy is requested and needed"""
+    print("Testing finish...")
+    on_gpu = FakeBuffer(GPU0)
+    on_host = FakeBuffer(HOST)
+    assert finish(on_gpu, to_host=False) is on_gpu
+    assert finish(on_host, to_host=True) is on_host
+    print("  ✓ No copy when the result is already where it is wanted")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 70)
+    print("Device Buffer Unit Tests")
+    print("=" * 70)
+    print()
+
+    tests = [
+        test_resident_buffer_is_not_copied,
+        test_buffer_on_other_device_is_moved,
+        test_dtype_mismatch_is_rejected,
+        test_host_copy_default_follows_inputs,
+        test_finish_skips_copy_when_not_needed,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+            print()
+        except AssertionError as e:
+            print(f"  ✗ FAILED: {e}")
+            print()
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ ERROR: {e}")
+            print()
+            failed += 1
+
+    print("=" * 70)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 70)
+
+    if failed > 0:
+        sys.exit(1)
+    else:
+        print("\n✓ All tests passed!")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Unit tests for graph_cache.py
+
+Uses fake session/model objects so the cache logic can be tested without MAX.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent))
+from graph_cache import GraphCache, GraphKey, source_hash
+
+
+class FakeModel:
+    def __init__(self, origin):
+        self.origin = origin
+
+    def _export_mef(self, path):
+        Path(path).write_text("mef")
+
+
+class FakeSession:
+    def __init__(self):
+        self.loads = []
+
+    def load(self, model, custom_extensions=None):
+        self.loads.append(model)
+        origin = "disk" if isinstance(model, Path) else "graph"
+        return FakeModel(origin)
+
+
+def make_op_dir(root: Path, body: str = "fn kernel(): pass") -> Path:
+    op_dir = root / "op"
+    op_dir.mkdir(exist_ok=True)
+    (op_dir / "kernel.mojo").write_text(body)
+    return op_dir
+
+
+def make_key(op_dir: Path, shape=(128,)) -> GraphKey:
+    device = SimpleNamespace(label="cpu", id=0)
+    return GraphKey.create("softmax", [shape], "float32", device, op_dir)
+
+
+def test_source_hash_changes_with_sources():
+    """Editing a kernel must change the key"""
+    print("Testing source hash...")
+    with tempfile.TemporaryDirectory() as tmp:
+        op_dir = make_op_dir(Path(tmp))
+        before = source_hash(op_dir)
+        assert before == source_hash(op_dir), "Hash should be stable"
+        make_op_dir(Path(tmp), "fn kernel(): return")
+        assert before != source_hash(op_dir), "Hash should change on edit"
+    print("  ✓ Source hash tracks kernel edits")
+
+
+def test_key_includes_shapes():
+    """Different shapes must not share a compiled model"""
+    print("Testing key shapes...")
+    with tempfile.TemporaryDirectory() as tmp:
+        op_dir = make_op_dir(Path(tmp))
+        assert make_key(op_dir, (128,)) != make_key(op_dir, (256,))
+        assert make_key(op_dir).digest() == make_key(op_dir).digest()
+    print("  ✓ Keys distinguish shapes")
+
+
+def test_memory_hit():
+    """Second load for the same key and session must not compile"""
+    print("Testing memory cache...")
+    with tempfile.TemporaryDirectory() as tmp:
+        op_dir = make_op_dir(Path(tmp))
+        cache = GraphCache()
+        session = FakeSession()
+        builds = []
+        build = lambda: builds.append(1) or "graph"
+
+        first = cache.load(session, make_key(op_dir), build, op_dir)
+        second = cache.load(session, make_key(op_dir), build, op_dir)
+
+        assert first is second, "Expected the cached model"
+        assert len(builds) == 1, f"Expected 1 build, got {len(builds)}"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+    print("  ✓ Repeated calls reuse the loaded model")
+
+
+def test_specializations_per_shape():
+    """Each shape is listed once as its own compiled specialization"""
+    print("Testing specialization registry...")
+    with tempfile.TemporaryDirectory() as tmp:
+        op_dir = make_op_dir(Path(tmp))
+        cache = GraphCache()
+        session = FakeSession()
+        for shape in [(128,), (1000,), (128,)]:
+            cache.load(session, make_key(op_dir, shape), lambda: "g", op_dir)
+        device = SimpleNamespace(label="cpu", id=0)
+        other = GraphKey.create(
+            "conv1d", [(15,), (4,)], "float32", device, op_dir
+        )
+        cache.load(session, other, lambda: "g", op_dir)
+
+        shapes = [key.input_shapes for key in cache.specializations("softmax")]
+        assert shapes == [((128,),), ((1000,),)], f"Got {shapes}"
+        assert len(session.loads) == 3, "A seen shape must not recompile"
+        assert other in cache.specializations()
+        assert other not in cache.specializations("softmax")
+    print("  ✓ Registry lists one entry per compiled shape")
+
+
+def test_sessions_are_isolated():
+    """Models are bound to their session and must not leak across sessions"""
+    print("Testing session scoping...")
+    with tempfile.TemporaryDirectory() as tmp:
+        op_dir = make_op_dir(Path(tmp))
+        cache = GraphCache()
+        first = cache.load(FakeSession(), make_key(op_dir), str, op_dir)
+        second = cache.load(FakeSession(), make_key(op_dir), str, op_dir)
+        assert first is not second, "Expected a separate model per session"
+    print("  ✓ Each session gets its own model")
+
+
+def test_disk_cache_survives_new_cache():
+    """A fresh cache (new process) must load the exported MEF"""
+    print("Testing disk cache...")
+    with tempfile.TemporaryDirectory() as tmp:
+        op_dir = make_op_dir(Path(tmp))
+        cache_dir = Path(tmp) / "cache"
+
+        GraphCache(cache_dir).load(FakeSession(), make_key(op_dir), str, op_dir)
+        assert len(list(cache_dir.glob("*.mef"))) == 1, "Expected a MEF file"
+
+        cache = GraphCache(cache_dir)
+        model = cache.load(FakeSession(), make_key(op_dir), str, op_dir)
+        assert model.origin == "disk", "Expected the model to come from disk"
+        assert cache.stats()["disk_hits"] == 1
+        assert cache.stats()["misses"] == 0
+    print("  ✓ Compiled models persist across processes")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 70)
+    print("Graph Cache Unit Tests")
+    print("=" * 70)
+    print()
+
+    tests = [
+        test_source_hash_changes_with_sources,
+        test_key_includes_shapes,
+        test_memory_hit,
+        test_specializations_per_shape,
+        test_sessions_are_isolated,
+        test_disk_cache_survives_new_cache,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+            print()
+        except AssertionError as e:
+            print(f"  ✗ FAILED: {e}")
+            print()
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ ERROR: {e}")
+            print()
+            failed += 1
+
+    print("=" * 70)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 70)
+
+    if failed > 0:
+        sys.exit(1)
+    else:
+        print("\n✓ All tests passed!")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Unit tests for kernel_tuner.py
+
+A fake `measure` returns fixed timings so no kernel has to run.
+"""
+
+import json
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+import kernel_tuner
+from kernel_tuner import KernelTuner
+
+
+class FakeMeasure:
+    """Returns a preset time per candidate and records what was timed."""
+
+    def __init__(self, times):
+        self.times = times
+        self.calls = []
+
+    def __call__(self, fn, sync=None):
+        name = fn()
+        self.calls.append(name)
+        return self.times[name]
+
+
+CANDIDATES = {"1d": lambda: "1d", "2d": lambda: "2d"}
+
+
+def test_picks_fastest_once():
+    """The fastest variant wins and is not re-timed for the same key"""
+    print("Testing selection and caching...")
+    measure = FakeMeasure({"1d": 2.0, "2d": 1.0})
+    tuner = KernelTuner(measure=measure)
+    key = KernelTuner.key(8, 512, 10000, 512, "cuda:0")
+
+    assert tuner.choose(key, CANDIDATES) == "2d"
+    assert tuner.choose(key, CANDIDATES) == "2d"
+    assert measure.calls == ["1d", "2d"], "Cached key was timed again"
+    assert tuner.tuned == 1
+    print("  ✓ Fastest variant cached after one timing pass")
+
+
+def test_keys_are_independent():
+    """Each shape/device key is tuned separately"""
+    print("Testing per-key choices...")
+    tuner = KernelTuner(measure=FakeMeasure({"1d": 1.0, "2d": 2.0}))
+    tuner.choose(KernelTuner.key(1, 2, "cpu"), CANDIDATES)
+    tuner.choose(KernelTuner.key(1, 2, "cuda:0"), CANDIDATES)
+    assert tuner.tuned == 2
+    assert set(tuner.choices()) == {"1|2|cpu", "1|2|cuda:0"}
+    print("  ✓ Keys include every part")
+
+
+def test_persistence():
+    """Choices survive a new tuner that reads the same file"""
+    print("Testing JSON persistence...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "nested" / "tuning.json"
+        KernelTuner(path, measure=FakeMeasure({"1d": 1.0, "2d": 3.0})).choose(
+            "k", CANDIDATES
+        )
+        assert json.loads(path.read_text()) == {"choices": {"k": "1d"}}
+
+        measure = FakeMeasure({"1d": 5.0, "2d": 1.0})
+        reloaded = KernelTuner(path, measure=measure)
+        assert reloaded.choose("k", CANDIDATES) == "1d"
+        assert measure.calls == [], "Persisted choice was re-timed"
+    print("  ✓ Tuning file is written and reused")
+
+
+def test_atomic_save():
+    """A failed save leaves the previous file and no temporary files"""
+    print("Testing atomic saves...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tuning.json"
+        tuner = KernelTuner(path, measure=FakeMeasure({"1d": 1.0, "2d": 2.0}))
+        tuner.choose("a", CANDIDATES)
+        saved = path.read_text()
+
+        with mock.patch.object(
+            kernel_tuner.os, "replace", side_effect=OSError("disk full")
+        ):
+            try:
+                tuner.choose("b", CANDIDATES)
+                assert False, "Failed save should raise"
+            except OSError:
+                pass
+        assert path.read_text() == saved, "Previous file was clobbered"
+        assert [p.name for p in Path(tmp).iterdir()] == ["tuning.json"]
+
+        tuner.save()
+        assert json.loads(path.read_text()) == {
+            "choices": {"a": "1d", "b": "1d"}
+        }
+    print("  ✓ Tuning file is replaced atomically")
+
+
+def test_stale_and_corrupt_entries():
+    """Unknown variants are re-tuned; unreadable files are ignored"""
+    print("Testing stale choices and corrupt files...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tuning.json"
+        path.write_text(json.dumps({"choices": {"k": "3d"}}))
+        tuner = KernelTuner(path, measure=FakeMeasure({"1d": 1.0, "2d": 2.0}))
+        assert tuner.choose("k", CANDIDATES) == "1d"
+
+        path.write_text("{not json")
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            tuner = KernelTuner(path, measure=FakeMeasure({"1d": 1, "2d": 2}))
+        assert caught, "Corrupt file should warn"
+        assert tuner.choices() == {}
+
+    try:
+        KernelTuner().choose("k", {})
+        assert False, "Empty candidates should be rejected"
+    except ValueError:
+        pass
+    print("  ✓ Stale and corrupt state handled")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 70)
+    print("Kernel Tuner Unit Tests")
+    print("=" * 70)
+    print()
+
+    tests = [
+        test_picks_fastest_once,
+        test_keys_are_independent,
+        test_persistence,
+        test_atomic_save,
+        test_stale_and_corrupt_entries,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+            print()
+        except AssertionError as e:
+            print(f"  ✗ FAILED: {e}")
+            print()
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ ERROR: {e}")
+            print()
+            failed += 1
+
+    print("=" * 70)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 70)
+
+    if failed > 0:
+        sys.exit(1)
+    else:
+        print("\n✓ All tests passed!")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
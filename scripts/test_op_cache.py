@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Unit tests for op_cache.py
+
+Uses plain objects as "compiled ops" so the cache can be tested without torch.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from op_cache import LRUOpCache, OpCacheKey
+
+
+def make_key(output_dim=16, dtype="torch.float32", device="cuda:0"):
+    params = {
+        "algorithm": "fused",
+        "batch_size": 4,
+        "seq_len": 4,
+        "hidden_dim": 8,
+        "output_dim": output_dim,
+    }
+    return OpCacheKey.create("layernorm_linear", params, dtype, device)
+
+
+def test_key_is_complete():
+    """Output dim, dtype and device all select different entries"""
+    print("Testing key completeness...")
+    base = make_key()
+    assert base == make_key(), "Equal inputs should give equal keys"
+    assert base != make_key(output_dim=32), "output_dim must be in the key"
+    assert base != make_key(dtype="torch.float16"), "dtype must be in the key"
+    assert base != make_key(device="cpu"), "device must be in the key"
+
+    cache = LRUOpCache()
+    first = cache.get_or_create(base, object)
+    second = cache.get_or_create(make_key(output_dim=32), object)
+    assert first is not second, "Different output dims shared an entry"
+    print("  ✓ Distinct specializations get distinct entries")
+
+
+def test_hits_and_misses():
+    """Only a miss calls the factory"""
+    print("Testing hit/miss counting...")
+    cache = LRUOpCache()
+    calls = []
+
+    def create():
+        calls.append(1)
+        return object()
+
+    first = cache.get_or_create(make_key(), create)
+    again = cache.get_or_create(make_key(), create)
+    assert first is again, "A hit should return the cached op"
+    assert len(calls) == 1, "The factory should run once"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    print("  ✓ Hits reuse the cached op")
+
+
+def test_lru_eviction():
+    """The least recently used entry is evicted first"""
+    print("Testing LRU eviction...")
+    evicted = []
+    cache = LRUOpCache(
+        max_entries=2, on_evict=lambda key, op: evicted.append(key)
+    )
+    a, b, c = make_key(1), make_key(2), make_key(3)
+    cache.get_or_create(a, object)
+    cache.get_or_create(b, object)
+    cache.get_or_create(a, object)  # a is now most recently used
+    cache.get_or_create(c, object)  # evicts b
+
+    assert a in cache and c in cache, "Recently used entries should stay"
+    assert b not in cache, "Least recently used entry should be evicted"
+    assert cache.keys() == [a, c], f"Unexpected order {cache.keys()}"
+    assert cache.stats()["evictions"] == 1
+
+    cache.resize(1)
+    assert cache.keys() == [c], "Shrinking should evict the oldest entries"
+    assert cache.stats()["evictions"] == 2
+    assert evicted == [b, a], "on_evict should see every evicted key"
+    print("  ✓ Cache stays bounded and evicts in LRU order")
+
+
+def test_invalid_size():
+    """A cache must hold at least one entry"""
+    print("Testing size validation...")
+    for make in [
+        lambda: LRUOpCache(max_entries=0),
+        lambda: LRUOpCache().resize(0),
+    ]:
+        try:
+            make()
+        except ValueError:
+            continue
+        raise AssertionError("Expected ValueError for max_entries=0")
+    print("  ✓ max_entries < 1 is rejected")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 70)
+    print("Op Cache Unit Tests")
+    print("=" * 70)
+    print()
+
+    tests = [
+        test_key_is_complete,
+        test_hits_and_misses,
+        test_lru_eviction,
+        test_invalid_size,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+            print()
+        except AssertionError as e:
+            print(f"  ✗ FAILED: {e}")
+            print()
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ ERROR: {e}")
+            print()
+            failed += 1
+
+    print("=" * 70)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 70)
+
+    if failed > 0:
+        sys.exit(1)
+    else:
+        print("\n✓ All tests passed!")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Unit tests for roofline_report.py
+
+Uses fixed peaks and synthetic benchmark results; only the CPU probe test
+touches the hardware, with tiny sizes.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from gpu_specs import GPUSpecs, lookup_peak_performance
+from roofline_report import (
+    Peaks,
+    analyze,
+    format_table,
+    main,
+    measure_cpu_peaks,
+    op_cost,
+    recorded_peaks,
+    render_svg,
+    resolve_peaks,
+)
+
+GPU = Peaks("gpu", gflops=19500.0, gbs=1555.0, source="test")
+
+
+def result(
+    name, median_s, device="gpu", flops=None, bytes_moved=None, **params
+):
+    return {
+        "name": name,
+        "device": device,
+        "median_s": median_s,
+        "flops": flops,
+        "bytes_moved": bytes_moved,
+        "params": params,
+    }
+
+
+def test_peak_lookup():
+    """Datasheet peaks match whole device names, A100 before A10"""
+    print("Testing peak lookup...")
+    assert lookup_peak_performance("NVIDIA A100-SXM4-40GB") == (19.5, 1555.0)
+    assert lookup_peak_performance("NVIDIA A10") == (31.2, 600.0)
+    assert lookup_peak_performance("NVIDIA L40") == (90.5, 864.0)
+    assert lookup_peak_performance("NVIDIA L4") == (30.3, 300.0)
+    assert lookup_peak_performance("NVIDIA GeForce RTX 3080 Ti") == (
+        34.1,
+        912.0,
+    )
+    assert lookup_peak_performance("NVIDIA GeForce RTX 4080 SUPER") is None
+    assert lookup_peak_performance("Mock GPU") is None
+    specs = GPUSpecs(
+        vendor="NVIDIA", device_name="Tesla T4", architecture="Turing"
+    )
+    assert specs.memory_bandwidth_gbs == 320.0
+    print("  ✓ GPUSpecs carries datasheet peaks")
+
+
+def test_costs_from_params():
+    """Results without counts get them from the per-op formulas"""
+    print("Testing op costs...")
+    assert op_cost("conv1d", {"input_size": 15, "conv_size": 4}) == (120, 136)
+    flops, _ = op_cost(
+        "layernorm_linear_fused",
+        {"batch_size": 1, "seq_len": 1, "hidden_dim": 2, "output_dim": 3},
+    )
+    assert flops == 8 * 2 + 2 * 2 * 3 + 3
+    assert op_cost("attention_online", {"seq_len": 4, "d": 2}) == (48, 80)
+    assert op_cost("unknown_op", {}) is None
+    print("  ✓ Costs derived from recorded params")
+
+
+def test_bound_classification():
+    """Low intensity is memory-bound, high intensity compute-bound"""
+    print("Testing classification...")
+    results = [
+        # 1 FLOP/byte, 10 ms for 1 GB -> 100 GB/s, 100 GFLOP/s
+        result("softmax_batched", 0.01, flops=10**9, bytes_moved=10**9),
+        # 100 FLOP/byte, at the compute roof
+        result("gemm", 1.0, flops=19500 * 10**9, bytes_moved=195 * 10**9),
+        result("embedding_1d", 0.001, batch_size=1, seq_len=1, embed_dim=1),
+        result("mystery", 1.0),
+    ]
+    points, skipped = analyze(results, {"gpu": GPU})
+    by_name = {p.name: p for p in points}
+
+    assert by_name["softmax_batched"].bound == "memory"
+    assert abs(by_name["softmax_batched"].fraction_of_roof - 100 / 1555) < 1e-9
+    assert by_name["gemm"].bound == "compute"
+    assert abs(by_name["gemm"].fraction_of_roof - 1.0) < 1e-9
+    assert by_name["embedding_1d"].bound == "memory"
+    assert skipped == ["mystery: no FLOP/byte counts"]
+
+    cpu_only = result("conv1d", 1.0, device="cpu", flops=1, bytes_moved=1)
+    _, skipped = analyze([cpu_only], {"gpu": GPU})
+    assert "no peak numbers" in skipped[0]
+    print("  ✓ Kernels are placed on the right side of the ridge")
+
+
+def test_report_outputs():
+    """The CLI writes a markdown table and an SVG chart"""
+    print("Testing report output...")
+    with tempfile.TemporaryDirectory() as tmp:
+        bench = Path(tmp) / "bench.json"
+        bench.write_text(
+            json.dumps(
+                {
+                    "results": [
+                        result("softmax", 1e-5, input_size=4096),
+                        result(
+                            "attention", 1e-4, flops=10**6, bytes_moved=10**5
+                        ),
+                        # No bytes: infinite intensity, table only
+                        result("reduce", 1e-5, flops=10**3, bytes_moved=0),
+                    ]
+                }
+            )
+        )
+        out = Path(tmp) / "report" / "roofline"
+        argv = [str(bench), "--out", str(out)]
+        argv += ["--peak-gflops", "19500", "--peak-gbs", "1555"]
+        assert main(argv) == 0
+        table = out.with_suffix(".md").read_text()
+        svg = out.with_suffix(".svg").read_text()
+    assert "| softmax | gpu |" in table
+    assert "| reduce | gpu |" in table
+    assert "memory" in table
+    assert svg.startswith("<svg") and svg.count("<circle") == 2
+    print("  ✓ Markdown table and SVG chart written")
+
+
+def test_recorded_peaks():
+    """Peaks saved in the JSON metadata are used instead of the local host"""
+    print("Testing recorded peaks...")
+    metadata = {
+        "devices": {
+            "gpu": {
+                "name": "NVIDIA A100",
+                "peak_gflops": 19500.0,
+                "peak_gbs": 1555.0,
+                "source": "GPUSpecs",
+            }
+        }
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        bench = Path(tmp) / "bench.json"
+        bench.write_text(
+            json.dumps(
+                {
+                    "metadata": metadata,
+                    "results": [
+                        result("softmax", 1e-5, input_size=4096),
+                        # Too fast to time: skipped, not a division by zero
+                        result("softmax", 0.0, input_size=128),
+                    ],
+                }
+            )
+        )
+        out = Path(tmp) / "roofline"
+        assert main([str(bench), "--out", str(out)]) == 0
+        table = out.with_suffix(".md").read_text()
+    assert "recorded: NVIDIA A100" in table
+    assert table.count("| softmax | gpu |") == 1
+
+    peaks = resolve_peaks({"gpu"}, recorded_peaks(metadata), peak_gbs=2000.0)
+    assert peaks["gpu"].gflops == 19500.0 and peaks["gpu"].gbs == 2000.0
+    print("  ✓ Recorded peaks used; command line overrides single values")
+
+
+def test_cpu_probe():
+    """The CPU probe returns positive peaks"""
+    print("Testing CPU probe...")
+    peaks = measure_cpu_peaks(elements=1 << 12, matmul_size=32, repeats=2)
+    assert peaks.gflops > 0 and peaks.gbs > 0
+    assert peaks.ridge_point > 0
+    print(f"  ✓ CPU roof: {peaks.gflops:.1f} GFLOP/s, {peaks.gbs:.1f} GB/s")
+
+
+def main_tests():
+    """Run all tests"""
+    print("=" * 70)
+    print("Roofline Report Unit Tests")
+    print("=" * 70)
+    print()
+
+    tests = [
+        test_peak_lookup,
+        test_costs_from_params,
+        test_bound_classification,
+        test_report_outputs,
+        test_recorded_peaks,
+        test_cpu_probe,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+            print()
+        except AssertionError as e:
+            print(f"  ✗ FAILED: {e}")
+            print()
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ ERROR: {e}")
+            print()
+            failed += 1
+
+    print("=" * 70)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 70)
+
+    if failed > 0:
+        sys.exit(1)
+    else:
+        print("\n✓ All tests passed!")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main_tests()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unit tests for tensor_arena.py
+
+Uses NumPy arrays as buffers so the arena can be tested without torch.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from tensor_arena import TensorArena
+
+
+def make_arena():
+    return TensorArena(lambda shape, dtype, device: np.empty(shape, dtype))
+
+
+def test_reuses_buffers():
+    """The same name and shape hands back the same buffer"""
+    print("Testing buffer reuse...")
+    arena = make_arena()
+    first = arena.get("grad_input", (4, 4, 8), np.float32, "cpu")
+    again = arena.get("grad_input", [4, 4, 8], np.float32, "cpu")
+    assert first is again, "Expected the cached buffer"
+    assert arena.stats()["allocations"] == 1
+    assert arena.stats()["reuses"] == 1
+    assert arena.nbytes() == 4 * 4 * 8 * 4
+    print("  ✓ Repeated requests reuse one allocation")
+
+
+def test_key_separates_buffers():
+    """Name, shape, dtype and device each select a different buffer"""
+    print("Testing buffer keys...")
+    arena = make_arena()
+    base = arena.get("output", (2, 3), np.float32, "cpu")
+    others = [
+        arena.get("grad_output", (2, 3), np.float32, "cpu"),
+        arena.get("output", (3, 2), np.float32, "cpu"),
+        arena.get("output", (2, 3), np.float16, "cpu"),
+        arena.get("output", (2, 3), np.float32, "cuda:0"),
+    ]
+    assert all(other is not base for other in others)
+    assert len(arena) == 5, f"Expected 5 buffers, got {len(arena)}"
+    print("  ✓ Distinct keys never share storage")
+
+
+def test_init_runs_once():
+    """init fills a new buffer and is skipped on reuse"""
+    print("Testing one-time init...")
+    arena = make_arena()
+    calls = []
+
+    def fill_ones(buffer):
+        calls.append(1)
+        buffer.fill(1)
+
+    ones = arena.get("ones", (5,), np.float32, "cpu", init=fill_ones)
+    assert np.all(ones == 1)
+    arena.get("ones", (5,), np.float32, "cpu", init=fill_ones)
+    assert len(calls) == 1, "init should only run on allocation"
+
+    arena.clear()
+    assert len(arena) == 0 and arena.nbytes() == 0
+    arena.get("ones", (5,), np.float32, "cpu", init=fill_ones)
+    assert len(calls) == 2, "init should run again after clear()"
+    print("  ✓ init runs only when a buffer is created")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 70)
+    print("Tensor Arena Unit Tests")
+    print("=" * 70)
+    print()
+
+    tests = [
+        test_reuses_buffers,
+        test_key_separates_buffers,
+        test_init_runs_once,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+            print()
+        except AssertionError as e:
+            print(f"  ✗ FAILED: {e}")
+            print()
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ ERROR: {e}")
+            print()
+            failed += 1
+
+    print("=" * 70)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 70)
+
+    if failed > 0:
+        sys.exit(1)
+    else:
+        print("\n✓ All tests passed!")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,47 @@
+import sys
 from pathlib import Path
+from typing import Optional, Union
 
 import numpy as np
-from max.driver import CPU, Accelerator, Device, Buffer
+from max.driver import Accelerator, Device, Buffer
 from max.dtype import DType
 from max.engine import InferenceSession
 from max.graph import DeviceRef, Graph, TensorType, ops
 from numpy.typing import NDArray
 
-
-def conv_1d(
-    input: NDArray[np.float32],
-    kernel: NDArray[np.float32],
-    session: InferenceSession,
-    device: Device,
-) -> Buffer:
-    dtype = DType.float32
-
-    # Create driver tensors from the input arrays and move them to the target device
-    input_tensor = Buffer.from_numpy(input).to(device)
-    kernel_tensor = Buffer.from_numpy(kernel).to(device)
-
-    # Path to the directory containing our Mojo operations
-    mojo_kernels = Path(__file__).parent / "op"
-
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scripts"))
+from graph_cache import GraphCache, GraphKey, default_graph_cache
+from conv_reference import conv1d_reference
+from device_buffers import as_device_buffer, finish, wants_host_copy
+from benchmark import (
+    benchmark,
+    benchmark_json_path,
+    default_max_device,
+    max_sync,
+    print_results,
+    save_json,
+    silenced,
+)
+
+# Path to the directory containing our Mojo operations
+mojo_kernels = Path(__file__).parent / "op"
+
+
+def build_conv_1d_graph(
+    input_shape: tuple, kernel_shape: tuple, dtype: DType, device: Device
+) -> Graph:
     # Configure our graph with the custom conv1d operation
     with Graph(
         "conv_1d_graph",
         input_types=[
             TensorType(
                 dtype,
-                shape=input_tensor.shape,
+                shape=input_shape,
                 device=DeviceRef.from_device(device),
             ),
             TensorType(
                 dtype,
-                shape=kernel_tensor.shape,
+                shape=kernel_shape,
                 device=DeviceRef.from_device(device),
             ),
         ],
@@ -57,24 +64,90 @@ def conv_1d(
                 )
             ],
             parameters={
-                "input_size": input_tensor.shape[0],
-                "conv_size": kernel_tensor.shape[0],
+                "input_size": input_shape[0],
+                "conv_size": kernel_shape[0],
                 "dtype": dtype,
             },
         )[0].tensor
         graph.output(output)
 
-    # Compile the graph
-    print("Compiling 1D convolution graph...")
-    model = session.load(graph)
+    return graph
+
+
+def conv_1d(
+    input: Union[NDArray[np.float32], Buffer],
+    kernel: Union[NDArray[np.float32], Buffer],
+    session: InferenceSession,
+    device: Device,
+    graph_cache: Optional[GraphCache] = None,
+    to_host: Optional[bool] = None,
+) -> Buffer:
+    dtype = DType.float32
+    to_host = wants_host_copy(to_host, [input, kernel])
+
+    # NumPy inputs are uploaded; Buffers already on `device` are used as-is
+    input_tensor = as_device_buffer(input, device, dtype)
+    kernel_tensor = as_device_buffer(kernel, device, dtype)
+
+    # Compile the graph only the first time this shape is seen on this device
+    if graph_cache is None:
+        graph_cache = default_graph_cache()
+    key = GraphKey.create(
+        "conv1d",
+        [input_tensor.shape, kernel_tensor.shape],
+        dtype,
+        device,
+        mojo_kernels,
+    )
+
+    def build_graph() -> Graph:
+        print("Compiling 1D convolution graph...")
+        return build_conv_1d_graph(
+            input_tensor.shape, kernel_tensor.shape, dtype, device
+        )
+
+    model = graph_cache.load(session, key, build_graph, mojo_kernels)
 
     # Execute the operation
     print("Executing 1D convolution...")
     result = model.execute(input_tensor, kernel_tensor)[0]
 
-    # Copy values back to the CPU to be read
+    # Copy values back to the CPU only if the caller wants to read them there
     assert isinstance(result, Buffer)
-    return result.to(CPU())
+    return finish(result, to_host)
+
+
+def run_benchmarks(json_path: Optional[Path] = None) -> None:
+    """Time conv_1d on the first GPU (the op has no CPU implementation)."""
+    input_size, kernel_size = 15, 4
+    device = default_max_device()
+    if device.is_host:
+        print("Skipping conv1d benchmark: no GPU found")
+        return
+    session = InferenceSession(devices=[device])
+    input_buffer = Buffer.from_numpy(
+        np.arange(input_size, dtype=np.float32)
+    ).to(device)
+    kernel_buffer = Buffer.from_numpy(
+        np.arange(kernel_size, dtype=np.float32)
+    ).to(device)
+
+    results = [
+        benchmark(
+            "conv1d",
+            silenced(
+                lambda: conv_1d(input_buffer, kernel_buffer, session, device)
+            ),
+            device=device.label,
+            sync=max_sync(device),
+            bytes_moved=4 * (2 * input_size + kernel_size),
+            flops=2 * input_size * kernel_size,
+            params={"input_size": input_size, "conv_size": kernel_size},
+        )
+    ]
+    print_results(results)
+    if json_path is not None:
+        save_json(results, json_path)
 
 
 if __name__ == "__main__":
@@ -92,11 +165,7 @@ if __name__ == "__main__":
     kernel = np.arange(KERNEL_SIZE, dtype=np.float32)
 
     # Calculate expected result using NumPy
-    expected_result = np.zeros_like(input_array, dtype=np.float32)
-    for i in range(INPUT_SIZE):
-        for j in range(KERNEL_SIZE):
-            if i + j < INPUT_SIZE:
-                expected_result[i] += input_array[i + j] * kernel[j]
+    expected_result = conv1d_reference(input_array, kernel)
 
     print(f"Input array: {input_array}")
     print(f"Convolution kernel: {kernel}")
@@ -109,3 +178,7 @@ if __name__ == "__main__":
     # Verify results match
     np.testing.assert_allclose(result.to_numpy(), expected_result, rtol=1e-5)
     print("Verification passed: Custom kernel results match NumPy calculation")
+
+    # Timings run after the checks, so `--benchmark` still validates results
+    if "--benchmark" in sys.argv[1:]:
+        run_benchmarks(benchmark_json_path(sys.argv[1:]))
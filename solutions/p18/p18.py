@@ -1,22 +1,34 @@
+import sys
 from pathlib import Path
+from typing import Optional, Union
 
 import numpy as np
 from max.driver import CPU, Accelerator, Device, Buffer
 from max.dtype import DType
-from max.engine import InferenceSession
+from max.engine import InferenceSession, Model
 from max.graph import DeviceRef, Graph, TensorType, ops
 from numpy.typing import NDArray
 from scipy.special import softmax as scipy_softmax
 
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scripts"))
+from graph_cache import GraphCache, GraphKey, default_graph_cache
+from device_buffers import as_device_buffer, finish, wants_host_copy
+from benchmark import (
+    benchmark,
+    benchmark_json_path,
+    default_max_device,
+    max_sync,
+    print_results,
+    save_json,
+    silenced,
+)
 
-def softmax(
-    input: NDArray[np.float32],
-    session: InferenceSession,
-    device: Device,
-) -> Buffer:
-    dtype = DType.float32
-    input_tensor = Buffer.from_numpy(input).to(device)
-    mojo_kernels = Path(__file__).parent / "op"
+mojo_kernels = Path(__file__).parent / "op"
+
+
+def build_softmax_graph(
+    input_tensor: Buffer, dtype: DType, device: Device
+) -> Graph:
     # ANCHOR: softmax_custom_op_graph_solution
     with Graph(
         "softmax_graph",
@@ -45,7 +57,7 @@ def softmax(
                 )
             ],
             parameters={
-                "target": "gpu" if device == Accelerator() else "cpu",
+                "target": "cpu" if device.is_host else "gpu",
                 "input_size": input_tensor.shape[0],
                 "dtype": dtype,
             },
@@ -53,18 +65,187 @@ def softmax(
         graph.output(output)
 
     # ANCHOR_END: softmax_custom_op_graph_solution
+    return graph
+
 
-    print(f"Compiling softmax graph on {device}")
-    model = session.load(graph)
+def load_softmax_model(
+    input_tensor: Buffer,
+    session: InferenceSession,
+    device: Device,
+    graph_cache: Optional[GraphCache] = None,
+) -> Model:
+    """Loaded softmax model for `input_tensor`'s shape (compiled once)."""
+    dtype = DType.float32
+    # Only the first call for a given shape and device pays for compilation
+    if graph_cache is None:
+        graph_cache = default_graph_cache()
+    key = GraphKey.create(
+        "softmax", [input_tensor.shape], dtype, device, mojo_kernels
+    )
+
+    def build_graph() -> Graph:
+        print(f"Compiling softmax graph on {device}")
+        return build_softmax_graph(input_tensor, dtype, device)
+
+    return graph_cache.load(session, key, build_graph, mojo_kernels)
+
+
+def softmax(
+    input: Union[NDArray[np.float32], Buffer],
+    session: InferenceSession,
+    device: Device,
+    graph_cache: Optional[GraphCache] = None,
+    to_host: Optional[bool] = None,
+) -> Buffer:
+    dtype = DType.float32
+    to_host = wants_host_copy(to_host, [input])
+    input_tensor = as_device_buffer(input, device, dtype)
+
+    model = load_softmax_model(input_tensor, session, device, graph_cache)
     print(f"Executing softmax on {device}")
     print("=" * 100)
     result = model.execute(input_tensor)[0]
     assert isinstance(result, Buffer)
-    return result.to(CPU()) if device == Accelerator() else result
+    return finish(result, to_host)
+
+
+def build_softmax_batched_graph(
+    input_tensor: Buffer, dtype: DType, device: Device
+) -> Graph:
+    _, cols = input_tensor.shape
+    with Graph(
+        "softmax_batched_graph",
+        input_types=[
+            # The row count is symbolic, so one graph serves every batch size
+            TensorType(
+                dtype,
+                shape=["rows", cols],
+                device=DeviceRef.from_device(device),
+            ),
+        ],
+        custom_extensions=[mojo_kernels],
+    ) as graph:
+        input_value = graph.inputs[0]
+
+        # Note: the name must match `@compiler.register("softmax_batched")` in op/softmax.mojo
+        output = ops.custom(
+            name="softmax_batched",
+            values=[input_value],
+            device=DeviceRef.from_device(device),
+            out_types=[
+                TensorType(
+                    dtype=input_value.tensor.dtype,
+                    shape=input_value.tensor.shape,
+                    device=DeviceRef.from_device(device),
+                )
+            ],
+            parameters={
+                "target": "cpu" if device.is_host else "gpu",
+                "cols": cols,
+                "dtype": dtype,
+            },
+        )[0].tensor
+        graph.output(output)
+
+    return graph
+
+
+def load_softmax_batched_model(
+    input_tensor: Buffer,
+    session: InferenceSession,
+    device: Device,
+    graph_cache: Optional[GraphCache] = None,
+) -> Model:
+    """Loaded softmax_batched model for `input_tensor`'s row width."""
+    dtype = DType.float32
+    if graph_cache is None:
+        graph_cache = default_graph_cache()
+    # Keyed on the row width only: the graph takes any number of rows
+    key = GraphKey.create(
+        "softmax_batched", [input_tensor.shape[1:]], dtype, device, mojo_kernels
+    )
+
+    def build_graph() -> Graph:
+        print(f"Compiling batched softmax graph on {device}")
+        return build_softmax_batched_graph(input_tensor, dtype, device)
+
+    return graph_cache.load(session, key, build_graph, mojo_kernels)
+
+
+def softmax_batched(
+    input: Union[NDArray[np.float32], Buffer],
+    session: InferenceSession,
+    device: Device,
+    graph_cache: Optional[GraphCache] = None,
+    to_host: Optional[bool] = None,
+) -> Buffer:
+    """Row-wise softmax of a [rows, cols] matrix in a single kernel launch."""
+    if len(input.shape) != 2:
+        raise ValueError(
+            f"softmax_batched expects a 2-D [rows, cols] array, got {input.shape}"
+        )
+    dtype = DType.float32
+    to_host = wants_host_copy(to_host, [input])
+    input_tensor = as_device_buffer(input, device, dtype)
+
+    model = load_softmax_batched_model(
+        input_tensor, session, device, graph_cache
+    )
+    result = model.execute(input_tensor)[0]
+    assert isinstance(result, Buffer)
+    return finish(result, to_host)
+
+
+def run_benchmarks(json_path: Optional[Path] = None) -> None:
+    """Time softmax and softmax_batched on the first GPU, or on the CPU."""
+    device = default_max_device()
+    session = InferenceSession(devices=[device])
+    results = []
+
+    for size in [128, 4096]:
+        x = Buffer.from_numpy(np.random.randn(size).astype(np.float32)).to(
+            device
+        )
+        # Resolve the model once so only the kernel launch is timed
+        model = silenced(lambda: load_softmax_model(x, session, device))()
+        results.append(
+            benchmark(
+                "softmax",
+                lambda model=model, x=x: model.execute(x),
+                device=device.label,
+                sync=max_sync(device),
+                bytes_moved=2 * 4 * size,
+                flops=4 * size,
+                params={"input_size": size},
+            )
+        )
+
+    rows, cols = 512, 1024
+    batch = Buffer.from_numpy(
+        np.random.randn(rows, cols).astype(np.float32)
+    ).to(device)
+    model = silenced(
+        lambda: load_softmax_batched_model(batch, session, device)
+    )()
+    results.append(
+        benchmark(
+            "softmax_batched",
+            lambda: model.execute(batch),
+            device=device.label,
+            sync=max_sync(device),
+            bytes_moved=2 * 4 * rows * cols,
+            flops=4 * rows * cols,
+            params={"rows": rows, "cols": cols},
+        )
+    )
+
+    print_results(results)
+    if json_path is not None:
+        save_json(results, json_path)
 
 
 if __name__ == "__main__":
-    INPUT_SIZE = 128  # This must be equal to SIZE in softmax.mojo
+    INPUT_SIZE = 128  # Any size works; each new size compiles once
     cpu_session = InferenceSession(devices=[CPU()])
     gpu_session = InferenceSession(devices=[Accelerator()])
     input_array = np.random.randn(INPUT_SIZE).astype(np.float32)
@@ -96,3 +277,55 @@ if __name__ == "__main__":
     total_prob_gpu = np.round(np.sum(gpu_result.to_numpy()), 5)
     print(f"Sum of all probabilities on CPU: {total_prob_cpu}")
     print(f"Sum of all probabilities on GPU: {total_prob_gpu}")
+
+    # Other lengths need no kernel edits; lengths above one block's worth of
+    # threads take the strided path. Repeating a size reuses its compiled graph.
+    for size in [100, 1000, 5000, 1000]:
+        sized_input = np.random.randn(size).astype(np.float32)
+        sized_result = softmax(sized_input, gpu_session, Accelerator())
+        np.testing.assert_allclose(
+            sized_result.to_numpy(),
+            scipy_softmax(sized_input),
+            rtol=1e-5,
+            atol=1e-7,
+        )
+    compiled = default_graph_cache().specializations("softmax")
+    print(
+        "Compiled softmax specializations:",
+        [key.input_shapes for key in compiled],
+    )
+
+    # Batched softmax: many rows of any width in one launch
+    BATCH_ROWS, BATCH_COLS = 64, 1000
+    batched_input = np.random.randn(BATCH_ROWS, BATCH_COLS).astype(np.float32)
+    expected_batched = scipy_softmax(batched_input, axis=-1)
+
+    cpu_batched = softmax_batched(batched_input, cpu_session, CPU())
+    gpu_batched = softmax_batched(batched_input, gpu_session, Accelerator())
+    np.testing.assert_allclose(
+        cpu_batched.to_numpy(), expected_batched, rtol=1e-5, atol=1e-7
+    )
+    np.testing.assert_allclose(
+        gpu_batched.to_numpy(), expected_batched, rtol=1e-5, atol=1e-7
+    )
+    print(
+        f"Batched softmax [{BATCH_ROWS}, {BATCH_COLS}] matches SciPy on CPU"
+        " and GPU"
+    )
+
+    # Device-resident pipeline: upload once, chain ops, copy back once
+    gpu = Accelerator()
+    resident_input = Buffer.from_numpy(batched_input).to(gpu)
+    once = softmax_batched(resident_input, gpu_session, gpu)  # stays on GPU
+    twice = softmax_batched(once, gpu_session, gpu, to_host=True)
+    np.testing.assert_allclose(
+        twice.to_numpy(),
+        scipy_softmax(expected_batched, axis=-1),
+        rtol=1e-5,
+        atol=1e-7,
+    )
+    print("Chained device-resident softmax matches SciPy")
+
+    # Timings run after the checks, so `--benchmark` still validates results
+    if "--benchmark" in sys.argv[1:]:
+        run_benchmarks(benchmark_json_path(sys.argv[1:]))
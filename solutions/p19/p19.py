@@ -1,59 +1,58 @@
+import sys
 from pathlib import Path
+from typing import Optional, Union
 
 import numpy as np
 from max.driver import CPU, Accelerator, Device, Buffer
 from max.dtype import DType
-from max.engine import InferenceSession
+from max.engine import InferenceSession, Model
 from max.graph import DeviceRef, Graph, TensorType, ops
 from numpy.typing import NDArray
 
-
-def attention(
-    q: NDArray[np.float32],
-    k: NDArray[np.float32],
-    v: NDArray[np.float32],
-    session: InferenceSession,
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scripts"))
+from graph_cache import GraphCache, GraphKey, default_graph_cache
+from device_buffers import as_device_buffer, finish, wants_host_copy
+from benchmark import (
+    benchmark,
+    benchmark_json_path,
+    default_max_device,
+    max_sync,
+    print_results,
+    save_json,
+    silenced,
+)
+
+mojo_kernels = Path(__file__).parent / "op"
+
+
+def build_attention_graph(
+    seq_len: int,
+    d: int,
+    dtype: DType,
     device: Device,
-) -> Buffer:
-    """
-    Compute vector attention: Attention(Q, K, V) = softmax(Q · K^T) @ V
+    op_name: str = "attention",
+) -> Graph:
+    """Build the single-op graph wrapping a (d,) x (seq_len, d) attention op.
 
-    Args:
-        q: Query vector of shape (d,)
-        k: Key matrix of shape (seq_len, d)
-        v: Value matrix of shape (seq_len, d)
-        session: MAX inference session
-        device: Target device (CPU or GPU)
-
-    Returns:
-        Attention output vector of shape (d,)
+    `op_name` selects between `attention` and `attention_online`, which share
+    the same signature.
     """
-    dtype = DType.float32
-    seq_len, d = k.shape
-
-    # Convert inputs to tensors
-    q_tensor = Buffer.from_numpy(q).to(device)
-    k_tensor = Buffer.from_numpy(k).to(device)
-    v_tensor = Buffer.from_numpy(v).to(device)
-
-    mojo_kernels = Path(__file__).parent / "op"
-
     with Graph(
-        "attention_graph",
+        f"{op_name}_graph",
         input_types=[
             TensorType(
                 dtype,
-                shape=q_tensor.shape,
+                shape=(d,),
                 device=DeviceRef.from_device(device),
             ),
             TensorType(
                 dtype,
-                shape=k_tensor.shape,
+                shape=(seq_len, d),
                 device=DeviceRef.from_device(device),
             ),
             TensorType(
                 dtype,
-                shape=v_tensor.shape,
+                shape=(seq_len, d),
                 device=DeviceRef.from_device(device),
             ),
         ],
@@ -64,7 +63,7 @@ def attention(
         v_value = graph.inputs[2]
 
         output = ops.custom(
-            name="attention",
+            name=op_name,
             values=[q_value, k_value, v_value],
             device=DeviceRef.from_device(device),
             out_types=[
@@ -82,24 +81,301 @@ def attention(
         )[0].tensor
         graph.output(output)
 
-    print(f"Compiling attention graph on {device}")
-    model = session.load(graph)
+    return graph
+
+
+def load_attention_model(
+    seq_len: int,
+    d: int,
+    session: InferenceSession,
+    device: Device,
+    graph_cache: Optional[GraphCache] = None,
+    op_name: str = "attention",
+) -> Model:
+    """Loaded model for a (d,) x (seq_len, d) attention op, compiled once.
+
+    `op_name` selects between `attention` and `attention_online`.
+    """
+    dtype = DType.float32
+    if graph_cache is None:
+        graph_cache = default_graph_cache()
+    key = GraphKey.create(
+        op_name,
+        [(d,), (seq_len, d), (seq_len, d)],
+        dtype,
+        device,
+        mojo_kernels,
+    )
+
+    def build_graph() -> Graph:
+        label = "online attention" if op_name == "attention_online" else op_name
+        print(f"Compiling {label} graph on {device}")
+        return build_attention_graph(
+            seq_len, d, dtype, device, op_name=op_name
+        )
+
+    return graph_cache.load(session, key, build_graph, mojo_kernels)
+
+
+def attention(
+    q: Union[NDArray[np.float32], Buffer],
+    k: Union[NDArray[np.float32], Buffer],
+    v: Union[NDArray[np.float32], Buffer],
+    session: InferenceSession,
+    device: Device,
+    graph_cache: Optional[GraphCache] = None,
+    to_host: Optional[bool] = None,
+) -> Buffer:
+    """
+    Compute vector attention: Attention(Q, K, V) = softmax(Q · K^T) @ V
+
+    Args:
+        q: Query vector of shape (d,)
+        k: Key matrix of shape (seq_len, d)
+        v: Value matrix of shape (seq_len, d)
+        session: MAX inference session
+        device: Target device (CPU or GPU)
+        graph_cache: Compiled-graph cache (defaults to the process-wide one)
+        to_host: Copy the result to the host (default: only if an input was
+            a NumPy array)
+
+    Returns:
+        Attention output vector of shape (d,)
+    """
+    dtype = DType.float32
+    seq_len, d = k.shape
+
+    to_host = wants_host_copy(to_host, [q, k, v])
+
+    # NumPy inputs are uploaded; Buffers already on `device` are used as-is
+    q_tensor = as_device_buffer(q, device, dtype)
+    k_tensor = as_device_buffer(k, device, dtype)
+    v_tensor = as_device_buffer(v, device, dtype)
+
+    model = load_attention_model(seq_len, d, session, device, graph_cache)
     print(f"Executing attention on {device}")
     print("=" * 100)
     result = model.execute(q_tensor, k_tensor, v_tensor)[0]
     assert isinstance(result, Buffer)
-    return result.to(CPU()) if device == Accelerator() else result
+    return finish(result, to_host)
+
+
+def attention_online(
+    q: Union[NDArray[np.float32], Buffer],
+    k: Union[NDArray[np.float32], Buffer],
+    v: Union[NDArray[np.float32], Buffer],
+    session: InferenceSession,
+    device: Device,
+    graph_cache: Optional[GraphCache] = None,
+    to_host: Optional[bool] = None,
+) -> Buffer:
+    """
+    Vector attention with an online (streaming) softmax.
+
+    Same result as `attention`, but K and V are consumed in fixed-size tiles
+    with a running max and sum, so the kernel never holds the full score
+    vector and any seq_len fits.
+
+    Args:
+        q: Query vector of shape (d,)
+        k: Key matrix of shape (seq_len, d)
+        v: Value matrix of shape (seq_len, d)
+        session: MAX inference session
+        device: Target device (CPU or GPU)
+        graph_cache: Compiled-graph cache (defaults to the process-wide one)
+        to_host: Copy the result to the host (default: only if an input was
+            a NumPy array)
+
+    Returns:
+        Attention output vector of shape (d,)
+    """
+    if (
+        len(q.shape) != 1
+        or len(k.shape) != 2
+        or v.shape != k.shape
+        or q.shape[0] != k.shape[1]
+    ):
+        raise ValueError(
+            f"Expected q (d,) and k, v (seq_len, d), got q={q.shape},"
+            f" k={k.shape}, v={v.shape}"
+        )
+    dtype = DType.float32
+    seq_len, d = k.shape
+
+    to_host = wants_host_copy(to_host, [q, k, v])
+
+    q_tensor = as_device_buffer(q, device, dtype)
+    k_tensor = as_device_buffer(k, device, dtype)
+    v_tensor = as_device_buffer(v, device, dtype)
+
+    model = load_attention_model(
+        seq_len, d, session, device, graph_cache, op_name="attention_online"
+    )
+    result = model.execute(q_tensor, k_tensor, v_tensor)[0]
+    assert isinstance(result, Buffer)
+    return finish(result, to_host)
+
+
+def build_attention_batched_graph(
+    n_queries: int,
+    seq_len: int,
+    d: int,
+    dtype: DType,
+    device: Device,
+) -> Graph:
+    """Build the single-op graph wrapping the `attention_batched` custom op.
+
+    The group count is a symbolic dimension, so one graph serves every
+    batch * heads combination with the same per-group shape.
+    """
+    q_type = TensorType(
+        dtype,
+        shape=("groups", n_queries, d),
+        device=DeviceRef.from_device(device),
+    )
+    kv_type = TensorType(
+        dtype,
+        shape=("groups", seq_len, d),
+        device=DeviceRef.from_device(device),
+    )
+    with Graph(
+        "attention_batched_graph",
+        input_types=[q_type, kv_type, kv_type],
+        custom_extensions=[mojo_kernels],
+    ) as graph:
+        q_value, k_value, v_value = graph.inputs
+
+        output = ops.custom(
+            name="attention_batched",
+            values=[q_value, k_value, v_value],
+            device=DeviceRef.from_device(device),
+            out_types=[q_type],
+            parameters={
+                "target": "cpu" if device.is_host else "gpu",
+                "n_queries": n_queries,
+                "seq_len": seq_len,
+                "d": d,
+                "dtype": dtype,
+            },
+        )[0].tensor
+        graph.output(output)
+
+    return graph
+
+
+def load_attention_batched_model(
+    n_queries: int,
+    seq_len: int,
+    d: int,
+    session: InferenceSession,
+    device: Device,
+    graph_cache: Optional[GraphCache] = None,
+) -> Model:
+    """Loaded attention_batched model; the group count is not part of it."""
+    dtype = DType.float32
+    if graph_cache is None:
+        graph_cache = default_graph_cache()
+    # Keyed without the group count, which the graph takes at runtime
+    key = GraphKey.create(
+        "attention_batched",
+        [(n_queries, d), (seq_len, d), (seq_len, d)],
+        dtype,
+        device,
+        mojo_kernels,
+    )
+
+    def build_graph() -> Graph:
+        print(f"Compiling batched attention graph on {device}")
+        return build_attention_batched_graph(
+            n_queries, seq_len, d, dtype, device
+        )
+
+    return graph_cache.load(session, key, build_graph, mojo_kernels)
+
+
+def attention_batched(
+    q: Union[NDArray[np.float32], Buffer],
+    k: Union[NDArray[np.float32], Buffer],
+    v: Union[NDArray[np.float32], Buffer],
+    session: InferenceSession,
+    device: Device,
+    graph_cache: Optional[GraphCache] = None,
+    to_host: Optional[bool] = None,
+) -> Buffer:
+    """
+    Compute attention for many queries in a single custom-op launch.
+
+    Leading dimensions are treated as independent groups, so both a plain
+    query matrix and multi-head layouts are supported:
+
+        q: (n_queries, d)               k, v: (seq_len, d)
+        q: (batch, heads, n_queries, d) k, v: (batch, heads, seq_len, d)
+
+    Args:
+        q: Queries of shape (..., n_queries, d)
+        k: Keys of shape (..., seq_len, d)
+        v: Values of shape (..., seq_len, d)
+        session: MAX inference session
+        device: Target device (CPU or GPU)
+        graph_cache: Compiled-graph cache (defaults to the process-wide one)
+        to_host: Copy the result to the host (default: only if an input was
+            a NumPy array)
+
+    Returns:
+        Attention output of shape (..., n_queries, d)
+    """
+    if (
+        len(q.shape) < 2
+        or len(k.shape) != len(q.shape)
+        or v.shape != k.shape
+    ):
+        raise ValueError(
+            f"Expected q (..., n, d) and k, v (..., seq_len, d), got q={q.shape},"
+            f" k={k.shape}, v={v.shape}"
+        )
+    if q.shape[:-2] != k.shape[:-2] or q.shape[-1] != k.shape[-1]:
+        raise ValueError(
+            f"Leading and head dimensions must match: q={q.shape}, k={k.shape}"
+        )
+
+    dtype = DType.float32
+    *leading, n_queries, d = q.shape
+    seq_len = k.shape[-2]
+    groups = int(np.prod(leading, dtype=np.int64))
+
+    to_host = wants_host_copy(to_host, [q, k, v])
+
+    # Flatten the leading dimensions into groups (a view, no copy)
+    q_tensor = as_device_buffer(q, device, dtype).view(
+        dtype, (groups, n_queries, d)
+    )
+    k_tensor = as_device_buffer(k, device, dtype).view(
+        dtype, (groups, seq_len, d)
+    )
+    v_tensor = as_device_buffer(v, device, dtype).view(
+        dtype, (groups, seq_len, d)
+    )
+
+    model = load_attention_batched_model(
+        n_queries, seq_len, d, session, device, graph_cache
+    )
+    result = model.execute(q_tensor, k_tensor, v_tensor)[0]
+    assert isinstance(result, Buffer)
+    return finish(result, to_host).view(dtype, tuple(q.shape))
 
 
 def reference_attention(
     q: NDArray[np.float32], k: NDArray[np.float32], v: NDArray[np.float32]
 ) -> NDArray[np.float32]:
-    """Reference implementation of vector attention using NumPy."""
-    scores = np.dot(k, q)
-    scores_max = np.max(scores)
-    scores_exp = np.exp(scores - scores_max)
-    attention_weights = scores_exp / np.sum(scores_exp)
-    output = np.dot(attention_weights, v)
+    """Reference implementation of attention using NumPy.
+
+    Works for a single query (d,) or a batch of queries (..., n_queries, d)
+    against K, V of shape (..., seq_len, d).
+    """
+    scores = np.matmul(q, np.swapaxes(k, -1, -2))
+    scores_exp = np.exp(scores - np.max(scores, axis=-1, keepdims=True))
+    attention_weights = scores_exp / np.sum(scores_exp, axis=-1, keepdims=True)
+    output = np.matmul(attention_weights, v)
     return output
 
 
@@ -198,9 +474,81 @@ def test_individual_operations():
     print(f"Sum: {np.sum(x_softmax):.6f}")
 
 
+def attention_cost(groups: int, n_queries: int, seq_len: int, d: int):
+    """(bytes moved, flops) of one attention call, for throughput numbers."""
+    bytes_moved = 4 * groups * (2 * n_queries * d + 2 * seq_len * d)
+    # Q·K and weights·V are 2 flops per multiply-add; softmax ~4 per score
+    flops = groups * n_queries * seq_len * (4 * d + 4)
+    return bytes_moved, flops
+
+
+def run_benchmarks(json_path: Optional[Path] = None) -> None:
+    """Time the attention variants on the first GPU, or on the CPU."""
+    device = default_max_device()
+    session = InferenceSession(devices=[device])
+
+    def upload(*shape):
+        array = np.random.randn(*shape).astype(np.float32) * 0.1
+        return Buffer.from_numpy(array).to(device)
+
+    results = []
+    for seq_len, d in [(16, 16), (1024, 64)]:
+        q, k, v = upload(d), upload(seq_len, d), upload(seq_len, d)
+        bytes_moved, flops = attention_cost(1, 1, seq_len, d)
+        for name in ["attention", "attention_online"]:
+            # Resolve the model once so only the kernel launch is timed
+            model = silenced(
+                lambda name=name: load_attention_model(
+                    seq_len, d, session, device, op_name=name
+                )
+            )()
+            results.append(
+                benchmark(
+                    name,
+                    lambda model=model, q=q, k=k, v=v: model.execute(q, k, v),
+                    device=device.label,
+                    sync=max_sync(device),
+                    bytes_moved=bytes_moved,
+                    flops=flops,
+                    params={"seq_len": seq_len, "d": d},
+                )
+            )
+
+    batch, heads, n_queries, seq_len, d = 2, 8, 64, 256, 64
+    groups = batch * heads
+    qb = upload(groups, n_queries, d)
+    kb, vb = upload(groups, seq_len, d), upload(groups, seq_len, d)
+    bytes_moved, flops = attention_cost(groups, n_queries, seq_len, d)
+    model = silenced(
+        lambda: load_attention_batched_model(
+            n_queries, seq_len, d, session, device
+        )
+    )()
+    results.append(
+        benchmark(
+            "attention_batched",
+            lambda: model.execute(qb, kb, vb),
+            device=device.label,
+            sync=max_sync(device),
+            bytes_moved=bytes_moved,
+            flops=flops,
+            params={
+                "groups": groups,
+                "n_queries": n_queries,
+                "seq_len": seq_len,
+                "d": d,
+            },
+        )
+    )
+
+    print_results(results)
+    if json_path is not None:
+        save_json(results, json_path)
+
+
 if __name__ == "__main__":
-    SEQ_LEN = 16  # Number of key/value vectors, must be equal to SEQ_LEN in attention.mojo
-    D = 16  # Dimension of each vector, must be equal to D in attention.mojo
+    SEQ_LEN = 16  # Number of key/value vectors (any value works)
+    D = 16  # Dimension of each vector (any value works)
 
     cpu_session = InferenceSession(devices=[CPU()])
     gpu_session = InferenceSession(devices=[Accelerator()])
@@ -286,3 +634,107 @@ if __name__ == "__main__":
     print(f"  CPU: {np.linalg.norm(cpu_array):.6f}")
     print(f"  GPU: {np.linalg.norm(gpu_array):.6f}")
     print(f"  Expected: {np.linalg.norm(expected_result):.6f}")
+
+    print(f"\n{'='*80}")
+    print("BATCHED ATTENTION")
+    print(f"{'='*80}")
+
+    # (n_queries, d) queries and (batch, heads, n_queries, d) multi-head layout
+    batched_cases = [
+        ((32, D), (SEQ_LEN, D)),
+        ((2, 4, 8, D), (2, 4, 24, D)),
+    ]
+    for q_shape, kv_shape in batched_cases:
+        qb = np.random.randn(*q_shape).astype(np.float32) * 0.1
+        kb = np.random.randn(*kv_shape).astype(np.float32) * 0.1
+        vb = np.random.randn(*kv_shape).astype(np.float32) * 0.1
+        expected_batched = reference_attention(qb, kb, vb)
+
+        for name, session, device in [
+            ("CPU", cpu_session, CPU()),
+            ("GPU", gpu_session, Accelerator()),
+        ]:
+            batched_result = attention_batched(
+                qb, kb, vb, session, device
+            ).to_numpy()
+            try:
+                np.testing.assert_allclose(
+                    batched_result, expected_batched, rtol=1e-4, atol=1e-4
+                )
+                print(f"✓ {name} batched attention {q_shape} PASSED")
+            except AssertionError as e:
+                print(f"✗ {name} batched attention {q_shape} FAILED")
+                print(str(e))
+
+    print(f"\n{'='*80}")
+    print("ONLINE-SOFTMAX ATTENTION")
+    print(f"{'='*80}")
+
+    # Sequence lengths well beyond a single tile, including a ragged last tile
+    for long_seq_len in [SEQ_LEN, 1000, 8192]:
+        ql = np.random.randn(D).astype(np.float32) * 0.1
+        kl = np.random.randn(long_seq_len, D).astype(np.float32) * 0.1
+        vl = np.random.randn(long_seq_len, D).astype(np.float32) * 0.1
+        expected_online = reference_attention(ql, kl, vl)
+
+        for name, session, device in [
+            ("CPU", cpu_session, CPU()),
+            ("GPU", gpu_session, Accelerator()),
+        ]:
+            online_result = attention_online(
+                ql, kl, vl, session, device
+            ).to_numpy()
+            try:
+                np.testing.assert_allclose(
+                    online_result, expected_online, rtol=1e-4, atol=1e-4
+                )
+                print(
+                    f"✓ {name} online attention seq_len={long_seq_len} PASSED"
+                )
+            except AssertionError as e:
+                print(
+                    f"✗ {name} online attention seq_len={long_seq_len} FAILED"
+                )
+                print(str(e))
+
+    print(f"\n{'='*80}")
+    print("ATTENTION AT OTHER SHAPES")
+    print(f"{'='*80}")
+
+    # No kernel edits needed: each (seq_len, d) compiles once, and sequences
+    # longer than one softmax block switch to the online-softmax kernel
+    for shape_seq_len, shape_d in [(100, 48), (3000, 64), (100, 48)]:
+        qs = np.random.randn(shape_d).astype(np.float32) * 0.1
+        ks = np.random.randn(shape_seq_len, shape_d).astype(np.float32) * 0.1
+        vs = np.random.randn(shape_seq_len, shape_d).astype(np.float32) * 0.1
+        expected_shape = reference_attention(qs, ks, vs)
+
+        for name, session, device in [
+            ("CPU", cpu_session, CPU()),
+            ("GPU", gpu_session, Accelerator()),
+        ]:
+            shape_result = attention(qs, ks, vs, session, device).to_numpy()
+            try:
+                np.testing.assert_allclose(
+                    shape_result, expected_shape, rtol=1e-4, atol=1e-4
+                )
+                print(
+                    f"✓ {name} attention seq_len={shape_seq_len},"
+                    f" d={shape_d} PASSED"
+                )
+            except AssertionError as e:
+                print(
+                    f"✗ {name} attention seq_len={shape_seq_len},"
+                    f" d={shape_d} FAILED"
+                )
+                print(str(e))
+
+    compiled = default_graph_cache().specializations("attention")
+    print(
+        "Compiled attention specializations:",
+        [key.input_shapes for key in compiled],
+    )
+
+    # Timings run after the checks, so `--benchmark` still validates results
+    if "--benchmark" in sys.argv[1:]:
+        run_benchmarks(benchmark_json_path(sys.argv[1:]))
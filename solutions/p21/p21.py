@@ -1,11 +1,49 @@
-import time
+import functools
+import os
+import sys
+import tempfile
 import torch
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional, Tuple, Union
+from max.dtype import DType
 from max.torch import CustomOpLibrary
 
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scripts"))
+from benchmark import (
+    benchmark,
+    benchmark_json_path,
+    print_results,
+    save_json,
+    torch_sync,
+)
+from kernel_tuner import KernelTuner
+
 mojo_kernels = Path(__file__).parent / "op"
 ops = CustomOpLibrary(mojo_kernels)
 
+# Index dtypes the embedding ops read in place; int64 is what data loaders
+# and torch.unique emit
+INDEX_DTYPES = (torch.int32, torch.int64)
+
+
+def _lookup_indices(indices: torch.Tensor) -> torch.Tensor:
+    """Indices in a dtype the lookup ops accept without a copy.
+
+    int32 and int64 tensors are passed through unchanged and the op is
+    specialized on their dtype. Other integer dtypes are widened to int64;
+    anything else is rejected, like `torch.nn.functional.embedding`.
+    """
+    if indices.dtype in INDEX_DTYPES:
+        return indices
+    if indices.dtype.is_floating_point or indices.dtype.is_complex:
+        raise TypeError(
+            f"indices must be an integer tensor, got {indices.dtype}"
+        )
+    if indices.dtype == torch.bool:
+        raise TypeError("indices must be an integer tensor, got torch.bool")
+    return indices.to(torch.int64)
+
 
 def embedding_mojo_1d(
     indices: torch.Tensor, weights: torch.Tensor
@@ -20,8 +58,7 @@ def embedding_mojo_1d(
         device=weights.device,
     )
 
-    if indices.dtype != torch.int32:
-        indices = indices.to(torch.int32)
+    indices = _lookup_indices(indices)
 
     embedding_op = ops.embedding[
         {
@@ -29,6 +66,7 @@ def embedding_mojo_1d(
             "seq_len": seq_len,
             "vocab_size": vocab_size,
             "embed_dim": embed_dim,
+            "index_dtype": DType.from_torch(indices.dtype),
         }
     ]
     embedding_op(output, indices, weights)
@@ -48,8 +86,7 @@ def embedding_mojo_2d(
         device=weights.device,
     )
 
-    if indices.dtype != torch.int32:
-        indices = indices.to(torch.int32)
+    indices = _lookup_indices(indices)
 
     embedding_op = ops.embedding_2d[
         {
@@ -57,17 +94,588 @@ def embedding_mojo_2d(
             "seq_len": seq_len,
             "vocab_size": vocab_size,
             "embed_dim": embed_dim,
+            "index_dtype": DType.from_torch(indices.dtype),
         }
     ]
     embedding_op(output, indices, weights)
     return output
 
 
+EMBEDDING_VARIANTS = {"1d": embedding_mojo_1d, "2d": embedding_mojo_2d}
+
+# Tuning choices persist across runs in the user cache directory
+# (XDG_CACHE_HOME, else ~/.cache); override the file with P21_TUNING_FILE
+DEFAULT_TUNING_FILE = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "mojo-gpu-puzzles"
+    / "p21_embedding_tuning.json"
+)
+_embedding_tuner: Optional[KernelTuner] = None
+
+
+def get_embedding_tuner() -> KernelTuner:
+    """The shared tuner, reading the tuning file on first use."""
+    global _embedding_tuner
+    if _embedding_tuner is None:
+        _embedding_tuner = KernelTuner(
+            Path(os.environ.get("P21_TUNING_FILE", DEFAULT_TUNING_FILE))
+        )
+    return _embedding_tuner
+
+
+def embedding_mojo_auto(
+    indices: torch.Tensor, weights: torch.Tensor
+) -> torch.Tensor:
+    """Embedding lookup routed to the fastest kernel for this shape.
+
+    The first call for a (batch, seq, vocab, embed_dim, index dtype,
+    device) key times every variant in EMBEDDING_VARIANTS and records the
+    winner in the tuning file; later calls go straight to it.
+    """
+    batch_size, seq_len = indices.shape
+    vocab_size, embed_dim = weights.shape
+    key = KernelTuner.key(
+        batch_size,
+        seq_len,
+        vocab_size,
+        embed_dim,
+        indices.dtype,
+        weights.device,
+    )
+    choice = get_embedding_tuner().choose(
+        key,
+        {
+            name: functools.partial(fn, indices, weights)
+            for name, fn in EMBEDDING_VARIANTS.items()
+        },
+        sync=torch_sync(weights.device),
+    )
+    return EMBEDDING_VARIANTS[choice](indices, weights)
+
+
+@dataclass
+class QuantizedEmbeddingTable:
+    """An embedding table stored as fp16, or int8 with a per-row affine map.
+
+    For int8 tables row r dequantizes as
+    (weights[r] - zero_point[r]) * scale[r].
+    """
+
+    weights: torch.Tensor
+    scale: Optional[torch.Tensor] = None
+    zero_point: Optional[torch.Tensor] = None
+
+    @property
+    def nbytes(self) -> int:
+        tensors = [self.weights, self.scale, self.zero_point]
+        return sum(
+            tensor.numel() * tensor.element_size()
+            for tensor in tensors
+            if tensor is not None
+        )
+
+
+def quantize_embedding(
+    embedding: Union[torch.nn.Embedding, torch.Tensor],
+    dtype: torch.dtype = torch.int8,
+) -> QuantizedEmbeddingTable:
+    """Convert an embedding (or its weight tensor) to an int8 or fp16 table.
+
+    int8 uses asymmetric per-row quantization over [min(row, 0),
+    max(row, 0)], so zero is exact and each row keeps its own range.
+    """
+    if isinstance(embedding, torch.nn.Embedding):
+        embedding = embedding.weight
+    weights = embedding.detach()
+
+    if dtype == torch.float16:
+        return QuantizedEmbeddingTable(weights.to(torch.float16).contiguous())
+    if dtype != torch.int8:
+        raise ValueError(f"unsupported table dtype: {dtype}")
+
+    weights = weights.float()
+    row_min = weights.amin(dim=1).clamp(max=0.0)
+    row_max = weights.amax(dim=1).clamp(min=0.0)
+    value_range = row_max - row_min
+    # All-zero rows get scale 1 so nothing divides by zero
+    scale = torch.where(value_range > 0, value_range / 255.0, 1.0)
+    zero_point = torch.round(-128.0 - row_min / scale)
+    quantized = torch.clamp(
+        torch.round(weights / scale[:, None]) + zero_point[:, None], -128, 127
+    ).to(torch.int8)
+    return QuantizedEmbeddingTable(
+        quantized.contiguous(), scale.contiguous(), zero_point.contiguous()
+    )
+
+
+def embedding_mojo_quantized(
+    indices: torch.Tensor, table: QuantizedEmbeddingTable
+) -> torch.Tensor:
+    """Lookup from an int8 or fp16 table, dequantized to float32 in-kernel."""
+    batch_size, seq_len = indices.shape
+    vocab_size, embed_dim = table.weights.shape
+
+    output = torch.empty(
+        (batch_size, seq_len, embed_dim),
+        dtype=torch.float32,
+        device=table.weights.device,
+    )
+
+    indices = _lookup_indices(indices)
+
+    parameters = {
+        "batch_size": batch_size,
+        "seq_len": seq_len,
+        "vocab_size": vocab_size,
+        "embed_dim": embed_dim,
+        "index_dtype": DType.from_torch(indices.dtype),
+    }
+    if table.weights.dtype == torch.int8:
+        ops.embedding_int8[parameters](
+            output, indices, table.weights, table.scale, table.zero_point
+        )
+    elif table.weights.dtype == torch.float16:
+        ops.embedding_fp16[parameters](output, indices, table.weights)
+    else:
+        raise ValueError(f"unsupported table dtype: {table.weights.dtype}")
+    return output
+
+
+# fp16 keeps 11 significant bits, so one rounding is within 2**-11 relative;
+# the absolute floor covers values that land in fp16's subnormal range
+FP16_RTOL = 1e-3
+QUANTIZED_ATOL = 1e-6
+
+
+def quantization_error_bound(
+    indices: torch.Tensor, table: QuantizedEmbeddingTable, reference
+) -> torch.Tensor:
+    """Largest error each looked-up element may show against float32.
+
+    fp16 is bounded relative to the value. int8 rounds to the nearest step
+    of its row's scale, so the error is at most scale / 2 for that row.
+    """
+    if table.scale is None:
+        return FP16_RTOL * reference.abs() + QUANTIZED_ATOL
+    row_scale = table.scale[indices.long()].unsqueeze(-1)
+    # Slack for float32 rounding in the dequantization itself
+    return row_scale * (0.5 + 1e-3) + QUANTIZED_ATOL
+
+
+def benchmark_quantized_tables(indices, embed_layer):
+    """Time fp32, fp16 and int8 lookups and check their accuracy deltas.
+
+    Raises AssertionError if a reduced-precision lookup is further from the
+    float32 one than its format allows (see quantization_error_bound).
+    """
+    reference = embedding_mojo_1d(indices, embed_layer.weight.data)
+    embed_dim = reference.shape[-1]
+    lookups = indices.numel()
+
+    results = []
+    for name, table in [
+        ("fp32", None),
+        ("fp16", quantize_embedding(embed_layer, torch.float16)),
+        ("int8", quantize_embedding(embed_layer, torch.int8)),
+    ]:
+        if table is None:
+            fn = functools.partial(
+                embedding_mojo_1d, indices, embed_layer.weight.data
+            )
+            row_bytes = embed_dim * 4
+            table_bytes = embed_layer.weight.numel() * 4
+        else:
+            fn = functools.partial(embedding_mojo_quantized, indices, table)
+            # Each lookup reads one row plus, for int8, its scale/zero point
+            row_bytes = embed_dim * table.weights.element_size()
+            row_bytes += 8 if table.scale is not None else 0
+            table_bytes = table.nbytes
+
+        output = fn()
+        error = (output - reference).abs()
+        max_diff = error.max().item()
+        relative = max_diff / reference.abs().max().item()
+        if table is not None:
+            bound = quantization_error_bound(indices, table, reference)
+            if (error > bound).any():
+                worst = (error / bound).max().item()
+                raise AssertionError(
+                    f"{name} lookup error is {worst:.2f}x its bound"
+                )
+        result = benchmark(
+            f"embedding_{name}",
+            fn,
+            device=str(indices.device.type),
+            sync=torch_sync(indices.device),
+            warmup=5,
+            bytes_moved=lookups * (row_bytes + embed_dim * 4 + 4),
+            params={
+                "table": name,
+                "table_bytes": table_bytes,
+                "max_abs_error": max_diff,
+                "max_rel_error": relative,
+            },
+        )
+        print(
+            f"   {name}: table {table_bytes / 1e6:8.2f} MB,"
+            f" {result.gb_per_s:8.2f} GB/s, max error {max_diff:.2e}"
+            f" ({relative:.2e} relative)"
+        )
+        results.append(result)
+    return results
+
+
+def benchmark_index_dtypes(indices, weights):
+    """Time int64 indices with the old int32 copy and read natively."""
+    indices_int64 = indices.to(torch.int64)
+    # Table rows read plus output written, before any index traffic
+    lookup_bytes = 2 * indices.numel() * weights.shape[1]
+    lookup_bytes *= weights.element_size()
+    results = [
+        benchmark(
+            name,
+            fn,
+            device=str(weights.device),
+            sync=torch_sync(weights.device),
+            warmup=5,
+            bytes_moved=lookup_bytes + indices.numel() * index_bytes,
+            params={"index_dtype": "int64"},
+        )
+        for name, fn, index_bytes in [
+            (
+                "embedding_1d_int64_copy",
+                lambda: embedding_mojo_1d(
+                    indices_int64.to(torch.int32), weights
+                ),
+                # int64 read + int32 write by the copy, int32 read by the op
+                8 + 4 + 4,
+            ),
+            (
+                "embedding_1d_int64_native",
+                lambda: embedding_mojo_1d(indices_int64, weights),
+                8,
+            ),
+        ]
+    ]
+    print_results(results)
+    speedup = results[0].median_s / results[1].median_s
+    print(f"   native int64 indices are {speedup:.2f}x the speed of the copy")
+    return results
+
+
+EMBEDDING_BAG_MODES = ("sum", "mean", "max")
+
+
+def _check_offsets(offsets: torch.Tensor, num_indices: int) -> None:
+    """Reject bag offsets the kernel would read out of bounds.
+
+    The kernel trusts the CSR bounds, so they are checked here the way
+    `torch.nn.functional.embedding_bag` checks them: a non-empty 1-D
+    tensor that starts at 0, never decreases and ends within the indices.
+    """
+    if offsets.dim() != 1 or offsets.numel() == 0:
+        raise ValueError(
+            "offsets has to be a non-empty 1D Tensor, but got shape"
+            f" {tuple(offsets.shape)}"
+        )
+    first = int(offsets[0])
+    if first != 0:
+        raise ValueError(
+            "offsets[0] has to be 0, i.e., the first sequence in the"
+            f" mini-batch has to start from position 0. However, got {first}"
+        )
+    if bool((offsets[1:] < offsets[:-1]).any()):
+        raise ValueError("offsets has to be non-decreasing")
+    last = int(offsets[-1])
+    if last > num_indices:
+        raise ValueError(
+            "offsets[-1] can not be greater than input's length"
+            f" {num_indices}, but got offsets[-1] of {last}"
+        )
+
+
+def embedding_bag_mojo(
+    indices: torch.Tensor,
+    weights: torch.Tensor,
+    offsets: Optional[torch.Tensor] = None,
+    mode: str = "mean",
+) -> torch.Tensor:
+    """Pooled embedding lookup, like `torch.nn.functional.embedding_bag`.
+
+    `indices` is either [num_bags, bag_size] (one fixed-size bag per row,
+    `offsets` must be None) or a flat [num_indices] tensor with `offsets`
+    giving the start of each bag. The kernel reduces each bag with `mode`
+    and writes only the pooled [num_bags, embed_dim] result. Invalid
+    offsets raise ValueError.
+    """
+    if mode not in EMBEDDING_BAG_MODES:
+        raise ValueError(f"mode must be one of {EMBEDDING_BAG_MODES}")
+    vocab_size, embed_dim = weights.shape
+
+    if indices.dim() == 2:
+        if offsets is not None:
+            raise ValueError("offsets must be None for 2-D indices")
+        num_bags, bag_size = indices.shape
+        indices = indices.reshape(-1)
+        bounds = torch.arange(
+            0,
+            num_bags * bag_size + 1,
+            bag_size,
+            dtype=torch.int32,
+            device=indices.device,
+        )
+    elif indices.dim() == 1:
+        if offsets is None:
+            raise ValueError("offsets are required for 1-D indices")
+        _check_offsets(offsets, indices.shape[0])
+        num_bags = offsets.shape[0]
+        # CSR bounds: bag b owns indices[bounds[b]:bounds[b + 1]]
+        bounds = torch.empty(
+            num_bags + 1, dtype=torch.int32, device=indices.device
+        )
+        bounds[:num_bags] = offsets
+        bounds[num_bags] = indices.shape[0]
+    else:
+        raise ValueError("indices must be 1-D or 2-D")
+
+    output = torch.empty(
+        (num_bags, embed_dim), dtype=weights.dtype, device=weights.device
+    )
+
+    indices = _lookup_indices(indices)
+
+    embedding_bag_op = ops.embedding_bag[
+        {
+            "vocab_size": vocab_size,
+            "embed_dim": embed_dim,
+            "mode": mode,
+            "index_dtype": DType.from_torch(indices.dtype),
+        }
+    ]
+    embedding_bag_op(output, indices, bounds, weights)
+    return output
+
+
+def embedding_backward_mojo(
+    grad_output: torch.Tensor,
+    indices: torch.Tensor,
+    vocab_size: int,
+    sparse: bool = False,
+) -> Union[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
+    """Weight gradient of an embedding lookup, scatter-added in one kernel.
+
+    Returns the dense [vocab_size, embed_dim] gradient, or with
+    `sparse=True` the pair (unique_indices, values) holding one summed
+    gradient row per distinct in-range token. Repeated tokens are summed
+    with atomics, so the dense path needs no sort of the indices.
+    """
+    embed_dim = grad_output.shape[-1]
+    flat_indices = indices.reshape(-1)
+    grad_output = grad_output.reshape(-1, embed_dim).contiguous()
+
+    if sparse:
+        # Accumulate into one row per unique token
+        unique_indices, rows = torch.unique(flat_indices, return_inverse=True)
+        num_rows = unique_indices.numel()
+    else:
+        rows, num_rows = flat_indices, vocab_size
+
+    rows = _lookup_indices(rows)
+
+    grad = torch.empty(
+        (num_rows, embed_dim),
+        dtype=grad_output.dtype,
+        device=grad_output.device,
+    )
+    embedding_backward_op = ops.embedding_backward[
+        {
+            "embed_dim": embed_dim,
+            "index_dtype": DType.from_torch(rows.dtype),
+        }
+    ]
+    embedding_backward_op(grad, rows, grad_output)
+
+    if not sparse:
+        return grad
+    # Out-of-range tokens read zeros in the forward and get no gradient
+    valid = (unique_indices >= 0) & (unique_indices < vocab_size)
+    return unique_indices[valid], grad[valid]
+
+
+class EmbeddingFunction(torch.autograd.Function):
+    """Embedding lookup with the Mojo forward and scatter-add backward."""
+
+    @staticmethod
+    def forward(ctx, indices, weights, sparse=False):
+        ctx.save_for_backward(indices)
+        ctx.weight_shape = weights.shape
+        ctx.sparse = sparse
+        return embedding_mojo_1d(indices, weights)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        (indices,) = ctx.saved_tensors
+        vocab_size = ctx.weight_shape[0]
+        if ctx.sparse:
+            unique_indices, values = embedding_backward_mojo(
+                grad_output, indices, vocab_size, sparse=True
+            )
+            # Same layout as torch.nn.Embedding(sparse=True) gradients
+            grad_weights = torch.sparse_coo_tensor(
+                unique_indices.unsqueeze(0), values, ctx.weight_shape
+            )
+        else:
+            grad_weights = embedding_backward_mojo(
+                grad_output, indices, vocab_size
+            )
+        return None, grad_weights, None
+
+
+class MojoEmbedding(torch.nn.Module):
+    """Drop-in for `torch.nn.Embedding` backed by the Mojo kernels.
+
+    The kernels are float32-only, so other weight dtypes are rejected.
+    """
+
+    def __init__(
+        self,
+        num_embeddings: int,
+        embedding_dim: int,
+        sparse: bool = False,
+        device=None,
+        dtype=torch.float32,
+    ):
+        if dtype != torch.float32:
+            raise ValueError(
+                f"MojoEmbedding supports float32 only, got {dtype}"
+            )
+        super().__init__()
+        self.sparse = sparse
+        self.weight = torch.nn.Parameter(
+            torch.empty(
+                num_embeddings, embedding_dim, device=device, dtype=dtype
+            )
+        )
+        torch.nn.init.normal_(self.weight)
+
+    def forward(self, indices: torch.Tensor) -> torch.Tensor:
+        return EmbeddingFunction.apply(indices, self.weight, self.sparse)
+
+
+def test_embedding_backward(device: str = "cpu") -> bool:
+    """Compare MojoEmbedding gradients with torch.nn.Embedding."""
+    torch.manual_seed(0)
+    vocab_size, embed_dim = 64, 32
+    cases = [
+        # A small vocabulary guarantees repeated tokens (contended atomics)
+        ("duplicates", torch.randint(0, vocab_size, (4, 16))),
+        # A permutation has every token once (one writer per row)
+        ("unique", torch.randperm(vocab_size)[:48].reshape(4, 12)),
+    ]
+
+    all_correct = True
+    for sparse in (False, True):
+        for label, indices in cases:
+            indices = indices.to(device)
+            reference = torch.nn.Embedding(
+                vocab_size, embed_dim, sparse=sparse, device=device
+            )
+            mojo = MojoEmbedding(
+                vocab_size, embed_dim, sparse=sparse, device=device
+            )
+            with torch.no_grad():
+                mojo.weight.copy_(reference.weight)
+            grad_output = torch.randn(*indices.shape, embed_dim, device=device)
+
+            reference(indices).backward(grad_output)
+            mojo(indices).backward(grad_output)
+
+            expected, actual = reference.weight.grad, mojo.weight.grad
+            layout_ok = actual.is_sparse == sparse
+            if sparse:
+                expected, actual = expected.to_dense(), actual.to_dense()
+            max_diff = (expected - actual).abs().max().item()
+            is_correct = layout_ok and max_diff < 1e-5
+            all_correct = all_correct and is_correct
+            print(
+                f"   backward {'sparse' if sparse else 'dense':<6}"
+                f" {label:<10} - Max difference: {max_diff:.2e}"
+                f" {'✅' if is_correct else '❌'}"
+            )
+    return all_correct
+
+
+def test_embedding_bag(indices, weights):
+    """Compare embedding_bag_mojo with PyTorch for fixed and ragged bags."""
+    flat_indices = indices.reshape(-1)
+    # Ragged bags of varying size, including an empty one
+    sizes = torch.tensor([0, 1, 3, 7], device=indices.device).repeat(
+        flat_indices.numel() // 11
+    )
+    ragged_offsets = (torch.cumsum(sizes, 0) - sizes).to(indices.dtype)
+    ragged_indices = flat_indices[: int(sizes.sum())]
+
+    all_correct = True
+    for mode in EMBEDDING_BAG_MODES:
+        for label, args in [
+            ("fixed", (indices, None)),
+            ("ragged", (ragged_indices, ragged_offsets)),
+        ]:
+            expected = torch.nn.functional.embedding_bag(
+                args[0], weights, args[1], mode=mode
+            )
+            actual = embedding_bag_mojo(args[0], weights, args[1], mode=mode)
+            max_diff = (expected - actual).abs().max().item()
+            is_correct = max_diff < 1e-5
+            all_correct = all_correct and is_correct
+            print(
+                f"   embedding_bag {mode:<4} {label:<6} - Max difference:"
+                f" {max_diff:.2e} {'✅' if is_correct else '❌'}"
+            )
+
+    # Offsets the kernel would read out of bounds are rejected up front
+    num_indices = ragged_indices.numel()
+    for label, values in [
+        ("nonzero start", [1, 2]),
+        ("decreasing", [0, 3, 2]),
+        ("past end", [0, num_indices + 1]),
+    ]:
+        bad_offsets = torch.tensor(
+            values, dtype=indices.dtype, device=indices.device
+        )
+        try:
+            embedding_bag_mojo(ragged_indices, weights, bad_offsets)
+            is_correct = False
+        except ValueError:
+            is_correct = True
+        all_correct = all_correct and is_correct
+        print(
+            f"   embedding_bag offsets {label:<13} - ValueError:"
+            f" {'✅' if is_correct else '❌'}"
+        )
+    return all_correct
+
+
 if __name__ == "__main__":
+    # The demo tunes into a throwaway file rather than the user's cache,
+    # unless P21_TUNING_FILE already names one
+    tuning_dir = tempfile.TemporaryDirectory(prefix="p21_tuning_")
+    os.environ.setdefault(
+        "P21_TUNING_FILE",
+        str(Path(tuning_dir.name) / "p21_embedding_tuning.json"),
+    )
+
     print("Puzzle 21: Mojo Embedding Kernel Comparison")
     print("=" * 70)
     print()
 
+    print("Testing Embedding Backward against torch.nn.Embedding...")
+    for backward_device in ["cpu", "cuda"]:
+        if not test_embedding_backward(backward_device):
+            print(f"   ❌ embedding backward INCORRECT on {backward_device}")
+            exit(1)
+    print()
+
     batch_size, seq_len, vocab_size, embed_dim = 8, 512, 10000, 512
     print(
         f"Configuration: B={batch_size}, L={seq_len}, V={vocab_size},"
@@ -101,7 +709,15 @@ if __name__ == "__main__":
         max_diff_2d = (ref_output - mojo_2d_output).abs().max().item()
         print(f"   2D Non-coalesced - Max difference: {max_diff_2d:.2e}")
 
-        if max_diff_1d < 1e-5 and max_diff_2d < 1e-5:
+        # int64 indices are read in place by the same kernels
+        indices_int64 = indices.to(torch.int64)
+        max_diff_int64 = max(
+            (ref_output - fn(indices_int64, weights)).abs().max().item()
+            for fn in (embedding_mojo_1d, embedding_mojo_2d)
+        )
+        print(f"   int64 indices - Max difference: {max_diff_int64:.2e}")
+
+        if max(max_diff_1d, max_diff_2d, max_diff_int64) < 1e-5:
             print("   ✅ Both implementations CORRECT")
         else:
             print("   ❌ One or both implementations INCORRECT")
@@ -114,33 +730,32 @@ if __name__ == "__main__":
     print()
     print("Benchmarking Mojo Kernels...")
 
-    # Warmup
-    for _ in range(5):
-        _ = embedding_mojo_1d(indices, weights)
-        _ = embedding_mojo_2d(indices, weights)
-
-    torch.cuda.synchronize()
-
-    # Benchmark function
-    def benchmark_fn(fn, *args, num_trials=10):
-        torch.cuda.synchronize()
-        start_time = time.perf_counter()
-
-        for _ in range(num_trials):
-            _ = fn(*args)
-
-        torch.cuda.synchronize()
-        end_time = time.perf_counter()
-
-        avg_time_ms = (end_time - start_time) * 1000 / num_trials
-        return avg_time_ms
-
-    # Benchmark both kernels
-    time_1d = benchmark_fn(embedding_mojo_1d, indices, weights)
-    time_2d = benchmark_fn(embedding_mojo_2d, indices, weights)
+    # Each element is read from the table and written to the output once
+    bytes_moved = 2 * ref_output.numel() * ref_output.element_size()
+    bytes_moved += indices.numel() * indices.element_size()
+    results = [
+        benchmark(
+            f"embedding_{name}",
+            lambda fn=fn: fn(indices, weights),
+            device="cuda",
+            sync=torch_sync("cuda"),
+            warmup=5,
+            bytes_moved=bytes_moved,
+            params={
+                "batch_size": batch_size,
+                "seq_len": seq_len,
+                "vocab_size": vocab_size,
+                "embed_dim": embed_dim,
+            },
+        )
+        for name, fn in [("1d", embedding_mojo_1d), ("2d", embedding_mojo_2d)]
+    ]
+    time_1d = results[0].median_s * 1000
+    time_2d = results[1].median_s * 1000
 
     print()
     print("Performance Results:")
+    print_results(results)
     print(f"   1D Coalesced:     {time_1d:.3f} ms")
     print(f"   2D Non-coalesced: {time_2d:.3f} ms")
 
@@ -151,6 +766,71 @@ if __name__ == "__main__":
         speedup = time_1d / time_2d
         print(f"   2D is {speedup:.2f}x faster than 1D")
 
+    # The dispatcher makes the same comparison once and remembers it
+    auto_output = embedding_mojo_auto(indices, weights)
+    tuner = get_embedding_tuner()
+    key = KernelTuner.key(
+        batch_size,
+        seq_len,
+        vocab_size,
+        embed_dim,
+        indices.dtype,
+        weights.device,
+    )
+    print(
+        f"   embedding_mojo_auto selected {tuner.choices()[key]}"
+        f" (tuning file: {tuner.path})"
+    )
+    if (ref_output - auto_output).abs().max().item() >= 1e-5:
+        print("   ❌ embedding_mojo_auto INCORRECT")
+        exit(1)
+
+    print()
+    print("Benchmarking int64 Indices (no int32 copy)...")
+    results += benchmark_index_dtypes(indices, weights)
+
+    print()
+    print("Testing Embedding Bag (in-kernel pooling)...")
+    for bag_indices in [indices, indices.to(torch.int64)]:
+        if not test_embedding_bag(bag_indices, weights):
+            print(f"   ❌ embedding_bag INCORRECT for {bag_indices.dtype}")
+            exit(1)
+
+    # Pooling in-kernel reads the rows but writes only [batch, embed_dim]
+    pooled_bytes = ref_output.numel() * ref_output.element_size()
+    pooled_bytes += batch_size * embed_dim * ref_output.element_size()
+    pooled_bytes += indices.numel() * indices.element_size()
+    pooled_results = [
+        benchmark(
+            "lookup_then_mean",
+            lambda: embedding_mojo_1d(indices, weights).mean(dim=1),
+            device="cuda",
+            sync=torch_sync("cuda"),
+            warmup=5,
+            bytes_moved=pooled_bytes,
+        ),
+        benchmark(
+            "embedding_bag_mean",
+            lambda: embedding_bag_mojo(indices, weights, mode="mean"),
+            device="cuda",
+            sync=torch_sync("cuda"),
+            warmup=5,
+            bytes_moved=pooled_bytes,
+        ),
+    ]
+    print_results(pooled_results)
+    speedup = pooled_results[0].median_s / pooled_results[1].median_s
+    print(f"   embedding_bag is {speedup:.2f}x the speed of lookup + mean")
+    results += pooled_results
+
+    print()
+    print("Benchmarking Quantized Tables (dequantized in-kernel)...")
+    results += benchmark_quantized_tables(indices, embed_layer)
+
+    json_path = benchmark_json_path(sys.argv[1:])
+    if json_path is not None:
+        save_json(results, json_path)
+
     print()
     print("Key Learning Points:")
     print("• Compare different GPU kernel implementations")
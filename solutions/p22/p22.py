@@ -1,34 +1,42 @@
 import time
 import argparse
+import functools
+import itertools
 from pathlib import Path
 import os
+import statistics
+import subprocess
+import sys
+import tempfile
 import warnings
 import logging
+from typing import Optional
 
-import torch
-from max.torch import CustomOpLibrary
 
-# Suppress PyTorch internal logging that causes cudagraphs messages
-logging.getLogger("torch._dynamo").setLevel(logging.WARNING)
-logging.getLogger("torch._inductor").setLevel(logging.WARNING)
+class _LazyTorch:
+    """Stands in for the torch module until a p22 function first uses it.
+
+    Importing torch costs far more than the rest of this module, and code
+    that only imports p22 should not pay for it. The first attribute access
+    imports torch and replaces this object with the real module.
+    """
+
+    def __getattr__(self, name):
+        global torch
+        import torch as module
+
+        torch = module
+        return getattr(module, name)
 
-# Configure torch.compile for optimal performance
-torch._dynamo.config.cache_size_limit = 64
-torch._dynamo.config.suppress_errors = True
-torch._dynamo.config.optimize_ddp = False
-torch._dynamo.config.automatic_dynamic_shapes = True
-torch._dynamo.config.verbose = False
 
-# Set environment variables for better performance
-os.environ["TORCHINDUCTOR_CACHE_DIR"] = "/tmp/torch_cache"
-os.environ["TRITON_CACHE_DIR"] = "/tmp/triton_cache"
-os.environ["TORCH_LOGS"] = "-dynamo"
+torch = _LazyTorch()
 
-# Suppress unnecessary warnings
-warnings.filterwarnings("ignore", category=UserWarning, module="torch")
-warnings.filterwarnings("ignore", message=".*grad attribute.*non-leaf Tensor.*")
-warnings.filterwarnings("ignore", message=".*skipping cudagraphs.*")
-warnings.filterwarnings("ignore", message=".*mutated inputs.*")
+
+def _use_scripts():
+    """Make the shared helpers in scripts/ importable."""
+    scripts = str(Path(__file__).resolve().parents[2] / "scripts")
+    if scripts not in sys.path:
+        sys.path.append(scripts)
 
 
 BATCH_SIZE = 4
@@ -37,79 +45,208 @@ HIDDEN_DIM = 8
 OUTPUT_DIM = 16
 EPS = 1e-5
 
-print(
-    f"Testing with dimensions: [{BATCH_SIZE}, {SEQ_LEN}, {HIDDEN_DIM}] ->"
-    f" [{BATCH_SIZE}, {SEQ_LEN}, {OUTPUT_DIM}]"
-)
-
 mojo_kernels = Path(__file__).parent / "op"
-ops = CustomOpLibrary(mojo_kernels)
-print("✅ Loaded Mojo operations library")
-
-# Global compilation cache that persists across function calls
-_global_compile_cache = {}
 
 
-def get_cached_compiled_op(op, cache_key):
-    """Global caching to avoid recompilation."""
-    if cache_key not in _global_compile_cache:
-        _global_compile_cache[cache_key] = torch.compile(
-            op, mode="reduce-overhead"
-        )
-    return _global_compile_cache[cache_key]
+class P22Runtime:
+    """Process-wide setup for running the Mojo ops, done on first use.
 
+    Importing this module only defines functions and classes. The op
+    library, the torch.compile settings and the compile cache are set up the
+    first time a kernel actually runs, so code that imports p22 for
+    `SimpleNeuralNetwork` or the reference functions pays nothing and keeps
+    its own dynamo configuration.
+    """
 
-class LayerNormLinearFunction(torch.autograd.Function):
-    """Custom autograd function for LayerNorm + Linear fusion."""
+    def __init__(self, kernels_path, cache_size):
+        _use_scripts()
+        from op_cache import LRUOpCache
 
-    @staticmethod
-    def forward(ctx, input, ln_weight, ln_bias, linear_weight, linear_bias):
-        """Forward pass using our custom Mojo operation."""
-        # Save tensors for backward pass
-        ctx.save_for_backward(
-            input, ln_weight, ln_bias, linear_weight, linear_bias
+        self.kernels_path = kernels_path
+        # Bounded so runs with many distinct shapes do not keep every
+        # compiled op alive; override the size with P22_COMPILE_CACHE_SIZE.
+        self.compile_cache = LRUOpCache(
+            max_entries=cache_size, on_evict=self._release_compiled
         )
-
-        # Use our custom Mojo operation (detached to avoid autograd conflicts)
-        result = mojo_layernorm_linear(
-            input.detach(),
-            ln_weight.detach(),
-            ln_bias.detach(),
-            linear_weight.detach(),
-            linear_bias.detach(),
+        self._ops = None
+        self._configured = False
+
+    def configure(self):
+        """Apply the torch.compile settings the p22 kernels are tuned for."""
+        if self._configured:
+            return
+        self._configured = True
+
+        # Suppress PyTorch internal logging that causes cudagraphs messages
+        logging.getLogger("torch._dynamo").setLevel(logging.WARNING)
+        logging.getLogger("torch._inductor").setLevel(logging.WARNING)
+
+        # Configure torch.compile for optimal performance
+        torch._dynamo.config.cache_size_limit = 64
+        torch._dynamo.config.suppress_errors = True
+        torch._dynamo.config.optimize_ddp = False
+        torch._dynamo.config.automatic_dynamic_shapes = True
+        torch._dynamo.config.verbose = False
+
+        # Compile caches default to /tmp, but the caller's settings win
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", "/tmp/torch_cache")
+        os.environ.setdefault("TRITON_CACHE_DIR", "/tmp/triton_cache")
+        os.environ.setdefault("TORCH_LOGS", "-dynamo")
+
+        # Suppress unnecessary warnings
+        warnings.filterwarnings("ignore", category=UserWarning, module="torch")
+        warnings.filterwarnings(
+            "ignore", message=".*grad attribute.*non-leaf Tensor.*"
         )
-        return result
+        warnings.filterwarnings("ignore", message=".*skipping cudagraphs.*")
+        warnings.filterwarnings("ignore", message=".*mutated inputs.*")
 
     @staticmethod
-    def backward(ctx, grad_output):
-        """Backward pass using our custom Mojo operation."""
-        input, ln_weight, ln_bias, linear_weight, linear_bias = (
-            ctx.saved_tensors
+    def _release_compiled(key, compiled):
+        """Free what an evicted op left behind outside the cache.
+
+        Dropping the torch.compile wrapper does not release its dynamo code
+        cache entries or the CUDA graphs captured by mode="reduce-overhead".
+        dynamo can only reset everything at once, so the ops still cached
+        recompile on their next call; eviction is rare once the working set
+        fits in the cache.
+        """
+        torch._dynamo.reset()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    @property
+    def ops(self):
+        """The Mojo op library, loaded (and compiled) on first access."""
+        if self._ops is None:
+            self.configure()
+            from max.torch import CustomOpLibrary
+
+            self._ops = CustomOpLibrary(self.kernels_path)
+            print("✅ Loaded Mojo operations library")
+        return self._ops
+
+
+_runtime: Optional[P22Runtime] = None
+
+
+def get_runtime():
+    """The shared P22Runtime, created on first call."""
+    global _runtime
+    if _runtime is None:
+        _runtime = P22Runtime(
+            mojo_kernels,
+            cache_size=int(os.environ.get("P22_COMPILE_CACHE_SIZE", "32")),
         )
+    return _runtime
 
-        # Use our custom backward operation (detached)
-        grad_input, grad_ln_weight, grad_ln_bias, grad_linear_weight, grad_linear_bias = mojo_layernorm_linear_backward(
-            input.detach(),
-            ln_weight.detach(),
-            ln_bias.detach(),
-            linear_weight.detach(),
-            linear_bias.detach(),
-            grad_output.detach(),
-        )
 
-        return (
-            grad_input,
-            grad_ln_weight,
-            grad_ln_bias,
-            grad_linear_weight,
-            grad_linear_bias,
+def get_cached_compiled_op(op_name, parameters, reference):
+    """Global caching to avoid recompilation.
+
+    The key holds the op name, every compile-time parameter and the dtype and
+    device of `reference`, so each specialization gets its own entry.
+    """
+    runtime = get_runtime()
+    from op_cache import OpCacheKey
+
+    key = OpCacheKey.create(
+        op_name, parameters, reference.dtype, reference.device
+    )
+    return runtime.compile_cache.get_or_create(
+        key,
+        lambda: torch.compile(
+            getattr(runtime.ops, op_name)[parameters], mode="reduce-overhead"
+        ),
+    )
+
+
+def _allocate_empty(shape, dtype, device):
+    return torch.empty(shape, dtype=dtype, device=device)
+
+
+def create_workspace():
+    """Arena that reuses output and gradient buffers across training steps.
+
+    Pass it as `workspace=` to the run_mojo_* functions. Every buffer it hands
+    out is overwritten by the next call with the same shapes, so clone
+    anything that must outlive the step.
+    """
+    _use_scripts()
+    from tensor_arena import TensorArena
+
+    return TensorArena(_allocate_empty)
+
+
+def _empty(workspace, name, shape, like, dtype=None):
+    """Uninitialized buffer, from `workspace` if one is given.
+
+    The buffer matches `like`'s dtype and device unless `dtype` overrides it.
+    """
+    dtype = like.dtype if dtype is None else dtype
+    if workspace is None:
+        return torch.empty(shape, dtype=dtype, device=like.device)
+    return workspace.get(name, shape, dtype, like.device)
+
+
+# Half-precision activations and weights are supported by every op; the
+# kernels accumulate LayerNorm statistics and dot products in float32. The
+# backward kernels accumulate parameter gradients with float32 atomics, so
+# half-precision backward calls are upcast and the gradients cast back.
+def _is_half(dtype):
+    return dtype in (torch.float16, torch.bfloat16)
+
+
+# Activations the fused epilogue can apply after the Linear bias
+EPILOGUE_ACTIVATIONS = (None, "none", "relu", "gelu")
+
+
+def _op_parameters(input, **parameters):
+    """Compile-time op parameters, including the dtype of `input`."""
+    from max.dtype import DType
+
+    return {**parameters, "dtype": DType.from_torch(input.dtype)}
+
+
+def compile_cache_info():
+    """Counters and cached keys (least recently used first) of the cache."""
+    compile_cache = get_runtime().compile_cache
+    return {
+        **compile_cache.stats(),
+        "keys": compile_cache.keys(),
+    }
+
+
+def _activation_backward(activation, grad_output, pre_activation):
+    """Gradient through the epilogue activation at `pre_activation`."""
+    if activation == "relu":
+        return grad_output * (pre_activation > 0)
+    if activation == "gelu":
+        # d/dx [x * Phi(x)] = Phi(x) + x * phi(x)
+        cdf = 0.5 * (1.0 + torch.erf(pre_activation * 0.5**0.5))
+        pdf = torch.exp(-0.5 * pre_activation * pre_activation) / (
+            (2 * torch.pi) ** 0.5
         )
+        return grad_output * (cdf + pre_activation * pdf)
+    return grad_output
 
 
 def mojo_layernorm_linear(
-    input, ln_weight, ln_bias, linear_weight, linear_bias
+    input,
+    ln_weight,
+    ln_bias,
+    linear_weight,
+    linear_bias,
+    return_stats=False,
+    activation=None,
+    residual=None,
 ):
-    """Forward pass using Mojo implementation."""
+    """Forward pass using Mojo implementation.
+
+    With `return_stats=True` this returns (output, mean, rstd), where mean
+    and rstd are the per-row LayerNorm statistics of shape [batch, seq].
+    `activation` ("relu"/"gelu") and `residual` are fused into the kernel.
+    """
     output, error = run_mojo_implementation(
         input.detach(),
         ln_weight.detach(),
@@ -117,7 +254,10 @@ def mojo_layernorm_linear(
         linear_weight.detach(),
         linear_bias.detach(),
         algorithm="fused",
-        target="gpu",
+        target="auto",
+        return_stats=return_stats,
+        activation=activation,
+        residual=residual.detach() if residual is not None else None,
     )
     if output is None:
         raise RuntimeError(f"Mojo forward pass failed: {error}")
@@ -125,11 +265,31 @@ def mojo_layernorm_linear(
 
 
 def mojo_layernorm_linear_backward(
-    input, ln_weight, ln_bias, linear_weight, linear_bias, grad_output
+    input,
+    ln_weight,
+    ln_bias,
+    linear_weight,
+    linear_bias,
+    grad_output,
+    mean=None,
+    rstd=None,
 ):
-    """Backward pass using Mojo implementation."""
-    forward_output, gradients, error = run_mojo_backward_implementation(
-        input, ln_weight, ln_bias, linear_weight, linear_bias, target="gpu"
+    """Backward pass using Mojo implementation.
+
+    Runs only the backward kernel with the caller's `grad_output`; the
+    forward pass is not recomputed. Passing the forward's `mean` and `rstd`
+    also skips recomputing the LayerNorm statistics.
+    """
+    gradients, error = run_mojo_backward_op(
+        grad_output,
+        input,
+        ln_weight,
+        ln_bias,
+        linear_weight,
+        target="auto",
+        mean=mean,
+        rstd=rstd,
+        linear_bias=linear_bias,
     )
     if gradients is None:
         raise RuntimeError(f"Mojo backward pass failed: {error}")
@@ -143,79 +303,229 @@ def mojo_layernorm_linear_backward(
 
 
 def mojo_layernorm_linear_autograd(
-    input, ln_weight, ln_bias, linear_weight, linear_bias
+    input,
+    ln_weight,
+    ln_bias,
+    linear_weight,
+    linear_bias,
+    activation=None,
+    residual=None,
 ):
     """Wrapper function that uses our custom autograd function."""
+    _define_torch_classes()
     return LayerNormLinearFunction.apply(
-        input, ln_weight, ln_bias, linear_weight, linear_bias
+        input,
+        ln_weight,
+        ln_bias,
+        linear_weight,
+        linear_bias,
+        activation,
+        residual,
     )
 
 
-class SimpleTransformerBlock(torch.nn.Module):
-    """A simple transformer block using our custom LayerNorm + Linear operations.
-    """
+# The torch.autograd.Function and torch.nn.Module subclasses need torch when
+# their class statements run, so they are defined on first use: through the
+# module __getattr__ for `p22.SimpleNeuralNetwork`, or _define_torch_classes()
+# inside this module.
+_TORCH_CLASSES = (
+    "LayerNormLinearFunction",
+    "SimpleTransformerBlock",
+    "SimpleNeuralNetwork",
+)
 
-    def __init__(self, hidden_dim, ff_dim, use_mojo=True, device="cuda"):
-        super().__init__()
-        self.hidden_dim = hidden_dim
-        self.ff_dim = ff_dim
-        self.use_mojo = use_mojo
-        self.device = device
 
-        # Layer 1: LayerNorm + Linear (hidden_dim -> ff_dim)
-        self.ln1_weight = torch.nn.Parameter(
-            torch.ones(hidden_dim, device=device)
-        )
-        self.ln1_bias = torch.nn.Parameter(
-            torch.zeros(hidden_dim, device=device)
-        )
-        self.linear1_weight = torch.nn.Parameter(
-            torch.randn(ff_dim, hidden_dim, device=device) / (hidden_dim**0.5)
-        )
-        self.linear1_bias = torch.nn.Parameter(
-            torch.zeros(ff_dim, device=device)
-        )
+def _define_torch_classes():
+    global LayerNormLinearFunction, SimpleTransformerBlock, SimpleNeuralNetwork
+    if "SimpleNeuralNetwork" in globals():
+        return
 
-        # Layer 2: LayerNorm + Linear (ff_dim -> hidden_dim)
-        self.ln2_weight = torch.nn.Parameter(torch.ones(ff_dim, device=device))
-        self.ln2_bias = torch.nn.Parameter(torch.zeros(ff_dim, device=device))
-        self.linear2_weight = torch.nn.Parameter(
-            torch.randn(hidden_dim, ff_dim, device=device) / (ff_dim**0.5)
-        )
-        self.linear2_bias = torch.nn.Parameter(
-            torch.zeros(hidden_dim, device=device)
-        )
+    class LayerNormLinearFunction(torch.autograd.Function):
+        """Custom autograd function for LayerNorm + Linear fusion.
+
+        The optional `activation` and `residual` run in the fused kernel's
+        epilogue; the residual receives `grad_output` unchanged.
+        """
+
+        @staticmethod
+        def forward(
+            ctx,
+            input,
+            ln_weight,
+            ln_bias,
+            linear_weight,
+            linear_bias,
+            activation=None,
+            residual=None,
+        ):
+            """Forward pass using our custom Mojo operation."""
+            # Use our custom Mojo operation (detached to avoid autograd
+            # conflicts). It also returns the per-row LayerNorm mean and rstd for backward.
+            result, mean, rstd = mojo_layernorm_linear(
+                input.detach(),
+                ln_weight.detach(),
+                ln_bias.detach(),
+                linear_weight.detach(),
+                linear_bias.detach(),
+                return_stats=True,
+                activation=activation,
+                residual=residual,
+            )
 
-    def forward(self, x):
-        # Layer 1: LayerNorm + Linear + ReLU
-        if self.use_mojo:
-            x1 = mojo_layernorm_linear_autograd(
-                x,
-                self.ln1_weight,
-                self.ln1_bias,
-                self.linear1_weight,
-                self.linear1_bias,
+            # ReLU's mask can be read off its own output (relu(x) > 0 iff x > 0)
+            # as long as no residual was added on top; any other epilogue
+            # recomputes the pre-activation in backward instead of storing it.
+            ctx.activation = activation
+            relu_output = (
+                result if activation == "relu" and residual is None else None
             )
-        else:
+
+            # Save tensors for backward pass
+            ctx.save_for_backward(
+                input,
+                ln_weight,
+                ln_bias,
+                linear_weight,
+                linear_bias,
+                mean,
+                rstd,
+                relu_output,
+            )
+            return result
+
+        @staticmethod
+        def backward(ctx, grad_output):
+            """Backward pass using our custom Mojo operation.
+
+            Only the backward kernel runs here: the forward activations and
+            the LayerNorm statistics come from `ctx` and the incoming
+            `grad_output` is used as-is.
+            """
+            (
+                input,
+                ln_weight,
+                ln_bias,
+                linear_weight,
+                linear_bias,
+                mean,
+                rstd,
+                relu_output,
+            ) = ctx.saved_tensors
+            grad_residual = grad_output if ctx.needs_input_grad[6] else None
+
+            if ctx.activation not in (None, "none"):
+                pre_activation = relu_output
+                if pre_activation is None:
+                    pre_activation = mojo_layernorm_linear(
+                        input, ln_weight, ln_bias, linear_weight, linear_bias
+                    )
+                grad_output = _activation_backward(
+                    ctx.activation, grad_output, pre_activation
+                )
+
+            # Use our custom backward operation (detached)
+            (
+                grad_input,
+                grad_ln_weight,
+                grad_ln_bias,
+                grad_linear_weight,
+                grad_linear_bias,
+            ) = mojo_layernorm_linear_backward(
+                input.detach(),
+                ln_weight.detach(),
+                ln_bias.detach(),
+                linear_weight.detach(),
+                linear_bias.detach(),
+                grad_output.detach(),
+                mean=mean,
+                rstd=rstd,
+            )
+
+            return (
+                grad_input,
+                grad_ln_weight,
+                grad_ln_bias,
+                grad_linear_weight,
+                grad_linear_bias,
+                None,
+                grad_residual,
+            )
+
+    class SimpleTransformerBlock(torch.nn.Module):
+        """A simple transformer block using our custom LayerNorm + Linear
+        operations.
+        """
+
+        def __init__(self, hidden_dim, ff_dim, use_mojo=True, device="cuda"):
+            super().__init__()
+            self.hidden_dim = hidden_dim
+            self.ff_dim = ff_dim
+            self.use_mojo = use_mojo
+            self.device = device
+
+            # Layer 1: LayerNorm + Linear (hidden_dim -> ff_dim)
+            self.ln1_weight = torch.nn.Parameter(
+                torch.ones(hidden_dim, device=device)
+            )
+            self.ln1_bias = torch.nn.Parameter(
+                torch.zeros(hidden_dim, device=device)
+            )
+            self.linear1_weight = torch.nn.Parameter(
+                torch.randn(ff_dim, hidden_dim, device=device)
+                / (hidden_dim**0.5)
+            )
+            self.linear1_bias = torch.nn.Parameter(
+                torch.zeros(ff_dim, device=device)
+            )
+
+            # Layer 2: LayerNorm + Linear (ff_dim -> hidden_dim)
+            self.ln2_weight = torch.nn.Parameter(
+                torch.ones(ff_dim, device=device)
+            )
+            self.ln2_bias = torch.nn.Parameter(
+                torch.zeros(ff_dim, device=device)
+            )
+            self.linear2_weight = torch.nn.Parameter(
+                torch.randn(hidden_dim, ff_dim, device=device) / (ff_dim**0.5)
+            )
+            self.linear2_bias = torch.nn.Parameter(
+                torch.zeros(hidden_dim, device=device)
+            )
+
+        def forward(self, x):
+            # The Mojo path fuses the ReLU and the residual add into the
+            # LayerNorm + Linear kernels, so each sub-layer is a single pass
+            # over the activations.
+            if self.use_mojo:
+                # Layer 1: LayerNorm + Linear + ReLU
+                x1 = mojo_layernorm_linear_autograd(
+                    x,
+                    self.ln1_weight,
+                    self.ln1_bias,
+                    self.linear1_weight,
+                    self.linear1_bias,
+                    activation="relu",
+                )
+                # Layer 2: LayerNorm + Linear + residual connection
+                return mojo_layernorm_linear_autograd(
+                    x1,
+                    self.ln2_weight,
+                    self.ln2_bias,
+                    self.linear2_weight,
+                    self.linear2_bias,
+                    residual=x,
+                )
+
+            # Layer 1: LayerNorm + Linear + ReLU
             x1 = torch.nn.functional.layer_norm(
                 x, (self.hidden_dim,), self.ln1_weight, self.ln1_bias
             )
             x1 = torch.nn.functional.linear(
                 x1, self.linear1_weight, self.linear1_bias
             )
+            x1 = torch.nn.functional.relu(x1)
 
-        x1 = torch.nn.functional.relu(x1)
-
-        # Layer 2: LayerNorm + Linear (residual connection)
-        if self.use_mojo:
-            x2 = mojo_layernorm_linear_autograd(
-                x1,
-                self.ln2_weight,
-                self.ln2_bias,
-                self.linear2_weight,
-                self.linear2_bias,
-            )
-        else:
+            # Layer 2: LayerNorm + Linear (residual connection)
             x2 = torch.nn.functional.layer_norm(
                 x1, (self.ff_dim,), self.ln2_weight, self.ln2_bias
             )
@@ -223,71 +533,109 @@ class SimpleTransformerBlock(torch.nn.Module):
                 x2, self.linear2_weight, self.linear2_bias
             )
 
-        return x + x2  # Residual connection
+            return x + x2  # Residual connection
+
+    class SimpleNeuralNetwork(torch.nn.Module):
+        """A simple neural network using our custom operations."""
+
+        def __init__(
+            self,
+            hidden_dim,
+            ff_dim,
+            num_layers,
+            num_classes,
+            use_mojo=True,
+            device="cuda",
+        ):
+            super().__init__()
+            self.hidden_dim = hidden_dim
+            self.ff_dim = ff_dim
+            self.num_layers = num_layers
+            self.num_classes = num_classes
+            self.use_mojo = use_mojo
+            self.device = device
+
+            # Input projection (no LayerNorm, just Linear)
+            self.input_proj = torch.nn.Linear(
+                hidden_dim, hidden_dim, device=device
+            )
 
+            # Transformer blocks
+            self.layers = torch.nn.ModuleList(
+                [
+                    SimpleTransformerBlock(hidden_dim, ff_dim, use_mojo, device)
+                    for _ in range(num_layers)
+                ]
+            )
 
-class SimpleNeuralNetwork(torch.nn.Module):
-    """A simple neural network using our custom operations."""
+            # Output projection (no LayerNorm, just Linear)
+            self.output_proj = torch.nn.Linear(
+                hidden_dim, num_classes, device=device
+            )
 
-    def __init__(
-        self,
-        hidden_dim,
-        ff_dim,
-        num_layers,
-        num_classes,
-        use_mojo=True,
-        device="cuda",
+        def forward(self, x):
+            x = self.input_proj(x)
+            for layer in self.layers:
+                x = layer(x)
+
+            x = x.mean(
+                dim=1
+            )  # [batch_size, seq_len, hidden_dim] -> [batch_size, hidden_dim]
+            x = self.output_proj(
+                x
+            )  # [batch_size, hidden_dim] -> [batch_size, num_classes]
+            return x
+
+    # Module-level names, so instances pickle like any other class
+    for cls in (
+        LayerNormLinearFunction,
+        SimpleTransformerBlock,
+        SimpleNeuralNetwork,
     ):
-        super().__init__()
-        self.hidden_dim = hidden_dim
-        self.ff_dim = ff_dim
-        self.num_layers = num_layers
-        self.num_classes = num_classes
-        self.use_mojo = use_mojo
-        self.device = device
-
-        # Input projection (no LayerNorm, just Linear)
-        self.input_proj = torch.nn.Linear(hidden_dim, hidden_dim, device=device)
-
-        # Transformer blocks
-        self.layers = torch.nn.ModuleList(
-            [
-                SimpleTransformerBlock(hidden_dim, ff_dim, use_mojo, device)
-                for _ in range(num_layers)
-            ]
-        )
+        cls.__qualname__ = cls.__name__
 
-        # Output projection (no LayerNorm, just Linear)
-        self.output_proj = torch.nn.Linear(
-            hidden_dim, num_classes, device=device
-        )
 
-    def forward(self, x):
-        x = self.input_proj(x)
-        for layer in self.layers:
-            x = layer(x)
+def __getattr__(name):
+    if name in _TORCH_CLASSES:
+        _define_torch_classes()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-        x = x.mean(
-            dim=1
-        )  # [batch_size, seq_len, hidden_dim] -> [batch_size, hidden_dim]
-        x = self.output_proj(
-            x
-        )  # [batch_size, hidden_dim] -> [batch_size, num_classes]
-        return x
 
+def create_test_data(device="cuda", dtype=None, shape=None):
+    """Create consistent test data for all tests.
 
-def create_test_data(device="cuda"):
-    """Create consistent test data for all tests."""
+    `dtype` defaults to float32. `shape` is (batch_size, seq_len,
+    hidden_dim, output_dim) and defaults to the module-level test
+    dimensions.
+    """
+    dtype = torch.float32 if dtype is None else dtype
     torch.manual_seed(42)
     device = torch.device(device if torch.cuda.is_available() else "cpu")
+    batch_size, seq_len, hidden_dim, output_dim = shape or (
+        BATCH_SIZE,
+        SEQ_LEN,
+        HIDDEN_DIM,
+        OUTPUT_DIM,
+    )
 
-    input_tensor = torch.randn(BATCH_SIZE, SEQ_LEN, HIDDEN_DIM, device=device)
-    ln_weight = torch.ones(HIDDEN_DIM, device=device)
-    ln_bias = torch.zeros(HIDDEN_DIM, device=device)
-    linear_weight = torch.randn(OUTPUT_DIM, HIDDEN_DIM, device=device) * 0.02
-    linear_bias = torch.zeros(OUTPUT_DIM, device=device)
+    input_tensor = torch.randn(batch_size, seq_len, hidden_dim, device=device)
+    ln_weight = torch.ones(hidden_dim, device=device)
+    ln_bias = torch.zeros(hidden_dim, device=device)
+    linear_weight = torch.randn(output_dim, hidden_dim, device=device) * 0.02
+    linear_bias = torch.zeros(output_dim, device=device)
 
-    return input_tensor, ln_weight, ln_bias, linear_weight, linear_bias
+    # Draw in float32 first so every dtype sees the same values
+    return tuple(
+        tensor.to(dtype)
+        for tensor in (
+            input_tensor,
+            ln_weight,
+            ln_bias,
+            linear_weight,
+            linear_bias,
+        )
+    )
 
 
 def create_test_data_with_grad(device="cuda"):
@@ -310,7 +658,14 @@ def create_test_data_with_grad(device="cuda"):
 
 
 def reference_layernorm_linear(
-    input, ln_weight, ln_bias, linear_weight, linear_bias, eps=EPS
+    input,
+    ln_weight,
+    ln_bias,
+    linear_weight,
+    linear_bias,
+    eps=EPS,
+    activation=None,
+    residual=None,
 ):
     """Reference implementation using standard PyTorch operations."""
     mean = input.mean(dim=-1, keepdim=True)
@@ -319,11 +674,23 @@ def reference_layernorm_linear(
     ln_output = normalized * ln_weight + ln_bias
 
     output = torch.nn.functional.linear(ln_output, linear_weight, linear_bias)
+    if activation == "relu":
+        output = torch.nn.functional.relu(output)
+    elif activation == "gelu":
+        output = torch.nn.functional.gelu(output)
+    if residual is not None:
+        output = output + residual
     return output
 
 
 def reference_layernorm_linear_with_grad(
-    input, ln_weight, ln_bias, linear_weight, linear_bias, eps=EPS
+    input,
+    ln_weight,
+    ln_bias,
+    linear_weight,
+    linear_bias,
+    eps=EPS,
+    grad_output=None,
 ):
     """Reference implementation with autograd for backward pass testing."""
     # Clear any existing gradients
@@ -343,8 +710,9 @@ def reference_layernorm_linear_with_grad(
         input, ln_weight, ln_bias, linear_weight, linear_bias, eps
     )
 
-    # Create dummy gradient output (ones) and run backward
-    grad_output = torch.ones_like(output)
+    # Default to a gradient of ones (the gradient of output.sum())
+    if grad_output is None:
+        grad_output = torch.ones_like(output)
     output.backward(grad_output, retain_graph=True)
 
     # Return forward output and all gradients
@@ -369,8 +737,19 @@ def run_mojo_implementation(
     linear_bias,
     algorithm="fused",
     target="auto",
+    return_stats=False,
+    workspace=None,
+    activation=None,
+    residual=None,
 ):
-    """Generic function to run Mojo implementations."""
+    """Generic function to run Mojo implementations.
+
+    Returns (output, error). With `return_stats=True` the fused op also
+    writes the per-row LayerNorm mean and rstd, and output is the tuple
+    (output, mean, rstd). With a `workspace` the results live in its reused
+    buffers. An `activation` ("relu" or "gelu") and a `residual` of the
+    output's shape are applied in the fused kernel's epilogue.
+    """
     batch_size, seq_len, hidden_dim = input.shape
     output_dim = linear_weight.shape[0]
 
@@ -383,26 +762,130 @@ def run_mojo_implementation(
         ln_bias = ln_bias.cpu()
         linear_weight = linear_weight.cpu()
         linear_bias = linear_bias.cpu()
+        if residual is not None:
+            residual = residual.cpu()
+
+    # The ops take every tensor in the activation dtype; mixed-precision
+    # models often keep parameters such as the Linear bias in float32
+    ln_weight = ln_weight.to(input.dtype)
+    ln_bias = ln_bias.to(input.dtype)
+    linear_weight = linear_weight.to(input.dtype)
+    linear_bias = linear_bias.to(input.dtype)
+    if residual is not None:
+        residual = residual.to(input.dtype)
 
     try:
-        output = torch.empty(
-            (batch_size, seq_len, output_dim),
-            dtype=input.dtype,
-            device=input.device,
+        output = _empty(
+            workspace, "output", (batch_size, seq_len, output_dim), input
         )
 
-        op = ops.layernorm_linear[
-            {
-                "algorithm": algorithm,
-                "batch_size": batch_size,
-                "seq_len": seq_len,
-                "hidden_dim": hidden_dim,
-                "output_dim": output_dim,
-            }
-        ]
+        if activation is not None or residual is not None:
+            if algorithm != "fused":
+                raise ValueError("the epilogue requires algorithm='fused'")
+            if activation not in EPILOGUE_ACTIVATIONS:
+                raise ValueError(
+                    f"activation must be one of {EPILOGUE_ACTIVATIONS}"
+                )
+            if residual is not None and residual.shape != output.shape:
+                raise ValueError(
+                    f"residual shape {tuple(residual.shape)} does not match"
+                    f" output shape {tuple(output.shape)}"
+                )
+            mean = _empty(
+                workspace,
+                "mean",
+                (batch_size, seq_len),
+                input,
+                dtype=torch.float32,
+            )
+            rstd = _empty(
+                workspace,
+                "rstd",
+                (batch_size, seq_len),
+                input,
+                dtype=torch.float32,
+            )
+            compiled_op = get_cached_compiled_op(
+                "layernorm_linear_epilogue",
+                _op_parameters(
+                    input,
+                    batch_size=batch_size,
+                    seq_len=seq_len,
+                    hidden_dim=hidden_dim,
+                    output_dim=output_dim,
+                    activation=activation or "none",
+                    add_residual=residual is not None,
+                ),
+                input,
+            )
+            compiled_op(
+                output,
+                mean,
+                rstd,
+                input,
+                ln_weight,
+                ln_bias,
+                linear_weight,
+                linear_bias,
+                # Never read when add_residual is False
+                residual.detach() if residual is not None else input,
+            )
+            if return_stats:
+                return (output, mean, rstd), None
+            return output, None
+
+        if return_stats:
+            if algorithm != "fused":
+                raise ValueError("return_stats requires algorithm='fused'")
+            # The statistics are float32 for every activation dtype
+            mean = _empty(
+                workspace,
+                "mean",
+                (batch_size, seq_len),
+                input,
+                dtype=torch.float32,
+            )
+            rstd = _empty(
+                workspace,
+                "rstd",
+                (batch_size, seq_len),
+                input,
+                dtype=torch.float32,
+            )
+            compiled_op = get_cached_compiled_op(
+                "layernorm_linear_with_stats",
+                _op_parameters(
+                    input,
+                    batch_size=batch_size,
+                    seq_len=seq_len,
+                    hidden_dim=hidden_dim,
+                    output_dim=output_dim,
+                ),
+                input,
+            )
+            compiled_op(
+                output,
+                mean,
+                rstd,
+                input,
+                ln_weight,
+                ln_bias,
+                linear_weight,
+                linear_bias,
+            )
+            return (output, mean, rstd), None
 
         compiled_op = get_cached_compiled_op(
-            op, f"forward_{algorithm}_{batch_size}x{seq_len}x{hidden_dim}"
+            "layernorm_linear",
+            _op_parameters(
+                input,
+                algorithm=algorithm,
+                batch_size=batch_size,
+                seq_len=seq_len,
+                hidden_dim=hidden_dim,
+                output_dim=output_dim,
+            ),
+            input,
         )
         compiled_op(
             output, input, ln_weight, ln_bias, linear_weight, linear_bias
@@ -413,78 +896,137 @@ def run_mojo_implementation(
         return None, str(e)
 
 
-def run_mojo_backward_implementation(
-    input, ln_weight, ln_bias, linear_weight, linear_bias, target="auto"
+def run_mojo_backward_op(
+    grad_output,
+    input,
+    ln_weight,
+    ln_bias,
+    linear_weight,
+    target="auto",
+    mean=None,
+    rstd=None,
+    workspace=None,
+    linear_bias=None,
 ):
-    """Run Mojo backward implementation."""
+    """Run only the Mojo backward kernel for the given upstream gradient.
+
+    Returns (gradients, error), where gradients maps grad_input,
+    grad_ln_weight, grad_ln_bias, grad_linear_weight and grad_linear_bias to
+    tensors on the same device as `input` (or the CPU for target="cpu").
+    When the forward's `mean` and `rstd` are given, the kernel reads them
+    instead of recomputing the LayerNorm statistics from `input`. With a
+    `workspace` the gradients live in its reused buffers. Half-precision
+    inputs run the kernel in float32, and every gradient comes back in the
+    dtype of its parameter. The kernel does not read `linear_bias`; pass it
+    so grad_linear_bias follows its dtype (e.g. a float32 bias with half
+    weights) instead of the Linear weight's.
+    """
     batch_size, seq_len, hidden_dim = input.shape
     output_dim = linear_weight.shape[0]
 
     if target == "auto":
         target = "gpu" if input.device.type == "cuda" else "cpu"
 
-    input_detached = input.detach()
-    ln_weight_detached = ln_weight.detach()
-    ln_bias_detached = ln_bias.detach()
-    linear_weight_detached = linear_weight.detach()
-    linear_bias_detached = linear_bias.detach()
+    # The kernel indexes with static row-major layouts, and autograd often
+    # hands us expanded (stride-0) gradients, e.g. from output.sum()
+    grad_output = grad_output.detach().contiguous()
+    input = input.detach()
+    ln_weight = ln_weight.detach()
+    ln_bias = ln_bias.detach()
+    linear_weight = linear_weight.detach()
 
     if target == "cpu":
-        input_detached = input_detached.cpu()
-        ln_weight_detached = ln_weight_detached.cpu()
-        ln_bias_detached = ln_bias_detached.cpu()
-        linear_weight_detached = linear_weight_detached.cpu()
-        linear_bias_detached = linear_bias_detached.cpu()
+        grad_output = grad_output.cpu()
+        input = input.cpu()
+        ln_weight = ln_weight.cpu()
+        ln_bias = ln_bias.cpu()
+        linear_weight = linear_weight.cpu()
+
+    # Gradient dtype of each parameter, before any upcast
+    grad_dtypes = {
+        "grad_input": input.dtype,
+        "grad_ln_weight": ln_weight.dtype,
+        "grad_ln_bias": ln_bias.dtype,
+        "grad_linear_weight": linear_weight.dtype,
+        "grad_linear_bias": (
+            linear_weight if linear_bias is None else linear_bias
+        ).dtype,
+    }
+    # One compute dtype for every operand, float32 for half activations
+    compute_dtype = (
+        torch.float32 if _is_half(input.dtype) else input.dtype
+    )
+    grad_output = grad_output.to(compute_dtype)
+    input = input.to(compute_dtype)
+    ln_weight = ln_weight.to(compute_dtype)
+    ln_bias = ln_bias.to(compute_dtype)
+    linear_weight = linear_weight.to(compute_dtype)
+
+    use_stats = mean is not None and rstd is not None
+    if use_stats:
+        mean = mean.detach().to(input.device)
+        rstd = rstd.detach().to(input.device)
 
     try:
-        # Forward pass first
-        forward_output, forward_error = run_mojo_implementation(
-            input_detached,
-            ln_weight_detached,
-            ln_bias_detached,
-            linear_weight_detached,
-            linear_bias_detached,
-            algorithm="fused",
-            target=target,
+        # Gradient tensors on the same device as the inputs. Every kernel
+        # overwrites grad_input, and the with-stats op zeroes the parameter
+        # gradients itself, so no fill is needed on that path.
+        grad_input = _empty(workspace, "grad_input", input.shape, input)
+        grad_ln_weight = _empty(
+            workspace, "grad_ln_weight", ln_weight.shape, input
         )
-        if forward_output is None:
-            return None, None, f"Forward pass failed: {forward_error}"
-
-        # Prepare gradient tensors (initialized to zero) on the same device as forward output
-        grad_input = torch.zeros_like(input_detached)
-        grad_ln_weight = torch.zeros_like(ln_weight_detached)
-        grad_ln_bias = torch.zeros_like(ln_bias_detached)
-        grad_linear_weight = torch.zeros_like(linear_weight_detached)
-        grad_linear_bias = torch.zeros_like(linear_bias_detached)
-
-        # Dummy gradient output (ones)
-        grad_output = torch.ones_like(forward_output)
-
-        # Run backward pass
-        backward_op = ops.layernorm_linear_backward[
-            {
-                "batch_size": batch_size,
-                "seq_len": seq_len,
-                "hidden_dim": hidden_dim,
-                "output_dim": output_dim,
-            }
-        ]
-
-        compiled_backward_op = get_cached_compiled_op(
-            backward_op, f"backward_{batch_size}x{seq_len}x{hidden_dim}"
+        grad_ln_bias = _empty(workspace, "grad_ln_bias", ln_bias.shape, input)
+        grad_linear_weight = _empty(
+            workspace, "grad_linear_weight", linear_weight.shape, input
+        )
+        grad_linear_bias = _empty(
+            workspace, "grad_linear_bias", (output_dim,), input
         )
-        compiled_backward_op(
+        if not use_stats:
+            # The original backward op accumulates into pre-zeroed buffers
+            for grad in (
+                grad_ln_weight,
+                grad_ln_bias,
+                grad_linear_weight,
+                grad_linear_bias,
+            ):
+                grad.zero_()
+
+        parameters = _op_parameters(
+            input,
+            batch_size=batch_size,
+            seq_len=seq_len,
+            hidden_dim=hidden_dim,
+            output_dim=output_dim,
+        )
+        grads = (
             grad_input,
             grad_ln_weight,
             grad_ln_bias,
             grad_linear_weight,
             grad_linear_bias,
-            grad_output,
-            input_detached,
-            ln_weight_detached,
-            ln_bias_detached,
-            linear_weight_detached,
         )
+        if use_stats:
+            compiled_backward_op = get_cached_compiled_op(
+                "layernorm_linear_backward_with_stats", parameters, input
+            )
+            compiled_backward_op(
+                *grads,
+                grad_output,
+                input,
+                mean,
+                rstd,
+                ln_weight,
+                ln_bias,
+                linear_weight,
+            )
+        else:
+            compiled_backward_op = get_cached_compiled_op(
+                "layernorm_linear_backward", parameters, input
+            )
+            compiled_backward_op(
+                *grads, grad_output, input, ln_weight, ln_bias, linear_weight
+            )
 
         gradients = {
             "grad_input": grad_input,
@@ -493,11 +1035,95 @@ def run_mojo_backward_implementation(
             "grad_linear_weight": grad_linear_weight,
             "grad_linear_bias": grad_linear_bias,
         }
+        gradients = {
+            name: grad.to(grad_dtypes[name])
+            for name, grad in gradients.items()
+        }
 
-        return forward_output, gradients, None
+        return gradients, None
 
     except Exception as e:
-        return None, None, str(e)
+        return None, str(e)
+
+
+def run_mojo_backward_implementation(
+    input,
+    ln_weight,
+    ln_bias,
+    linear_weight,
+    linear_bias,
+    target="auto",
+    grad_output=None,
+    workspace=None,
+    use_saved_stats=True,
+):
+    """Run the Mojo forward pass, then the backward pass on its output.
+
+    `grad_output` defaults to ones (the gradient of output.sum()). With
+    `use_saved_stats` the forward's LayerNorm statistics are handed straight
+    to the backward op; otherwise the original backward op recomputes them.
+    Pass `workspace=create_workspace()` to reuse every output and gradient
+    buffer across calls. Returns (forward_output, gradients, error).
+    """
+    if target == "auto":
+        target = "gpu" if input.device.type == "cuda" else "cpu"
+
+    input_detached = input.detach()
+    ln_weight_detached = ln_weight.detach()
+    ln_bias_detached = ln_bias.detach()
+    linear_weight_detached = linear_weight.detach()
+    linear_bias_detached = linear_bias.detach()
+
+    if target == "cpu":
+        input_detached = input_detached.cpu()
+        ln_weight_detached = ln_weight_detached.cpu()
+        ln_bias_detached = ln_bias_detached.cpu()
+        linear_weight_detached = linear_weight_detached.cpu()
+        linear_bias_detached = linear_bias_detached.cpu()
+
+    # Forward pass first
+    forward_result, forward_error = run_mojo_implementation(
+        input_detached,
+        ln_weight_detached,
+        ln_bias_detached,
+        linear_weight_detached,
+        linear_bias_detached,
+        algorithm="fused",
+        target=target,
+        return_stats=True,
+        workspace=workspace,
+    )
+    if forward_result is None:
+        return None, None, f"Forward pass failed: {forward_error}"
+    forward_output, mean, rstd = forward_result
+
+    if grad_output is None:
+        if workspace is None:
+            grad_output = torch.ones_like(forward_output)
+        else:
+            grad_output = workspace.get(
+                "grad_output_ones",
+                forward_output.shape,
+                forward_output.dtype,
+                forward_output.device,
+                init=lambda buffer: buffer.fill_(1.0),
+            )
+
+    gradients, error = run_mojo_backward_op(
+        grad_output,
+        input_detached,
+        ln_weight_detached,
+        ln_bias_detached,
+        linear_weight_detached,
+        target=target,
+        mean=mean if use_saved_stats else None,
+        rstd=rstd if use_saved_stats else None,
+        workspace=workspace,
+        linear_bias=linear_bias_detached,
+    )
+    if gradients is None:
+        return None, None, error
+    return forward_output, gradients, None
 
 
 def test_implementation(
@@ -569,6 +1195,12 @@ def test_backward_pass(name, target="auto", test_data=None):
     print(f"\nTesting {name} - Backward Pass")
     print("-" * (15 + len(name) + 15))
 
+    # A non-uniform upstream gradient, so the kernel must really consume it
+    torch.manual_seed(0)
+    grad_output = torch.randn(
+        BATCH_SIZE, SEQ_LEN, OUTPUT_DIM, device=input_tensor_ref.device
+    )
+
     # Get PyTorch autograd reference
     print("   Computing PyTorch autograd reference...")
     ref_output, ref_gradients = reference_layernorm_linear_with_grad(
@@ -577,6 +1209,7 @@ def test_backward_pass(name, target="auto", test_data=None):
         ln_bias_ref,
         linear_weight_ref,
         linear_bias_ref,
+        grad_output=grad_output,
     )
 
     # Test Mojo backward implementation
@@ -588,6 +1221,7 @@ def test_backward_pass(name, target="auto", test_data=None):
         linear_weight_mojo,
         linear_bias_mojo,
         target=target,
+        grad_output=grad_output,
     )
 
     if mojo_output is None or mojo_gradients is None:
@@ -635,6 +1269,43 @@ def test_backward_pass(name, target="auto", test_data=None):
         if not is_correct:
             all_gradients_correct = False
 
+    # The original (recomputing) backward op and a reused workspace must give
+    # the same gradients as the saved-statistics path above
+    workspace = create_workspace()
+    variants = {
+        "recomputed stats": {"use_saved_stats": False},
+        "workspace": {"workspace": workspace},
+        "workspace reuse": {"workspace": workspace},
+    }
+    for variant_name, variant_kwargs in variants.items():
+        _, variant_gradients, error = run_mojo_backward_implementation(
+            input_tensor_mojo,
+            ln_weight_mojo,
+            ln_bias_mojo,
+            linear_weight_mojo,
+            linear_bias_mojo,
+            target=target,
+            grad_output=grad_output,
+            **variant_kwargs,
+        )
+        if variant_gradients is None:
+            print(f"   {variant_name}: ❌ failed: {error}")
+            all_gradients_correct = False
+            continue
+
+        diff = max(
+            torch.max(
+                torch.abs(
+                    variant_gradients[grad_name] - mojo_gradients[grad_name]
+                )
+            ).item()
+            for grad_name in gradient_names
+        )
+        is_correct = diff < 1e-4
+        print(f"   {variant_name}: {diff:.2e} {'✅' if is_correct else '❌'}")
+        if not is_correct:
+            all_gradients_correct = False
+
     forward_correct = forward_diff < 1e-4
     overall_correct = forward_correct and all_gradients_correct
 
@@ -653,6 +1324,207 @@ def test_backward_pass(name, target="auto", test_data=None):
     return overall_correct
 
 
+def test_autograd_function(name, target="auto"):
+    """Check LayerNormLinearFunction gradients through loss.backward()."""
+    device = "cuda" if target == "gpu" else "cpu"
+    ref_params = create_test_data_with_grad(device=device)
+    mojo_params = create_test_data_with_grad(device=device)
+
+    print(f"\nTesting {name} - Autograd")
+    print("-" * (15 + len(name) + 10))
+
+    torch.manual_seed(0)
+    grad_output = torch.randn(
+        BATCH_SIZE, SEQ_LEN, OUTPUT_DIM, device=ref_params[0].device
+    )
+
+    try:
+        reference_layernorm_linear(*ref_params).backward(grad_output)
+        mojo_layernorm_linear_autograd(*mojo_params).backward(grad_output)
+        _, mean, rstd = mojo_layernorm_linear(
+            *(param.detach() for param in mojo_params), return_stats=True
+        )
+    except Exception as e:
+        print(f"❌ {name} autograd failed: {e}")
+        return False
+
+    # The statistics saved for backward must match LayerNorm's own
+    input_ref = ref_params[0].detach()
+    ref_mean = input_ref.mean(dim=-1)
+    ref_rstd = torch.rsqrt(input_ref.var(dim=-1, unbiased=False) + EPS)
+    stats_diff = max(
+        torch.max(torch.abs(ref_mean - mean.to(ref_mean.device))).item(),
+        torch.max(torch.abs(ref_rstd - rstd.to(ref_rstd.device))).item(),
+    )
+    stats_correct = stats_diff < 1e-4
+    print(
+        f"   saved mean/rstd: {stats_diff:.2e}"
+        f" {'✅' if stats_correct else '❌'}"
+    )
+
+    param_names = [
+        "input",
+        "ln_weight",
+        "ln_bias",
+        "linear_weight",
+        "linear_bias",
+    ]
+    all_correct = stats_correct
+    for param_name, ref, mojo in zip(param_names, ref_params, mojo_params):
+        diff = torch.max(torch.abs(ref.grad - mojo.grad.to(ref.device)))
+        is_correct = diff.item() < 1e-4
+        all_correct = all_correct and is_correct
+        print(
+            f"   {param_name}.grad: {diff.item():.2e}"
+            f" {'✅' if is_correct else '❌'}"
+        )
+
+    return all_correct
+
+
+def test_fused_epilogue(target="auto"):
+    """Check the activation/residual epilogue forward and through autograd."""
+    if target == "auto":
+        target = "gpu" if torch.cuda.is_available() else "cpu"
+    device = "cuda" if target == "gpu" else "cpu"
+    print(f"\nTesting fused epilogue (activation + residual) on {target}")
+    print("-" * 53)
+
+    all_correct = True
+    for activation, use_residual in (
+        ("relu", False),
+        ("gelu", False),
+        (None, True),
+        ("relu", True),
+    ):
+        label = activation or "none"
+        if use_residual:
+            label += " + residual"
+        ref_params = create_test_data_with_grad(device=device)
+        mojo_params = create_test_data_with_grad(device=device)
+
+        torch.manual_seed(0)
+        shape = (BATCH_SIZE, SEQ_LEN, OUTPUT_DIM)
+        residual = torch.randn(shape, device=ref_params[0].device)
+        grad_output = torch.randn(shape, device=ref_params[0].device)
+        ref_residual = mojo_residual = None
+        if use_residual:
+            ref_residual = residual.clone().requires_grad_(True)
+            mojo_residual = residual.clone().requires_grad_(True)
+
+        try:
+            ref_output = reference_layernorm_linear(
+                *ref_params, activation=activation, residual=ref_residual
+            )
+            ref_output.backward(grad_output)
+            mojo_output = mojo_layernorm_linear_autograd(
+                *mojo_params, activation=activation, residual=mojo_residual
+            )
+            mojo_output.backward(grad_output)
+        except Exception as e:
+            print(f"   {label}: ❌ failed: {e}")
+            all_correct = False
+            continue
+
+        checks = [("output", ref_output, mojo_output)]
+        checks += [
+            (f"{name}.grad", ref.grad, mojo.grad)
+            for name, ref, mojo in zip(
+                [
+                    "input",
+                    "ln_weight",
+                    "ln_bias",
+                    "linear_weight",
+                    "linear_bias",
+                ],
+                ref_params,
+                mojo_params,
+            )
+        ]
+        if use_residual:
+            checks.append(
+                ("residual.grad", ref_residual.grad, mojo_residual.grad)
+            )
+        diff = max(
+            torch.max(torch.abs(ref.detach() - mojo.detach().to(ref.device)))
+            .item()
+            for _, ref, mojo in checks
+        )
+        is_correct = diff < 1e-4
+        all_correct = all_correct and is_correct
+        print(
+            f"   {label}: max diff {diff:.2e} {'✅' if is_correct else '❌'}"
+        )
+
+    return all_correct
+
+
+# Max abs difference allowed against the float32 reference. One rounding of
+# an O(1) value costs ~5e-4 in float16 and ~4e-3 in bfloat16.
+MIXED_PRECISION_TOLERANCES = {
+    "float16": 1e-2,
+    "bfloat16": 5e-2,
+}
+
+
+def test_mixed_precision(target="auto"):
+    """Check half-precision forward and backward against float32 PyTorch.
+
+    The reference runs in float32 on the same (already rounded) values, so
+    the difference measures only the kernels' output rounding and how well
+    they accumulate.
+    """
+    print("\nTesting mixed precision (fp16/bf16 with fp32 accumulation)")
+    print("-" * 58)
+
+    all_correct = True
+    for dtype_name, tolerance in MIXED_PRECISION_TOLERANCES.items():
+        dtype = getattr(torch, dtype_name)
+        test_data = create_test_data(dtype=dtype)
+        # Half weights with a float32 Linear bias, as in mixed-precision
+        # training; its gradient must stay float32
+        test_data = (*test_data[:4], test_data[4].float())
+        expected_dtypes = {"grad_linear_bias": torch.float32}
+        if target == "cpu":
+            test_data = tuple(tensor.cpu() for tensor in test_data)
+        reference_data = [
+            tensor.float().requires_grad_(True) for tensor in test_data
+        ]
+        grad_output = torch.randn(
+            BATCH_SIZE, SEQ_LEN, OUTPUT_DIM, device=test_data[0].device
+        ).to(dtype)
+        reference_output, reference_grads = (
+            reference_layernorm_linear_with_grad(
+                *reference_data, grad_output=grad_output.float()
+            )
+        )
+
+        output, gradients, error = run_mojo_backward_implementation(
+            *test_data, target=target, grad_output=grad_output
+        )
+        if output is None:
+            print(f"   {dtype}: ❌ failed: {error}")
+            all_correct = False
+            continue
+
+        checks = {"output": (reference_output, output)}
+        for grad_name, reference_grad in reference_grads.items():
+            checks[grad_name] = (reference_grad, gradients[grad_name])
+        for check_name, (expected, actual) in checks.items():
+            dtype_ok = actual.dtype == expected_dtypes.get(check_name, dtype)
+            diff = torch.max(
+                torch.abs(expected.detach().to(actual.device) - actual.float())
+            ).item()
+            is_correct = dtype_ok and diff < tolerance
+            all_correct = all_correct and is_correct
+            print(
+                f"   {dtype} {check_name}: {diff:.2e}"
+                f" (tol {tolerance:.0e}) {'✅' if is_correct else '❌'}"
+            )
+
+    return all_correct
+
+
 def run_comprehensive_test():
     """Run comprehensive test of all implementations."""
     print("=" * 60)
@@ -695,6 +1567,11 @@ def run_comprehensive_test():
         results["gpu_unfused"] = False
         results["gpu_fused"] = False
 
+    results["epilogue"] = test_fused_epilogue("cpu")
+    if input_tensor.device.type == "cuda":
+        results["epilogue"] &= test_fused_epilogue("gpu")
+    results["mixed_precision"] = test_mixed_precision()
+
     print(f"\nSummary:")
     print(
         f"   - CPU:         {'✅ CORRECT' if results['cpu'] else '❌ INCORRECT'}"
@@ -707,6 +1584,14 @@ def run_comprehensive_test():
         "   - GPU fused:  "
         f" {'✅ CORRECT' if results['gpu_fused'] else '❌ INCORRECT'}"
     )
+    print(
+        "   - Epilogue:   "
+        f" {'✅ CORRECT' if results['epilogue'] else '❌ INCORRECT'}"
+    )
+    print(
+        "   - fp16/bf16:  "
+        f" {'✅ CORRECT' if results['mixed_precision'] else '❌ INCORRECT'}"
+    )
 
     all_correct = all(results.values())
     print(
@@ -763,7 +1648,14 @@ def run_fused_only_test():
 
 
 def benchmark_implementations(algorithm, test_data, iterations=50):
-    """Benchmark CPU vs GPU for specific algorithm."""
+    """Benchmark CPU vs GPU for specific algorithm.
+
+    `iterations` is the minimum number of timed calls per target; the harness
+    runs more when a call is fast. Returns the BenchmarkResult per target.
+    """
+    _use_scripts()
+    from benchmark import benchmark, format_result, torch_sync
+
     print(f"\n⚡ Benchmarking CPU vs GPU {algorithm.upper()}")
     print("-" * (35 + len(algorithm)))
 
@@ -771,63 +1663,41 @@ def benchmark_implementations(algorithm, test_data, iterations=50):
 
     if input_tensor.device.type != "cuda":
         print("   CUDA not available - skipping GPU benchmark")
-        return
-
-    times = {}
-
-    print("   Testing CPU performance...")
-    cpu_output, cpu_error = run_mojo_implementation(
-        *test_data, algorithm="fused", target="cpu"
-    )
-    if cpu_output is not None:
-        # Warmup
-        for _ in range(3):
-            _ = run_mojo_implementation(
-                *test_data, algorithm="fused", target="cpu"
-            )
-
-        start = time.perf_counter()
-        for _ in range(iterations):
-            _ = run_mojo_implementation(
-                *test_data, algorithm="fused", target="cpu"
-            )
-        times["cpu"] = time.perf_counter() - start
-        print(f"   CPU: {times['cpu']*1000:.2f}ms ({iterations} iterations)")
-    else:
-        print(f"   CPU failed: {cpu_error}")
-        times["cpu"] = None
+        return {}
 
-    # Benchmark GPU
-    print(f"   Testing GPU {algorithm} performance...")
-    gpu_output, gpu_error = run_mojo_implementation(
-        *test_data, algorithm=algorithm, target="gpu"
-    )
-    if gpu_output is not None:
-        # Warmup
-        for _ in range(3):
-            _ = run_mojo_implementation(
-                *test_data, algorithm=algorithm, target="gpu"
-            )
-        torch.cuda.synchronize()
+    results = {}
+    for target, target_algorithm in [("cpu", "fused"), ("gpu", algorithm)]:
+        print(f"   Testing {target.upper()} {target_algorithm} performance...")
+        output, error = run_mojo_implementation(
+            *test_data, algorithm=target_algorithm, target=target
+        )
+        if output is None:
+            print(f"   {target.upper()} {target_algorithm} failed: {error}")
+            results[target] = None
+            continue
 
-        start = time.perf_counter()
-        for _ in range(iterations):
-            _ = run_mojo_implementation(
-                *test_data, algorithm=algorithm, target="gpu"
-            )
-        torch.cuda.synchronize()
-        times["gpu"] = time.perf_counter() - start
-        print(
-            f"   GPU {algorithm}: {times['gpu']*1000:.2f}ms"
-            f" ({iterations} iterations)"
+        results[target] = benchmark(
+            f"layernorm_linear_{target_algorithm}",
+            lambda target=target, target_algorithm=target_algorithm: (
+                run_mojo_implementation(
+                    *test_data, algorithm=target_algorithm, target=target
+                )
+            ),
+            device=target,
+            sync=torch_sync("cuda"),
+            min_iterations=iterations,
+            params={
+                "batch_size": input_tensor.shape[0],
+                "seq_len": input_tensor.shape[1],
+                "hidden_dim": input_tensor.shape[2],
+                "output_dim": linear_weight.shape[0],
+            },
         )
-    else:
-        print(f"   GPU {algorithm} failed: {gpu_error}")
-        times["gpu"] = None
+        print(f"   {format_result(results[target])}")
 
     # Performance comparison
-    if times["cpu"] is not None and times["gpu"] is not None:
-        speedup = times["cpu"] / times["gpu"]
+    if results["cpu"] is not None and results["gpu"] is not None:
+        speedup = results["cpu"].median_s / results["gpu"].median_s
         print(
             f"\n   GPU {algorithm} vs CPU: {speedup:.2f}x"
             f" {'faster' if speedup > 1 else 'slower'}"
@@ -840,6 +1710,265 @@ def benchmark_implementations(algorithm, test_data, iterations=50):
     else:
         print("\n   Benchmark incomplete due to failures")
 
+    return results
+
+
+# (name, (batch_size, seq_len, hidden_dim, output_dim)) from the puzzle's toy
+# size up to a transformer MLP projection at hidden size 4096
+SWEEP_SHAPES = [
+    ("tiny", (BATCH_SIZE, SEQ_LEN, HIDDEN_DIM, OUTPUT_DIM)),
+    ("small", (8, 64, 256, 256)),
+    ("medium", (4, 256, 1024, 1024)),
+    ("llm", (1, 128, 4096, 4096)),
+]
+
+# "fused" runs one thread per row over every hidden x output weight, so it
+# gets slow as their product grows. "unfused" launches one thread per
+# hidden/output feature, so it stops at block size limits. Both are
+# impractical well before LLM sizes, where only "tiled" is timed.
+FUSED_MAX_ELEMENTS = 256 * 256
+UNFUSED_MAX_DIM = 1024
+
+
+def sweep_algorithms(target, hidden_dim, output_dim):
+    """Algorithms worth timing on `target` at this hidden/output size."""
+    algorithms = ["tiled"]
+    if hidden_dim * output_dim <= FUSED_MAX_ELEMENTS:
+        algorithms.insert(0, "fused")
+    if (
+        target == "gpu"
+        and hidden_dim <= UNFUSED_MAX_DIM
+        and output_dim <= UNFUSED_MAX_DIM
+    ):
+        algorithms.insert(1, "unfused")
+    return algorithms
+
+
+def benchmark_shape_point(shape_name, shape, target, algorithms):
+    """Check and time each algorithm at one shape on one target.
+
+    "reference" times the PyTorch implementation. Mojo algorithms are
+    verified against it first and skipped if they disagree. Returns the
+    BenchmarkResults, with the shape, target and algorithm in their params.
+    """
+    _use_scripts()
+    from benchmark import benchmark, format_result, torch_sync
+
+    batch_size, seq_len, hidden_dim, output_dim = shape
+    rows = batch_size * seq_len
+    flops = 2 * rows * hidden_dim * output_dim + 8 * rows * hidden_dim
+    test_data = create_test_data(
+        device="cuda" if target == "gpu" else "cpu", shape=shape
+    )
+    # Minimum traffic: read input and parameters once, write output once.
+    # Dividing it by the time gives the effective bandwidth.
+    bytes_moved = test_data[0].element_size() * (
+        rows * hidden_dim
+        + output_dim * hidden_dim
+        + rows * output_dim
+        + 2 * hidden_dim
+        + output_dim
+    )
+    reference_output = reference_layernorm_linear(*test_data)
+
+    results = []
+    for algorithm in algorithms:
+        if algorithm == "reference":
+            fn = functools.partial(reference_layernorm_linear, *test_data)
+        else:
+            output, error = run_mojo_implementation(
+                *test_data, algorithm=algorithm, target=target
+            )
+            if output is None:
+                print(f"   {shape_name} {target} {algorithm}: {error}")
+                continue
+            diff = torch.max(
+                torch.abs(reference_output.to(output.device) - output)
+            ).item()
+            if diff > 1e-3:
+                print(
+                    f"   {shape_name} {target} {algorithm}: ❌ max diff"
+                    f" {diff:.2e}, not timed"
+                )
+                continue
+            fn = functools.partial(
+                run_mojo_implementation,
+                *test_data,
+                algorithm=algorithm,
+                target=target,
+            )
+
+        result = benchmark(
+            f"{shape_name}_{algorithm}",
+            fn,
+            device=target,
+            sync=torch_sync(test_data[0].device),
+            warmup=1,
+            min_iterations=3,
+            bytes_moved=bytes_moved,
+            flops=flops,
+            params={
+                "shape": shape_name,
+                "algorithm": algorithm,
+                "batch_size": batch_size,
+                "seq_len": seq_len,
+                "hidden_dim": hidden_dim,
+                "output_dim": output_dim,
+            },
+        )
+        print(f"   {format_result(result)}")
+        results.append(result)
+
+    return results
+
+
+def benchmark_shape_sweep(shapes=SWEEP_SHAPES):
+    """Check and time every applicable algorithm on each shape and target.
+
+    Runs on the CPU always and on the GPU when CUDA is available. Returns the
+    BenchmarkResults, with the shape and algorithm in each result's params.
+    """
+    print("\nShape sweep: fused vs unfused vs tiled")
+    print("-" * 39)
+
+    targets = ["cpu"] + (["gpu"] if torch.cuda.is_available() else [])
+    results = []
+    for shape_name, shape in shapes:
+        for target in targets:
+            results += benchmark_shape_point(
+                shape_name,
+                shape,
+                target,
+                sweep_algorithms(target, shape[2], shape[3]),
+            )
+
+    return results
+
+
+def parse_dims(text):
+    """Parse a dimension list like "4,16" or a doubling range "64..4096"."""
+    dims = []
+    for item in text.split(","):
+        if ".." in item:
+            low, high = (int(value) for value in item.split(".."))
+            if low < 1 or high < low:
+                raise argparse.ArgumentTypeError(f"invalid range: {item}")
+            while low <= high:
+                dims.append(low)
+                low *= 2
+        else:
+            dims.append(int(item))
+    if not dims or min(dims) < 1:
+        raise argparse.ArgumentTypeError(f"invalid dimensions: {text}")
+    return dims
+
+
+# `--sweep` settings, overridden by "key=value" items in its value. The
+# results go to the temp dir so a bare `--sweep` (as CI runs it) leaves the
+# working tree clean. The default dims stay within the fused and unfused
+# limits above, so on a GPU every point compares all three algorithms.
+SWEEP_DEFAULTS = {
+    "batch": "4",
+    "seq": "4,128",
+    "hidden": "16..256",
+    "output": "16,64",
+    "out": str(Path(tempfile.gettempdir()) / "p22_sweep"),
+}
+
+
+def parse_sweep_spec(text):
+    """Parse `--sweep` settings like "batch=4,8 hidden=64..4096 out=p22".
+
+    batch, seq, hidden and output are dimension lists (see parse_dims) and
+    out is the path prefix for the .csv and .json results. Settings that
+    are not given keep their SWEEP_DEFAULTS value.
+    """
+    settings = dict(SWEEP_DEFAULTS)
+    for item in text.split():
+        key, sep, value = item.partition("=")
+        if not sep or key not in settings:
+            raise argparse.ArgumentTypeError(f"invalid sweep setting: {item}")
+        settings[key] = value
+    spec = {
+        key: parse_dims(settings[key])
+        for key in ("batch", "seq", "hidden", "output")
+    }
+    spec["out"] = settings["out"]
+    return spec
+
+
+def run_sweep(
+    batch_sizes,
+    seq_lens,
+    hidden_dims,
+    output_dims,
+    output_prefix=SWEEP_DEFAULTS["out"],
+):
+    """Benchmark the reference and each Mojo algorithm over a shape grid.
+
+    Runs on the GPU when CUDA is available and on the CPU otherwise, prints
+    where fusion beats the unfused pipeline and the PyTorch reference, and
+    writes `<output_prefix>.csv` and `<output_prefix>.json`.
+    """
+    _use_scripts()
+    from benchmark import save_csv, save_json
+
+    target = "gpu" if torch.cuda.is_available() else "cpu"
+    print("=" * 60)
+    print(f"   Puzzle 22: Shape Sweep ({target.upper()})")
+    print("=" * 60)
+
+    results = []
+    for shape in itertools.product(
+        batch_sizes, seq_lens, hidden_dims, output_dims
+    ):
+        shape_name = "x".join(str(dim) for dim in shape)
+        algorithms = ["reference"] + sweep_algorithms(
+            target, shape[2], shape[3]
+        )
+        results += benchmark_shape_point(shape_name, shape, target, algorithms)
+
+    compared = {
+        result.params["shape"]
+        for result in results
+        if result.params["algorithm"] == "fused"
+    } & {
+        result.params["shape"]
+        for result in results
+        if result.params["algorithm"] == "unfused"
+    }
+    if not compared:
+        print(
+            "\nWarning: no sweep point ran both fused and unfused, so this"
+            " sweep says nothing about fusion. Use a GPU and hidden/output"
+            f" dims with hidden * output <= {FUSED_MAX_ELEMENTS} and each"
+            f" <= {UNFUSED_MAX_DIM}."
+        )
+
+    print("\nSpeedup of each Mojo algorithm over the PyTorch reference:")
+    by_shape = {}
+    for result in results:
+        by_shape.setdefault(result.params["shape"], {})[
+            result.params["algorithm"]
+        ] = result
+    for shape_name, timings in by_shape.items():
+        reference = timings.get("reference")
+        if reference is None:
+            continue
+        speedups = "  ".join(
+            f"{algorithm} {reference.median_s / result.median_s:6.2f}x"
+            for algorithm, result in timings.items()
+            if algorithm != "reference"
+        )
+        print(f"   {shape_name:<20} {speedups}")
+
+    csv_path = Path(f"{output_prefix}.csv")
+    json_path = Path(f"{output_prefix}.json")
+    save_csv(results, csv_path)
+    save_json(results, json_path)
+    print(f"\nWrote {len(results)} results to {csv_path} and {json_path}")
+    return results
+
 
 def run_algorithm_specific_test(algorithm):
     """Run correctness and benchmark tests for specific algorithm."""
@@ -864,7 +1993,8 @@ def run_algorithm_specific_test(algorithm):
 
     results["cpu"], _ = test_implementation(
         "CPU Implementation",
-        algorithm="fused",
+        # The CPU has its own tiled path; every other algorithm is fused
+        algorithm="tiled" if algorithm == "tiled" else "fused",
         target="cpu",
         reference_output=reference_output,
         test_data=test_data,
@@ -905,6 +2035,14 @@ def run_algorithm_specific_test(algorithm):
     if all_correct and test_data[0].device.type == "cuda":
         benchmark_implementations(algorithm, test_data)
 
+        cache_info = compile_cache_info()
+        print(
+            f"\nCompile cache: {cache_info['entries']}/"
+            f"{cache_info['max_entries']} entries, {cache_info['hits']} hits,"
+            f" {cache_info['misses']} misses,"
+            f" {cache_info['evictions']} evictions"
+        )
+
         print(f"\n{algorithm.upper()} Algorithm Test Completed!")
         print(f"\nWhat we verified:")
         print("✅ Numerical correctness against PyTorch reference")
@@ -919,6 +2057,9 @@ def run_algorithm_specific_test(algorithm):
         if algorithm == "unfused":
             print("- Multi-kernel pipeline composition")
             print("- Memory bandwidth vs compute trade-offs")
+        elif algorithm == "tiled":
+            print("- Shared-memory staging of normalized rows and weights")
+            print("- Scaling fused kernels to realistic hidden sizes")
         else:
             print("- Single-kernel fusion benefits and limitations")
             print("- Computation density optimization")
@@ -931,6 +2072,47 @@ def run_algorithm_specific_test(algorithm):
     return all_correct
 
 
+def benchmark_backward_workspace(target="auto"):
+    """Time a forward+backward step with fresh buffers and with a workspace."""
+    _use_scripts()
+    from benchmark import benchmark, format_result, torch_sync
+
+    input_tensor, ln_weight, ln_bias, linear_weight, linear_bias = (
+        create_test_data(device="cuda" if target != "cpu" else "cpu")
+    )
+    device = input_tensor.device.type
+    workspace = create_workspace()
+
+    def step(workspace=None):
+        return lambda: run_mojo_backward_implementation(
+            input_tensor,
+            ln_weight,
+            ln_bias,
+            linear_weight,
+            linear_bias,
+            target=target,
+            workspace=workspace,
+        )
+
+    results = [
+        benchmark(
+            f"layernorm_linear_backward_{name}",
+            fn,
+            device=device,
+            sync=torch_sync(device),
+        )
+        for name, fn in [
+            ("fresh_buffers", step()),
+            ("workspace", step(workspace)),
+        ]
+    ]
+    print(f"\nBackward step buffers ({device.upper()}):")
+    for result in results:
+        print(f"   {format_result(result)}")
+    print(f"   Workspace: {workspace.stats()}")
+    return results
+
+
 def run_comprehensive_backward_test():
     """Run comprehensive backward pass tests on both CPU and GPU."""
     print("=" * 60)
@@ -947,7 +2129,7 @@ def run_comprehensive_backward_test():
     print(f"\nTesting CPU Backward Pass:")
     cpu_success = test_backward_pass(
         "CPU Backward Implementation", target="cpu"
-    )
+    ) and test_autograd_function("CPU Autograd Function", target="cpu")
 
     # Test backward pass on GPU (if available)
     gpu_success = False
@@ -956,7 +2138,7 @@ def run_comprehensive_backward_test():
         print(f"\nTesting GPU Backward Pass:")
         gpu_success = test_backward_pass(
             "GPU Backward Implementation", target="gpu"
-        )
+        ) and test_autograd_function("GPU Autograd Function", target="gpu")
     else:
         print(f"\nCUDA not available - skipping GPU backward test")
 
@@ -992,6 +2174,7 @@ def run_comprehensive_backward_test():
         if test_data[0].device.type == "cuda":
             print("✅ GPU implementation using atomic operations")
         print("✅ Race-condition-free gradient accumulation")
+        print("✅ loss.backward() feeds the real upstream gradient to Mojo")
         print("✅ Cross-platform gradient computation")
 
         print(f"\nTechnical achievements:")
@@ -1003,6 +2186,10 @@ def run_comprehensive_backward_test():
         print("- Gradient correctness verification against PyTorch autograd")
         print("- Memory-efficient gradient computation")
         print("- Educational focus on backward pass mathematics")
+
+        benchmark_backward_workspace(
+            "gpu" if test_data[0].device.type == "cuda" else "cpu"
+        )
     else:
         print(f"\nSome backward pass tests failed!")
         print("   Check the error messages above for details.")
@@ -1029,6 +2216,7 @@ def demonstrate_neural_network_fast():
     target_labels = torch.randint(0, OUTPUT_DIM, (BATCH_SIZE,), device=device)
 
     # Create simple network (1 layer, using Mojo ops)
+    _define_torch_classes()
     net = SimpleNeuralNetwork(
         hidden_dim=HIDDEN_DIM,
         ff_dim=OUTPUT_DIM,
@@ -1181,6 +2369,74 @@ def demonstrate_single_operation():
     return forward_diff < 1e-4
 
 
+# Run in a fresh interpreter: prints the import time, whether importing
+# touched stdout or the compile-cache environment variables, and whether it
+# loaded torch
+_IMPORT_PROBE = """
+import contextlib, io, os, sys, time
+sys.path.insert(0, {path!r})
+before = dict(os.environ)
+stdout = io.StringIO()
+start = time.perf_counter()
+with contextlib.redirect_stdout(stdout):
+    import p22
+elapsed = time.perf_counter() - start
+print(
+    elapsed,
+    bool(stdout.getvalue()),
+    dict(os.environ) != before,
+    "torch" in sys.modules,
+)
+"""
+
+
+def _time_import(directory, repeats):
+    """(median seconds, printed, changed env, loaded torch) of `import p22`."""
+    probe = _IMPORT_PROBE.format(path=str(directory))
+    times = []
+    printed = changed_env = loaded_torch = False
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-c", probe],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        elapsed, did_print, did_change, did_load = result.stdout.split()
+        times.append(float(elapsed))
+        printed = printed or did_print == "True"
+        changed_env = changed_env or did_change == "True"
+        loaded_torch = loaded_torch or did_load == "True"
+    return statistics.median(times), printed, changed_env, loaded_torch
+
+
+def measure_import_time(repeats=5, baseline=None):
+    """Median wall time of `import p22` in fresh interpreters.
+
+    Also reports whether the import printed anything, changed the process
+    environment or loaded torch; all should be False now that setup is
+    deferred to P22Runtime and torch to first use. `baseline` is the path
+    of another p22.py, for example from `git worktree add /tmp/p22-base
+    <rev>`, to time the same way for a before/after comparison. Returns the median of this module's import.
+    """
+    runs = [("import p22", Path(__file__).parent)]
+    if baseline:
+        runs.append(("baseline", Path(baseline).resolve().parent))
+    medians = []
+    for label, directory in runs:
+        median, printed, changed_env, loaded_torch = _time_import(
+            directory, repeats
+        )
+        medians.append(median)
+        print(f"{label}: median {median * 1e3:.1f} ms over {repeats} runs")
+        print(f"   printed on import:     {printed}")
+        print(f"   changed environment:   {changed_env}")
+        print(f"   loaded torch:          {loaded_torch}")
+    if baseline:
+        print(f"   speedup over baseline: {medians[1] / medians[0]:.1f}x")
+    return medians[0]
+
+
 def main():
     """Main function with command line argument handling."""
     parser = argparse.ArgumentParser(description="Run tests for Puzzle 22")
@@ -1195,6 +2451,35 @@ def main():
         action="store_true",
         help="Test and benchmark unfused algorithm only",
     )
+    group.add_argument(
+        "--tiled",
+        action="store_true",
+        help="Test tiled algorithm and sweep shapes up to hidden size 4096",
+    )
+    # Settings ride in the optional value: solutions/run.sh runs every
+    # option it finds on its own, so separate value options would break CI
+    group.add_argument(
+        "--sweep",
+        nargs="?",
+        const="",
+        metavar="SETTINGS",
+        help=(
+            "Benchmark reference/fused/unfused/tiled over a shape grid."
+            ' SETTINGS is e.g. "batch=4 seq=4,128 hidden=16..256'
+            ' output=16,64 out=/tmp/p22_sweep" (the defaults); dims are'
+            " comma lists or doubling ranges"
+        ),
+    )
+    group.add_argument(
+        "--import-time",
+        nargs="?",
+        const="",
+        metavar="BASELINE_P22",
+        help=(
+            "Measure how long `import p22` takes in a fresh interpreter,"
+            " optionally against another p22.py"
+        ),
+    )
     group.add_argument(
         "--backward",
         action="store_true",
@@ -1211,11 +2496,38 @@ def main():
         help="Single operation demo (fastest)",
     )
     args = parser.parse_args()
+    sweep = None
+    if args.sweep is not None:
+        try:
+            sweep = parse_sweep_spec(args.sweep)
+        except (argparse.ArgumentTypeError, ValueError) as e:
+            parser.error(f"--sweep: {e}")
+
+    if args.import_time is not None:
+        measure_import_time(baseline=args.import_time)
+        return
+
+    print(
+        f"Testing with dimensions: [{BATCH_SIZE}, {SEQ_LEN}, {HIDDEN_DIM}] ->"
+        f" [{BATCH_SIZE}, {SEQ_LEN}, {OUTPUT_DIM}]"
+    )
+    get_runtime().configure()
 
     if args.fused:
         run_algorithm_specific_test("fused")
     elif args.unfused:
         run_algorithm_specific_test("unfused")
+    elif args.tiled:
+        run_algorithm_specific_test("tiled")
+        benchmark_shape_sweep()
+    elif sweep is not None:
+        run_sweep(
+            sweep["batch"],
+            sweep["seq"],
+            sweep["hidden"],
+            sweep["output"],
+            sweep["out"],
+        )
     elif args.backward:
         run_comprehensive_backward_test()
     elif args.demo:
@@ -1226,6 +2538,9 @@ def main():
         print("Usage:")
         print("  python p22.py --fused          # Test fused algorithm")
         print("  python p22.py --unfused        # Test unfused algorithm")
+        print("  python p22.py --tiled          # Tiled algorithm + sweep")
+        print("  python p22.py --sweep          # Shape sweep to CSV/JSON")
+        print("  python p22.py --import-time    # Measure module import time")
         print("  python p22.py --backward       # Test backward pass")
         print("  python p22.py --demo           # Neural network demo")
         print(